@@ -0,0 +1,150 @@
+from collections import namedtuple
+
+import numpy as np
+
+from fit_data_whiz.analytics.zones import MAX_MONITORING_GAP
+from fit_data_whiz.utils.timezones import SECONDS_PER_DAY, TimeZone
+
+SECONDS_PER_HOUR = 3600
+
+SeriesAggregates = namedtuple(
+    "SeriesAggregates", [
+        "periods",     # datetime64[s] array with the start of each period
+        "count",       # samples of each period
+        "mean",
+        "min",
+        "max",
+        "time_above"   # seconds above each threshold: periods x thresholds
+    ]
+)
+
+
+def aggregate(
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        period: int = SECONDS_PER_HOUR,
+        thresholds: tuple[float, ...] = (),
+        max_gap: float = MAX_MONITORING_GAP,
+        time_zone: TimeZone | None = None
+) -> SeriesAggregates:
+    """Compute the mean, min and max of the samples of every period (seconds,
+    SECONDS_PER_HOUR, SECONDS_PER_DAY...) with samples and the time above each
+    threshold.
+
+    timestamps are POSIX seconds. If time_zone is given, periods are local
+    (days start at local midnight) and so are their starts. Samples without
+    value (NaN) are ignored. Every sample lasts until the next one, unless they
+    are more than max_gap apart, and its time is counted in the period it
+    starts.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    known: np.ndarray = ~np.isnan(values)
+    timestamps, values = timestamps[known], values[known]
+    order: np.ndarray = np.argsort(timestamps, kind="stable")
+    timestamps, values = timestamps[order], values[order]
+    if len(timestamps) == 0:
+        empty: np.ndarray = np.empty(0)
+        return SeriesAggregates(
+            np.empty(0, "datetime64[s]"), np.empty(0, np.int64), empty, empty, empty,
+            np.empty((0, len(thresholds)))
+        )
+
+    times: np.ndarray = (
+        time_zone.local_timestamps(timestamps) if time_zone is not None else timestamps
+    )
+    keys: np.ndarray = times // period
+    # Samples are sorted, so every period is a contiguous slice.
+    firsts: np.ndarray = np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))
+    counts: np.ndarray = np.diff(np.append(firsts, len(keys)))
+    index: np.ndarray = np.repeat(np.arange(len(firsts)), counts)
+
+    durations: np.ndarray = np.diff(timestamps, append=timestamps[-1]).astype(np.float64)
+    durations[durations > max_gap] = 0.0
+    time_above: np.ndarray = np.stack(
+        [
+            np.bincount(
+                index, weights=np.where(values > threshold, durations, 0.0),
+                minlength=len(firsts)
+            )
+            for threshold in thresholds
+        ],
+        axis=1
+    ) if thresholds else np.empty((len(firsts), 0))
+
+    return SeriesAggregates(
+        (keys[firsts] * period).astype("datetime64[s]"),
+        counts,
+        np.add.reduceat(values, firsts) / counts,
+        np.minimum.reduceat(values, firsts),
+        np.maximum.reduceat(values, firsts),
+        time_above
+    )
+
+
+def daily_aggregate(
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        thresholds: tuple[float, ...] = (),
+        time_zone: TimeZone | None = None
+) -> SeriesAggregates:
+    """Aggregate the samples per day (see aggregate)."""
+    return aggregate(
+        timestamps, values, SECONDS_PER_DAY, thresholds, time_zone=time_zone
+    )
+
+
+def lttb_indices(timestamps: np.ndarray, values: np.ndarray, points: int) -> np.ndarray:
+    """Return the indexes of the samples kept by Largest Triangle Three
+    Buckets downsampling to points samples.
+
+    The first and last samples are kept and from every bucket in between the
+    one that makes the largest triangle with the sample kept from the previous
+    bucket and the average of the next one. timestamps must be sorted and
+    values without NaN. All samples are kept if there aren't more than points.
+    """
+    size: int = len(timestamps)
+    if points >= size or points < 3:
+        return np.arange(size)
+
+    x: np.ndarray = np.asarray(timestamps, dtype=np.float64)
+    y: np.ndarray = np.asarray(values, dtype=np.float64)
+    # Buckets of the samples between the first and the last one.
+    edges: np.ndarray = (
+        np.floor(np.arange(points - 1) * (size - 2) / (points - 2)).astype(np.int64) + 1
+    )
+    edges[-1] = size - 1
+    starts: np.ndarray = edges[:-1]
+    counts: np.ndarray = np.diff(edges)
+    # Average of the next bucket of every bucket (the last sample for the last).
+    next_x: np.ndarray = np.append((np.add.reduceat(x[:-1], starts) / counts)[1:], x[-1])
+    next_y: np.ndarray = np.append((np.add.reduceat(y[:-1], starts) / counts)[1:], y[-1])
+
+    selected: np.ndarray = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    previous: int = 0
+    for bucket, (start, stop) in enumerate(zip(starts.tolist(), edges[1:].tolist())):
+        bucket_x: np.ndarray = x[start:stop]
+        bucket_y: np.ndarray = y[start:stop]
+        areas: np.ndarray = np.abs(
+            (x[previous] - next_x[bucket]) * (bucket_y - y[previous]) -
+            (x[previous] - bucket_x) * (next_y[bucket] - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def lttb(
+        timestamps: np.ndarray, values: np.ndarray, points: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Downsample the samples to points samples for charts (see lttb_indices).
+
+    Samples without value (NaN) are dropped first.
+    """
+    timestamps = np.asarray(timestamps)
+    values = np.asarray(values, dtype=np.float64)
+    known: np.ndarray = ~np.isnan(values)
+    timestamps, values = timestamps[known], values[known]
+    selected: np.ndarray = lttb_indices(timestamps, values, points)
+    return timestamps[selected], values[selected]
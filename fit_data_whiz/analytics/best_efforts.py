@@ -0,0 +1,226 @@
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import numpy as np
+
+from fit_data_whiz.fit.arrays import RecordArrays
+from fit_data_whiz.fit.definitions import is_distance_sport
+from fit_data_whiz.fit.results import (
+    FitDistanceActivity,
+    FitMultisportActivity,
+    FitResult
+)
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+
+# Distances (meters) of the best efforts if none are given.
+STANDARD_DISTANCES: dict[str, float] = {
+    "400m": 400.0,
+    "1k": 1000.0,
+    "5k": 5000.0,
+    "10k": 10000.0,
+    "half_marathon": 21097.5,
+    "marathon": 42195.0
+}
+
+BestEffort = namedtuple(
+    "BestEffort", [
+        "name",
+        "distance",  # meters
+        "elapsed",   # seconds
+        "start",     # UTC datetime
+        "end"        # UTC datetime
+    ]
+)
+
+
+def _fastest_effort(
+        times: np.ndarray, covered: np.ndarray, length: float
+) -> tuple[int, float, float] | None:
+    """Return the (start index, elapsed seconds, end time) of the fastest
+    effort of length meters, or None if no effort reaches it.
+    """
+    goals: np.ndarray = covered + length
+    # End of the effort starting at every record: the first record where the
+    # goal is reached. It's the end pointer of a two-pointer scan, found with
+    # one binary search per start (goals are sorted).
+    ends: np.ndarray = np.searchsorted(covered, goals, side="left")
+    starts: np.ndarray = np.flatnonzero(ends < len(covered))
+    if len(starts) == 0:
+        return None
+    ends = ends[starts]
+    previous: np.ndarray = np.maximum(ends - 1, 0)
+
+    # The end time is interpolated between the records around the goal.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction: np.ndarray = (goals[starts] - covered[previous]) / (
+            covered[ends] - covered[previous]
+        )
+    fraction = np.where(np.isfinite(fraction), fraction, 1.0)
+    end_times: np.ndarray = times[previous] + fraction * (times[ends] - times[previous])
+    elapsed: np.ndarray = end_times - times[starts]
+    best: int = int(np.argmin(elapsed))
+    return int(starts[best]), float(elapsed[best]), float(end_times[best])
+
+
+def fastest_efforts(
+        timestamps: np.ndarray,
+        distances: np.ndarray,
+        targets: dict[str, float] = STANDARD_DISTANCES
+) -> dict[str, BestEffort]:
+    """Return the fastest effort of each target distance.
+
+    For every record (start of the effort) the end of the effort is the
+    first record where the distance covered reaches the target. Because the
+    cumulative distance never decreases, the ends of a target are sorted and
+    found with one vectorized searchsorted, and every target only needs
+    arrays as long as the records. The end time is interpolated between the
+    records around the target.
+
+    Targets longer than the distance covered are not returned.
+    """
+    valid: np.ndarray = ~np.isnan(distances)
+    if not valid.any():
+        return {}
+    times: np.ndarray = timestamps[valid].astype(np.float64)
+    covered: np.ndarray = np.maximum.accumulate(distances[valid])
+
+    efforts: dict[str, BestEffort] = {}
+    for name, length in targets.items():
+        if length > covered[-1] - covered[0]:
+            continue
+        effort: tuple[int, float, float] | None = _fastest_effort(times, covered, length)
+        if effort is None:
+            continue
+        start, elapsed, end_time = effort
+        efforts[name] = BestEffort(
+            name=name,
+            distance=length,
+            elapsed=elapsed,
+            start=datetime.fromtimestamp(times[start], timezone.utc),
+            end=datetime.fromtimestamp(end_time, timezone.utc)
+        )
+    return efforts
+
+
+def activity_best_efforts(
+        activity: FitDistanceActivity, targets: dict[str, float] = STANDARD_DISTANCES
+) -> dict[str, BestEffort]:
+    """Return the fastest effort of each target distance in the activity."""
+    records = activity.record_arrays
+    return fastest_efforts(records.timestamp, records.distance, targets)
+
+
+class PersonalRecords:
+    """Fastest effort of each distance and sport across many activities.
+
+    Adding an activity only compares its efforts with the current records.
+    Efforts of every activity are kept, so removing an activity recomputes
+    the records from them without reading any record. FitLibrary keeps one
+    up to date with the activities added to it.
+    """
+
+    def __init__(self) -> None:
+        # Activity id -> (sport, efforts) of each distance session.
+        self._efforts: dict[str, list[tuple[str, dict[str, BestEffort]]]] = {}
+        # (sport, effort name) -> (activity id, best effort)
+        self._records: dict[tuple[str, str], tuple[str, BestEffort]] = {}
+
+    def __len__(self) -> int:
+        return len(self._efforts)
+
+    @classmethod
+    def from_store(
+            cls, store: FitSqliteStore, athlete: str | None = None
+    ) -> "PersonalRecords":
+        """Compute the records of the distance sessions saved into store, by
+        FILE_ID fingerprint.
+        """
+        personal_records = cls()
+        records_by_file: dict[int, RecordArrays] = {}
+        for row in store.sessions(athlete=athlete):
+            if not is_distance_sport(row["sport"]):
+                continue
+            if row["activity_id"] not in records_by_file:
+                records_by_file[row["activity_id"]] = store.record_arrays(
+                    row["activity_id"]
+                )
+            records: RecordArrays = records_by_file[row["activity_id"]]
+            records = records.slice(
+                *records.index_range(row["start_time"], row["timestamp"])
+            )
+            personal_records._add_session(
+                row["fingerprint"], row["sport"],
+                fastest_efforts(records.timestamp, records.distance)
+            )
+        return personal_records
+
+    def add(
+            self, activity_id: str, sport: str, efforts: dict[str, BestEffort]
+    ) -> list[str]:
+        """Add the efforts of an activity and return the names of the new
+        records.
+        """
+        if activity_id in self._efforts:
+            self.remove(activity_id)
+        return self._add_session(activity_id, sport, efforts)
+
+    def add_activity(
+            self, activity_id: str, activity: FitDistanceActivity
+    ) -> list[str]:
+        return self.add(activity_id, activity.sport, activity_best_efforts(activity))
+
+    def add_result(self, activity_id: str, result: FitResult) -> list[str]:
+        """Add the efforts of a distance activity or of the distance sessions
+        of a multisport activity and return the names of the new records.
+
+        Other results aren't added.
+        """
+        if activity_id in self._efforts:
+            self.remove(activity_id)
+        activities: list = (
+            result.fit_activities if isinstance(result, FitMultisportActivity)
+            else [result]
+        )
+        improved: list[str] = []
+        for activity in activities:
+            if isinstance(activity, FitDistanceActivity):
+                improved.extend(self._add_session(
+                    activity_id, activity.sport, activity_best_efforts(activity)
+                ))
+        return improved
+
+    def remove(self, activity_id: str) -> bool:
+        if self._efforts.pop(activity_id, None) is None:
+            return False
+        self._records = {}
+        for other_id, sessions in self._efforts.items():
+            for sport, efforts in sessions:
+                self._merge(other_id, sport, efforts)
+        return True
+
+    def get(self, sport: str, name: str) -> tuple[str, BestEffort] | None:
+        """Return the (activity id, effort) of the record, if any."""
+        return self._records.get((sport, name))
+
+    def table(self, sport: str) -> dict[str, tuple[str, BestEffort]]:
+        """Return the records of a sport by effort name."""
+        return {
+            name: record for (s, name), record in self._records.items() if s == sport
+        }
+
+    def _add_session(
+            self, activity_id: str, sport: str, efforts: dict[str, BestEffort]
+    ) -> list[str]:
+        self._efforts.setdefault(activity_id, []).append((sport, efforts))
+        return self._merge(activity_id, sport, efforts)
+
+    def _merge(
+            self, activity_id: str, sport: str, efforts: dict[str, BestEffort]
+    ) -> list[str]:
+        improved: list[str] = []
+        for name, effort in efforts.items():
+            current: tuple[str, BestEffort] | None = self._records.get((sport, name))
+            if current is None or effort.elapsed < current[1].elapsed:
+                self._records[(sport, name)] = (activity_id, effort)
+                improved.append(name)
+        return improved
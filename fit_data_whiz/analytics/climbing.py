@@ -0,0 +1,167 @@
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+
+from fit_data_whiz.analytics.tables import ActivityTable, in_dates, nan
+from fit_data_whiz.fit.definitions import ClimbResult, SplitType
+from fit_data_whiz.fit.results import FitClimbActivity
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+
+# Split types by code: the split column of ClimbTable is the index of the
+# split type in this list.
+SPLIT_TYPE_CODES: list[SplitType] = list(SplitType)
+_SPLIT_CODES: dict[str, int] = {t.value: i for i, t in enumerate(SPLIT_TYPE_CODES)}
+_ACTIVE_CODE: int = _SPLIT_CODES[SplitType.CLIMB_ACTIVE]
+_REST_CODE: int = _SPLIT_CODES[SplitType.CLIMB_REST]
+_UNKNOWN_CODE: int = _SPLIT_CODES[SplitType.UNKNOWN]
+
+# Climb results saved by FitSqliteStore (lower case names).
+_RESULTS: dict[str, ClimbResult] = {r.name.lower(): r for r in ClimbResult}
+
+# Columns of ClimbTable (but activity) and their types.
+CLIMB_COLUMNS: dict[str, str] = {
+    "day": "datetime64[D]",  # local date of the activity
+    "split": "int8",         # position of the split type in SPLIT_TYPE_CODES
+    "elapsed": "float64",    # seconds
+    "difficulty": "float64",
+    "result": "int8"         # ClimbResult value
+}
+
+GradePyramid = namedtuple(
+    "GradePyramid", [
+        "grades",      # difficulties, from the easiest one
+        "sends",       # routes completed of each grade
+        "attempts",    # routes attempted and not completed of each grade
+        "send_ratio"   # sends / (sends + attempts) of each grade
+    ]
+)
+ClimbingSessions = namedtuple(
+    "ClimbingSessions", [
+        "activity_ids",
+        "routes",      # routes completed or attempted in each activity
+        "sends",       # routes completed in each activity
+        "send_ratio",  # NaN if the activity has no routes
+        "active",      # seconds climbing (climb_active splits)
+        "rest"         # seconds resting (climb_rest splits)
+    ]
+)
+
+
+class ClimbTable(ActivityTable):
+    """Columnar table of the climbs (splits) of many climb activities (see
+    ActivityTable and CLIMB_COLUMNS).
+
+    Routes are the climb_active splits that weren't discarded.
+
+    Example:
+        table = ClimbTable.from_store(store)
+        grade_pyramid(table).sends
+    """
+
+    COLUMNS = CLIMB_COLUMNS
+
+    @classmethod
+    def from_store(
+            cls, store: FitSqliteStore, athlete: str | None = None
+    ) -> "ClimbTable":
+        table = cls(store.time_zone(athlete))
+        rows_by_fingerprint: dict[str, list] = {}
+        for row in store.climbs(athlete):
+            rows_by_fingerprint.setdefault(row["fingerprint"], []).append(row)
+        for fingerprint, rows in rows_by_fingerprint.items():
+            table.add_climbs(
+                fingerprint,
+                date.fromisoformat(rows[0]["date"]),
+                [r["split_type"] for r in rows],
+                [nan(r["total_elapsed_time"]) for r in rows],
+                [nan(r["difficulty"]) for r in rows],
+                [_RESULTS.get(r["result"], ClimbResult.DISCARDED) for r in rows]
+            )
+        return table
+
+    def add(self, activity_id: str, activity: FitClimbActivity) -> None:
+        """Add (or replace) the climbs of activity."""
+        self.add_climbs(
+            activity_id,
+            self.time_zone.to_local(activity.time.start_time).date(),
+            [c.split_type for c in activity.climbs],
+            [nan(c.time.elapsed) for c in activity.climbs],
+            [nan(c.difficulty) for c in activity.climbs],
+            [c.result for c in activity.climbs]
+        )
+
+    def add_climbs(
+            self,
+            activity_id: str,
+            day: date,
+            split_types: list[str],
+            elapsed: list[float],
+            difficulties: list[float],
+            results: list[ClimbResult]
+    ) -> None:
+        """Add (or replace) the climbs of an activity done on day (local)."""
+        self.add_columns(activity_id, {
+            "day": np.full(len(split_types), np.datetime64(day, "D")),
+            "split": [_SPLIT_CODES.get(t, _UNKNOWN_CODE) for t in split_types],
+            "elapsed": elapsed,
+            "difficulty": difficulties,
+            "result": [r.value for r in results]
+        })
+
+
+def _routes(table: ClimbTable) -> tuple[np.ndarray, np.ndarray]:
+    """Return which climbs are routes and which routes were completed."""
+    result: np.ndarray = table.column("result")
+    sends: np.ndarray = result == ClimbResult.COMPLETED.value
+    routes: np.ndarray = (table.column("split") == _ACTIVE_CODE) & (
+        sends | (result == ClimbResult.ATTEMPTED.value)
+    )
+    return routes, sends & routes
+
+
+def grade_pyramid(
+        table: ClimbTable, date_from: date | None = None, date_to: date | None = None
+) -> GradePyramid:
+    """Count the routes completed and attempted of each grade (difficulty)
+    between both days (included). Routes without difficulty aren't counted.
+    """
+    routes, sends = _routes(table)
+    difficulty: np.ndarray = table.column("difficulty")
+    selected: np.ndarray = (
+        routes & ~np.isnan(difficulty) & in_dates(table.column("day"), date_from, date_to)
+    )
+    grades, grade_index = np.unique(difficulty[selected], return_inverse=True)
+    sent: np.ndarray = np.bincount(
+        grade_index, weights=sends[selected], minlength=len(grades)
+    ).astype(np.int64)
+    tried: np.ndarray = np.bincount(grade_index, minlength=len(grades))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio: np.ndarray = sent / tried
+    return GradePyramid(grades, sent, tried - sent, ratio)
+
+
+def climbing_sessions(table: ClimbTable) -> ClimbingSessions:
+    """Compute the routes, sends and the active and rest time of every
+    activity in the table.
+    """
+    routes, sends = _routes(table)
+    activity: np.ndarray = table.column("activity")
+    split: np.ndarray = table.column("split")
+    elapsed: np.ndarray = np.nan_to_num(table.column("elapsed"))
+    size: int = len(table.activity_ids)
+
+    routes_count: np.ndarray = np.bincount(activity[routes], minlength=size)
+    sends_count: np.ndarray = np.bincount(activity[sends], minlength=size)
+    active: np.ndarray = split == _ACTIVE_CODE
+    rest: np.ndarray = split == _REST_CODE
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio: np.ndarray = sends_count / routes_count
+    return ClimbingSessions(
+        table.activity_ids,
+        routes_count,
+        sends_count,
+        ratio,
+        np.bincount(activity[active], weights=elapsed[active], minlength=size),
+        np.bincount(activity[rest], weights=elapsed[rest], minlength=size)
+    )
@@ -0,0 +1,173 @@
+from collections import namedtuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from fit_data_whiz.fit.results import FitDistanceActivity
+from fit_data_whiz.utils.array_utils import exponential_moving_average
+
+MEDIAN_SMOOTHING = "median"
+EMA_SMOOTHING = "ema"
+
+# Samples of the median window.
+MEDIAN_WINDOW = 5
+
+# Weight of the new sample in the exponential moving average.
+EMA_ALPHA = 0.2
+
+# Altitude change (meters) needed to count an ascent or a descent.
+HYSTERESIS_THRESHOLD = 3.0
+
+# Horizontal distance (meters) the grade is computed over.
+GRADE_DISTANCE = 20.0
+
+Elevation = namedtuple(
+    "Elevation", [
+        "altitude",  # smoothed altitude array
+        "grade",     # grade array (%)
+        "gain",      # meters
+        "loss",      # meters
+        "laps"       # (gain, loss) of each lap
+    ]
+)
+
+
+def _fill_gaps(values: np.ndarray) -> np.ndarray:
+    """Return values with NaN replaced by linear interpolation."""
+    missing: np.ndarray = np.isnan(values)
+    if not missing.any() or missing.all():
+        return values
+    indexes: np.ndarray = np.arange(len(values))
+    filled: np.ndarray = values.copy()
+    filled[missing] = np.interp(indexes[missing], indexes[~missing], values[~missing])
+    return filled
+
+
+def _median(values: np.ndarray, window: int) -> np.ndarray:
+    if window < 2 or len(values) < window:
+        return values
+    half: int = window // 2
+    padded: np.ndarray = np.pad(values, (half, window - 1 - half), mode="edge")
+    return np.median(sliding_window_view(padded, window), axis=1)
+
+
+def smooth_altitude(
+        altitude: np.ndarray,
+        method: str = MEDIAN_SMOOTHING,
+        window: int = MEDIAN_WINDOW,
+        alpha: float = EMA_ALPHA
+) -> np.ndarray:
+    """Return the smoothed altitude, with NaN samples interpolated."""
+    filled: np.ndarray = _fill_gaps(altitude)
+    if method == MEDIAN_SMOOTHING:
+        return _median(filled, window)
+    if method == EMA_SMOOTHING:
+        return exponential_moving_average(filled, alpha)
+    raise ValueError(f"Unknown smoothing method: {method}")
+
+
+def gain_and_loss(
+        altitude: np.ndarray, threshold: float = HYSTERESIS_THRESHOLD
+) -> tuple[float, float]:
+    """Return the (gain, loss) of the altitude with a hysteresis threshold.
+
+    A climb (or descent) only ends when the altitude goes back threshold
+    meters from its highest (or lowest) point, so noise below threshold is
+    ignored. Only the turning points of the altitude (found vectorized) are
+    visited.
+    """
+    altitude = altitude[~np.isnan(altitude)]
+    if len(altitude) < 2:
+        return 0.0, 0.0
+
+    steps: np.ndarray = np.diff(altitude)
+    altitude = np.concatenate(([altitude[0]], altitude[1:][steps != 0]))
+    if len(altitude) < 2:
+        return 0.0, 0.0
+    directions: np.ndarray = np.sign(np.diff(altitude))
+    turning: np.ndarray = np.flatnonzero(directions[1:] != directions[:-1]) + 1
+    points: list[float] = altitude[np.concatenate(([0], turning, [-1]))].tolist()
+
+    gain: float = 0.0
+    loss: float = 0.0
+    # 1 climbing, -1 descending, 0 not known yet.
+    direction: int = 0
+    lowest: float = points[0]
+    highest: float = points[0]
+    base: float = points[0]
+    extreme: float = points[0]
+    for point in points[1:]:
+        if direction == 0:
+            lowest = min(lowest, point)
+            highest = max(highest, point)
+            if point - lowest >= threshold:
+                direction, base, extreme = 1, lowest, point
+            elif highest - point >= threshold:
+                direction, base, extreme = -1, highest, point
+        elif direction == 1:
+            if point > extreme:
+                extreme = point
+            elif extreme - point >= threshold:
+                gain += extreme - base
+                direction, base, extreme = -1, extreme, point
+        else:
+            if point < extreme:
+                extreme = point
+            elif point - extreme >= threshold:
+                loss += base - extreme
+                direction, base, extreme = 1, extreme, point
+
+    if direction == 1:
+        gain += extreme - base
+    elif direction == -1:
+        loss += base - extreme
+    return gain, loss
+
+
+def grade(
+        altitude: np.ndarray, distance: np.ndarray, over: float = GRADE_DISTANCE
+) -> np.ndarray:
+    """Return the grade (%) at every sample over the previous over meters."""
+    if len(altitude) == 0:
+        return np.empty(0)
+    distance = np.maximum.accumulate(_fill_gaps(distance))
+    if np.isnan(distance).all():
+        return np.full(len(altitude), np.nan)
+    starts: np.ndarray = np.searchsorted(distance, distance - over, side="right") - 1
+    starts = np.maximum(starts, 0)
+    run: np.ndarray = distance - distance[starts]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        grades: np.ndarray = (altitude - altitude[starts]) / run * 100
+    return np.where(run > 0, grades, 0.0)
+
+
+def activity_elevation(
+        activity: FitDistanceActivity,
+        method: str = MEDIAN_SMOOTHING,
+        window: int = MEDIAN_WINDOW,
+        alpha: float = EMA_ALPHA,
+        threshold: float = HYSTERESIS_THRESHOLD
+) -> Elevation:
+    """Return the elevation of the activity computed from its records.
+
+    The result is cached on the activity for the given parameters.
+    """
+    key: tuple = ("elevation", method, window, alpha, threshold)
+    if key in activity.cache:
+        return activity.cache[key]
+
+    records = activity.record_arrays
+    altitude: np.ndarray = smooth_altitude(records.altitude, method, window, alpha)
+    gain, loss = gain_and_loss(altitude, threshold)
+    elevation = Elevation(
+        altitude=altitude,
+        grade=grade(altitude, records.distance),
+        gain=gain,
+        loss=loss,
+        laps=[
+            gain_and_loss(altitude[start:stop], threshold)
+            for start, stop in activity.lap_ranges
+        ]
+    )
+    activity.cache[key] = elevation
+    return elevation
@@ -0,0 +1,290 @@
+from collections import namedtuple
+from datetime import date, timedelta
+
+import numpy as np
+
+from fit_data_whiz.fit.results import FitHrv
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+from fit_data_whiz.utils.timezones import TimeZone, default_time_zone
+
+# Days of the short and long rolling baselines.
+SHORT_BASELINE_DAYS = 7
+LONG_BASELINE_DAYS = 60
+
+HrvTrendDay = namedtuple(
+    "HrvTrendDay", [
+        "date",
+        "rmssd",           # last night average (ms), NaN without night
+        "short_baseline",  # mean RMSSD of the short window (ms)
+        "long_baseline",   # mean RMSSD of the long window (ms)
+        "cv",              # coefficient of variation of the short window
+        "deviation"        # ms below (< 0) or above (> 0) the balanced range
+    ]
+)
+HrvTrendSeries = namedtuple(
+    "HrvTrendSeries", [
+        "dates",  # datetime64[D] array
+        "rmssd",
+        "short_baseline",
+        "long_baseline",
+        "cv",
+        "deviation"
+    ]
+)
+
+
+def rolling_stats(
+        values: np.ndarray, start: int, stop: int, days: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the mean and the coefficient of variation (standard deviation /
+    mean) of the values (NaN when missing) of the windows of days ending at
+    every index between start and stop (excluded).
+
+    Both are NaN for windows without values.
+    """
+    first: int = max(start - days + 1, 0)
+    window: np.ndarray = values[first:stop]
+    known: np.ndarray = ~np.isnan(window)
+    filled: np.ndarray = np.where(known, window, 0.0)
+    sums: np.ndarray = np.concatenate(([0.0], np.cumsum(filled)))
+    squares: np.ndarray = np.concatenate(([0.0], np.cumsum(filled * filled)))
+    counts: np.ndarray = np.concatenate(([0], np.cumsum(known)))
+
+    ends: np.ndarray = np.arange(start, stop) + 1 - first
+    begins: np.ndarray = np.maximum(ends - days, 0)
+    count: np.ndarray = counts[ends] - counts[begins]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean: np.ndarray = (sums[ends] - sums[begins]) / count
+        variance: np.ndarray = (squares[ends] - squares[begins]) / count - mean * mean
+        cv: np.ndarray = np.sqrt(np.maximum(variance, 0.0)) / mean
+    return mean, cv
+
+
+def balanced_deviation(
+        rmssd: np.ndarray, balanced_lower: np.ndarray, balanced_upper: np.ndarray
+) -> np.ndarray:
+    """Return RMSSD minus the balanced lower bound when it's below it, minus the
+    upper bound when it's above it and 0 inside the range (NaN without RMSSD).
+    """
+    below: np.ndarray = np.minimum(rmssd - balanced_lower, 0.0)
+    above: np.ndarray = np.maximum(rmssd - balanced_upper, 0.0)
+    return np.where(np.isnan(rmssd), np.nan, np.nan_to_num(below + above))
+
+
+class HrvTrend:
+    """Daily HRV (last night average RMSSD) of many nights with its rolling
+    baselines.
+
+    Every day keeps the RMSSD and the balanced range of its night (NaN for
+    days without night), and the mean of the short and long windows ending on
+    it and the coefficient of variation of the short one. Adding or removing
+    a night only recomputes the windows that contain its day, and any day is
+    read in O(1), so FIT files aren't read again to follow the trend.
+
+    If two nights have the same day, the last one added is the one used.
+
+    Example:
+        trend = HrvTrend.from_store(store)
+        trend.add_hrv(night_id, fit_hrv)
+        trend.at(date.today()).short_baseline
+    """
+
+    def __init__(
+            self,
+            short_days: int = SHORT_BASELINE_DAYS,
+            long_days: int = LONG_BASELINE_DAYS,
+            time_zone: TimeZone | None = None
+    ) -> None:
+        self.short_days: int = short_days
+        self.long_days: int = long_days
+        self.time_zone: TimeZone = time_zone or default_time_zone()
+        # Night id -> day
+        self._nights: dict[str, date] = {}
+        # Day -> night id whose values the day has.
+        self._days: dict[date, str] = {}
+        self.first_day: date | None = None
+        self.rmssd: np.ndarray = np.empty(0)
+        self.balanced_lower: np.ndarray = np.empty(0)
+        self.balanced_upper: np.ndarray = np.empty(0)
+        self.short_baseline: np.ndarray = np.empty(0)
+        self.long_baseline: np.ndarray = np.empty(0)
+        self.cv: np.ndarray = np.empty(0)
+
+    def __len__(self) -> int:
+        return len(self._nights)
+
+    @classmethod
+    def from_store(cls, store: FitSqliteStore, athlete: str | None = None) -> "HrvTrend":
+        """Build the trend from the HRV summaries saved into store."""
+        trend = cls(time_zone=store.time_zone(athlete))
+        for row in store.hrv_summaries(athlete):
+            trend.add(
+                row["fingerprint"],
+                date.fromisoformat(row["date"]),
+                row["last_night_average"],
+                row["baseline_balanced_lower"],
+                row["baseline_balanced_upper"]
+            )
+        return trend
+
+    @property
+    def last_day(self) -> date | None:
+        if self.first_day is None:
+            return None
+        return self.first_day + timedelta(days=len(self.rmssd) - 1)
+
+    @property
+    def deviation(self) -> np.ndarray:
+        """Deviation of every day from its balanced range (see balanced_deviation)."""
+        return balanced_deviation(self.rmssd, self.balanced_lower, self.balanced_upper)
+
+    def add(
+            self,
+            night_id: str,
+            day: date,
+            rmssd: float | None,
+            balanced_lower: float | None = None,
+            balanced_upper: float | None = None
+    ) -> None:
+        """Add (or replace) the HRV of the night that ends on day (local)."""
+        self.remove(night_id)
+        self._extend(day)
+        index: int = self._index(day)
+        self.rmssd[index] = np.nan if rmssd is None else rmssd
+        self.balanced_lower[index] = np.nan if balanced_lower is None else balanced_lower
+        self.balanced_upper[index] = np.nan if balanced_upper is None else balanced_upper
+        previous: str | None = self._days.get(day)
+        if previous is not None:
+            del self._nights[previous]
+        self._nights[night_id] = day
+        self._days[day] = night_id
+        self._recompute(index)
+
+    def add_hrv(self, night_id: str, hrv: FitHrv) -> None:
+        """Add (or replace) the HRV of a night from its FitHrv."""
+        self.add(
+            night_id,
+            self.time_zone.to_local(hrv.datetime_utc).date(),
+            hrv.last_night_average,
+            hrv.baseline_balanced_lower,
+            hrv.baseline_balanced_upper
+        )
+
+    def remove(self, night_id: str) -> bool:
+        day: date | None = self._nights.pop(night_id, None)
+        if day is None:
+            return False
+        del self._days[day]
+        index: int = self._index(day)
+        self.rmssd[index] = np.nan
+        self.balanced_lower[index] = np.nan
+        self.balanced_upper[index] = np.nan
+        self._recompute(index)
+        return True
+
+    def at(self, day: date) -> HrvTrendDay:
+        """Return the HRV trend of day.
+
+        Baselines of the days after the last one are computed from the nights
+        inside their windows, if any.
+        """
+        if self.first_day is None or day < self.first_day:
+            return HrvTrendDay(day, np.nan, np.nan, np.nan, np.nan, np.nan)
+
+        index: int = self._index(day)
+        if index < len(self.rmssd):
+            return HrvTrendDay(
+                day,
+                float(self.rmssd[index]),
+                float(self.short_baseline[index]),
+                float(self.long_baseline[index]),
+                float(self.cv[index]),
+                float(balanced_deviation(
+                    self.rmssd[index], self.balanced_lower[index],
+                    self.balanced_upper[index]
+                ))
+            )
+
+        # Empty days until day.
+        values: np.ndarray = np.pad(
+            self.rmssd, (0, index - len(self.rmssd) + 1), constant_values=np.nan
+        )
+        short_baseline, cv = rolling_stats(values, index, index + 1, self.short_days)
+        long_baseline, _ = rolling_stats(values, index, index + 1, self.long_days)
+        return HrvTrendDay(
+            day, np.nan, float(short_baseline[0]), float(long_baseline[0]),
+            float(cv[0]), np.nan
+        )
+
+    def series(
+            self, date_from: date | None = None, date_to: date | None = None
+    ) -> HrvTrendSeries:
+        """Return the HRV trend of the days between both days (included),
+        limited to the days with the series computed.
+        """
+        if self.first_day is None:
+            empty: np.ndarray = np.empty(0)
+            return HrvTrendSeries(
+                np.empty(0, "datetime64[D]"), empty, empty, empty, empty, empty
+            )
+
+        start: int = max(self._index(date_from), 0) if date_from is not None else 0
+        stop: int = (
+            min(self._index(date_to) + 1, len(self.rmssd))
+            if date_to is not None else len(self.rmssd)
+        )
+        stop = max(stop, start)
+        return HrvTrendSeries(
+            np.datetime64(self.first_day, "D") + np.arange(start, stop),
+            self.rmssd[start:stop],
+            self.short_baseline[start:stop],
+            self.long_baseline[start:stop],
+            self.cv[start:stop],
+            balanced_deviation(
+                self.rmssd[start:stop], self.balanced_lower[start:stop],
+                self.balanced_upper[start:stop]
+            )
+        )
+
+    def _index(self, day: date) -> int:
+        return (day - self.first_day).days
+
+    def _extend(self, day: date) -> None:
+        """Make room for day in the series.
+
+        New days have no night, and the baselines of the days added after the
+        last one are computed.
+        """
+        if self.first_day is None:
+            self.first_day = day
+            self._resize(0, 1)
+            return
+        if day < self.first_day:
+            self._resize((self.first_day - day).days, 0)
+            self.first_day = day
+        elif day > self.last_day:
+            size: int = len(self.rmssd)
+            self._resize(0, (day - self.last_day).days)
+            self._recompute(size)
+
+    def _resize(self, before: int, after: int) -> None:
+        for name in (
+                "rmssd", "balanced_lower", "balanced_upper",
+                "short_baseline", "long_baseline", "cv"
+        ):
+            setattr(self, name, np.pad(
+                getattr(self, name), (before, after), constant_values=np.nan
+            ))
+
+    def _recompute(self, index: int) -> None:
+        """Recompute the windows that contain the day of index."""
+        stop: int = min(index + self.long_days, len(self.rmssd))
+        if index >= stop:
+            return
+        self.long_baseline[index:stop], _ = rolling_stats(
+            self.rmssd, index, stop, self.long_days
+        )
+        short_stop: int = min(index + self.short_days, len(self.rmssd))
+        self.short_baseline[index:short_stop], self.cv[index:short_stop] = rolling_stats(
+            self.rmssd, index, short_stop, self.short_days
+        )
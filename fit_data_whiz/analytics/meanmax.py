@@ -0,0 +1,163 @@
+import numpy as np
+
+from fit_data_whiz.fit.results import FitDistanceActivity
+
+# Samples further apart than this (seconds) are a gap that no window can
+# span. Shorter gaps are filled with the previous value.
+MAX_SAMPLE_GAP = 10
+
+
+def log_durations(
+        max_duration: int = 6 * 3600, points_per_decade: int = 12
+) -> np.ndarray:
+    """Return the log-spaced durations (seconds) from 1 to max_duration."""
+    count: int = int(np.ceil(np.log10(max_duration) * points_per_decade)) + 1
+    return np.unique(np.round(np.logspace(0, np.log10(max_duration), count))).astype(
+        np.int64
+    )
+
+
+# Durations of the curves if none are given.
+DEFAULT_DURATIONS = log_durations()
+
+
+class MeanMaxCurve:
+    """Best average value for every duration.
+
+    values[i] is the highest average of any window of durations[i] seconds
+    (NaN if no window of that duration has data) and starts[i] is the POSIX
+    timestamp where that window starts.
+    """
+    __slots__ = ("durations", "values", "starts")
+
+    def __init__(self, durations: np.ndarray, values: np.ndarray, starts: np.ndarray):
+        self.durations: np.ndarray = durations
+        self.values: np.ndarray = values
+        self.starts: np.ndarray = starts
+
+    def value_at(self, duration: int) -> float | None:
+        index: int = int(np.searchsorted(self.durations, duration))
+        if index == len(self.durations) or self.durations[index] != duration:
+            return None
+        value: float = float(self.values[index])
+        return None if np.isnan(value) else value
+
+
+def _to_seconds_grid(
+        timestamps: np.ndarray, values: np.ndarray, max_gap: float
+) -> np.ndarray:
+    """Return values as one value per second since the first timestamp.
+
+    Missing seconds get the previous value, unless they are inside a gap
+    longer than max_gap, in which case they (as NaN samples) are NaN.
+    """
+    seconds: np.ndarray = timestamps - timestamps[0]
+    grid_seconds: np.ndarray = np.arange(seconds[-1] + 1)
+    sample: np.ndarray = np.searchsorted(seconds, grid_seconds, side="right") - 1
+    grid: np.ndarray = values[sample].astype(np.float64)
+
+    gaps: np.ndarray = np.diff(seconds, append=seconds[-1] + 1)
+    inside_gap: np.ndarray = (gaps[sample] > max_gap) & (grid_seconds > seconds[sample])
+    grid[inside_gap] = np.nan
+    return grid
+
+
+def mean_max(
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        durations: np.ndarray = DEFAULT_DURATIONS,
+        max_gap: float = MAX_SAMPLE_GAP
+) -> MeanMaxCurve:
+    """Compute the mean-maximal curve of a time series.
+
+    timestamps are POSIX seconds sorted in ascending order and values have
+    NaN for missing samples. Every duration costs one vectorized pass over
+    the cumulative sums of the series.
+    """
+    curve_values: np.ndarray = np.full(len(durations), np.nan)
+    starts: np.ndarray = np.zeros(len(durations), dtype=np.int64)
+    if len(timestamps) == 0:
+        return MeanMaxCurve(durations, curve_values, starts)
+
+    grid: np.ndarray = _to_seconds_grid(timestamps, values, max_gap)
+    valid: np.ndarray = ~np.isnan(grid)
+    sums: np.ndarray = np.concatenate(([0.0], np.cumsum(np.where(valid, grid, 0.0))))
+    counts: np.ndarray = np.concatenate(([0], np.cumsum(valid)))
+
+    for i, duration in enumerate(durations.tolist()):
+        if duration > len(grid):
+            break
+        window_sums: np.ndarray = sums[duration:] - sums[:-duration]
+        window_sums[(counts[duration:] - counts[:-duration]) < duration] = -np.inf
+        best: int = int(np.argmax(window_sums))
+        if np.isfinite(window_sums[best]):
+            curve_values[i] = window_sums[best] / duration
+            starts[i] = timestamps[0] + best
+
+    return MeanMaxCurve(durations, curve_values, starts)
+
+
+def activity_mean_max(
+        activity: FitDistanceActivity,
+        column: str = "power",
+        durations: np.ndarray = DEFAULT_DURATIONS,
+        max_gap: float = MAX_SAMPLE_GAP
+) -> MeanMaxCurve:
+    """Compute the mean-maximal curve of a record column: power, heart_rate,
+    speed...
+    """
+    records = activity.record_arrays
+    return mean_max(records.timestamp, records.column(column), durations, max_gap)
+
+
+class MeanMaxHistory:
+    """All time mean-maximal curve, updated one activity at a time.
+
+    Adding an activity only compares its curve with the current best one.
+    Curves of every activity are kept, so removing an activity recomputes the
+    best curve from them without reading any record.
+
+    All curves must use the same durations.
+    """
+
+    def __init__(self, durations: np.ndarray = DEFAULT_DURATIONS) -> None:
+        self.durations: np.ndarray = durations
+        self._curves: dict[str, MeanMaxCurve] = {}
+        self.values: np.ndarray = np.full(len(durations), np.nan)
+        self.starts: np.ndarray = np.zeros(len(durations), dtype=np.int64)
+        # Activity id with the best value of each duration.
+        self.activity_ids: list[str | None] = [None] * len(durations)
+
+    def __len__(self) -> int:
+        return len(self._curves)
+
+    @property
+    def curve(self) -> MeanMaxCurve:
+        return MeanMaxCurve(self.durations, self.values, self.starts)
+
+    def add(self, activity_id: str, curve: MeanMaxCurve) -> None:
+        if not np.array_equal(curve.durations, self.durations):
+            raise ValueError("The curve durations are not the history durations")
+        if activity_id in self._curves:
+            self.remove(activity_id)
+
+        self._curves[activity_id] = curve
+        self._merge(activity_id, curve)
+
+    def remove(self, activity_id: str) -> bool:
+        if self._curves.pop(activity_id, None) is None:
+            return False
+
+        self.values = np.full(len(self.durations), np.nan)
+        self.starts = np.zeros(len(self.durations), dtype=np.int64)
+        self.activity_ids = [None] * len(self.durations)
+        for other_id, curve in self._curves.items():
+            self._merge(other_id, curve)
+        return True
+
+    def _merge(self, activity_id: str, curve: MeanMaxCurve) -> None:
+        better: np.ndarray = ~np.isnan(curve.values) & ~(curve.values <= self.values)
+        self.values = np.where(better, curve.values, self.values)
+        self.starts = np.where(better, curve.starts, self.starts)
+        for index in np.flatnonzero(better).tolist():
+            self.activity_ids[index] = activity_id
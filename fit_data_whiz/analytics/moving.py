@@ -0,0 +1,91 @@
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import numpy as np
+
+from fit_data_whiz.fit.arrays import RecordArrays
+from fit_data_whiz.fit.results import FitDistanceActivity
+
+# Below this speed (m/s) the athlete is considered stopped.
+MIN_MOVING_SPEED = 0.5
+
+# Time between two records (seconds) from which the athlete is considered
+# stopped, whatever the speed: the device paused or lost the recording.
+MAX_RECORDING_GAP = 30
+
+MovingTime = namedtuple(
+    "MovingTime", [
+        "moving",   # seconds
+        "stopped",  # seconds
+        "stops"     # list of StopInterval
+    ]
+)
+StopInterval = namedtuple("StopInterval", ["start", "end", "duration"])
+
+
+def moving_time(
+        records: RecordArrays,
+        speed_threshold: float = MIN_MOVING_SPEED,
+        max_gap: float = MAX_RECORDING_GAP
+) -> MovingTime:
+    """Compute the moving and stopped time from the records.
+
+    Each interval between two consecutive records is a moving one if the
+    speed at its end is at least speed_threshold and it's no longer than
+    max_gap. When the record has no speed, the speed is computed from the
+    distance covered in the interval.
+
+    Consecutive stopped intervals are joined into one StopInterval.
+    """
+    if len(records) < 2:
+        return MovingTime(moving=0.0, stopped=0.0, stops=[])
+
+    timestamps: np.ndarray = records.timestamp
+    deltas: np.ndarray = np.diff(timestamps).astype(np.float64)
+    speeds: np.ndarray = records.speed[1:]
+    without_speed: np.ndarray = np.isnan(speeds)
+    if without_speed.any():
+        with np.errstate(divide="ignore", invalid="ignore"):
+            distance_speeds: np.ndarray = np.diff(records.distance) / deltas
+        speeds = np.where(without_speed, distance_speeds, speeds)
+
+    # NaN speeds (neither speed nor distance) aren't moving ones.
+    moving: np.ndarray = (speeds >= speed_threshold) & (deltas <= max_gap)
+    moving_seconds: float = float(deltas[moving].sum())
+    stopped_seconds: float = float(deltas[~moving].sum())
+
+    # Runs of stopped intervals: interval i goes from record i to record i + 1.
+    edges: np.ndarray = np.diff(np.concatenate(([0], (~moving).astype(np.int8), [0])))
+    run_starts: np.ndarray = np.flatnonzero(edges == 1)
+    run_ends: np.ndarray = np.flatnonzero(edges == -1)
+    stops: list[StopInterval] = [
+        StopInterval(
+            start=datetime.fromtimestamp(int(timestamps[start]), timezone.utc),
+            end=datetime.fromtimestamp(int(timestamps[end]), timezone.utc),
+            duration=float(timestamps[end] - timestamps[start])
+        )
+        for start, end in zip(run_starts.tolist(), run_ends.tolist())
+    ]
+
+    return MovingTime(moving=moving_seconds, stopped=stopped_seconds, stops=stops)
+
+
+def activity_moving_time(
+        activity: FitDistanceActivity,
+        speed_threshold: float = MIN_MOVING_SPEED,
+        max_gap: float = MAX_RECORDING_GAP
+) -> MovingTime:
+    """Compute the moving time of the whole activity (see moving_time)."""
+    return moving_time(activity.record_arrays, speed_threshold, max_gap)
+
+
+def laps_moving_time(
+        activity: FitDistanceActivity,
+        speed_threshold: float = MIN_MOVING_SPEED,
+        max_gap: float = MAX_RECORDING_GAP
+) -> list[MovingTime]:
+    """Compute the moving time of every lap of the activity (see moving_time)."""
+    return [
+        moving_time(activity.record_arrays.slice(start, stop), speed_threshold, max_gap)
+        for start, stop in activity.lap_ranges
+    ]
@@ -0,0 +1,186 @@
+from collections import namedtuple
+
+import numpy as np
+
+from fit_data_whiz.fit.arrays import RecordArrays
+
+LINEAR_RESAMPLING = "linear"
+PREVIOUS_RESAMPLING = "previous"
+MEAN_RESAMPLING = "mean"
+
+ResampledSeries = namedtuple(
+    "ResampledSeries", [
+        "timestamp",  # int64 POSIX seconds of the grid
+        "values"      # float64, NaN where the grid has no value
+    ]
+)
+AlignedSeries = namedtuple(
+    "AlignedSeries", [
+        "timestamp",  # int64 POSIX seconds of the grid shared by every series
+        "columns"     # name -> float64 values on the grid
+    ]
+)
+
+
+def _samples(timestamps: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the samples with value (not NaN) sorted by timestamp."""
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    known: np.ndarray = ~np.isnan(values)
+    timestamps, values = timestamps[known], values[known]
+    order: np.ndarray = np.argsort(timestamps, kind="stable")
+    return timestamps[order], values[order]
+
+
+def grid(start: int, end: int, period: int) -> np.ndarray:
+    """Return the multiples of period (seconds) from the one at or before start
+    to end (included).
+    """
+    first: int = start // period * period
+    return np.arange(first, end + 1, period, dtype=np.int64)
+
+
+def _resample(
+        grid_timestamps: np.ndarray,
+        period: int,
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        mode: str = LINEAR_RESAMPLING,
+        max_gap: float | None = None
+) -> np.ndarray:
+    """Return the values of the samples on a grid of POSIX seconds every period
+    seconds (see grid).
+
+    Modes:
+        LINEAR_RESAMPLING: interpolated between the samples around each point.
+        PREVIOUS_RESAMPLING: the one of the last sample at or before each point.
+        MEAN_RESAMPLING: the mean of the samples from each point to the next
+            one (excluded), NaN for periods without samples.
+
+    Samples without value (NaN) are ignored. With LINEAR_RESAMPLING and
+    PREVIOUS_RESAMPLING, the last sample of every timestamp is the one used,
+    and the points outside the samples or between two samples more than
+    max_gap seconds apart are NaN, unless they are on a sample.
+    """
+    grid_timestamps = np.asarray(grid_timestamps, dtype=np.int64)
+    timestamps, values = _samples(timestamps, values)
+    resampled: np.ndarray = np.full(len(grid_timestamps), np.nan)
+    if len(timestamps) == 0 or len(grid_timestamps) == 0:
+        return resampled
+
+    if mode == MEAN_RESAMPLING:
+        bucket: np.ndarray = (timestamps - grid_timestamps[0]) // period
+        inside: np.ndarray = (bucket >= 0) & (bucket < len(grid_timestamps))
+        counts: np.ndarray = np.bincount(bucket[inside], minlength=len(grid_timestamps))
+        sums: np.ndarray = np.bincount(
+            bucket[inside], weights=values[inside], minlength=len(grid_timestamps)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+    if mode not in (LINEAR_RESAMPLING, PREVIOUS_RESAMPLING):
+        raise ValueError(f"Unknown resampling mode: {mode}")
+
+    # The last sample of every timestamp.
+    last: np.ndarray = np.append(timestamps[1:] != timestamps[:-1], True)
+    timestamps, values = timestamps[last], values[last]
+    previous: np.ndarray = np.searchsorted(timestamps, grid_timestamps, side="right") - 1
+    following: np.ndarray = np.minimum(previous + 1, len(timestamps) - 1)
+    clipped: np.ndarray = np.maximum(previous, 0)
+    on_sample: np.ndarray = (previous >= 0) & (timestamps[clipped] == grid_timestamps)
+    between: np.ndarray = (previous >= 0) & (previous + 1 < len(timestamps))
+    if max_gap is not None:
+        between &= timestamps[following] - timestamps[clipped] <= max_gap
+    covered: np.ndarray = on_sample | between
+
+    if mode == LINEAR_RESAMPLING:
+        resampled[covered] = np.interp(grid_timestamps[covered], timestamps, values)
+    else:
+        resampled[covered] = values[clipped[covered]]
+    return resampled
+
+
+def resample(
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        period: int = 1,
+        mode: str = LINEAR_RESAMPLING,
+        max_gap: float | None = None,
+        start: int | None = None,
+        end: int | None = None
+) -> ResampledSeries:
+    """Resample a time series (POSIX seconds, any order) to a uniform grid of
+    period seconds (see grid and _resample).
+
+    The grid covers the samples unless start or end (POSIX seconds) are given.
+    """
+    known: np.ndarray = ~np.isnan(np.asarray(values, dtype=np.float64))
+    sampled: np.ndarray = np.asarray(timestamps, dtype=np.int64)[known]
+    if len(sampled) == 0 and (start is None or end is None):
+        return ResampledSeries(np.empty(0, dtype=np.int64), np.empty(0))
+    grid_timestamps: np.ndarray = grid(
+        int(sampled.min()) if start is None else start,
+        int(sampled.max()) if end is None else end,
+        period
+    )
+    return ResampledSeries(
+        grid_timestamps,
+        _resample(grid_timestamps, period, timestamps, values, mode, max_gap)
+    )
+
+
+def align(
+        series: dict[str, tuple[np.ndarray, np.ndarray]],
+        period: int = 1,
+        mode: str | dict[str, str] = LINEAR_RESAMPLING,
+        max_gap: float | None = None
+) -> AlignedSeries:
+    """Resample many time series (name -> (timestamps, values)) to the same
+    grid of period seconds, the one that covers the samples of all of them.
+
+    mode is the resampling mode of every series or a dict with the one of each
+    series (LINEAR_RESAMPLING for the ones not in it).
+
+    Example:
+        aligned = align({
+            "heart_rate": monitoring.series(HEART_RATE_METRIC),
+            "respiration": monitoring.series(RESPIRATION_METRIC)
+        }, period=60, mode={"respiration": PREVIOUS_RESAMPLING}, max_gap=600)
+        aligned.columns["heart_rate"]
+    """
+    known: list[np.ndarray] = [
+        np.asarray(timestamps, dtype=np.int64)[~np.isnan(np.asarray(values, np.float64))]
+        for timestamps, values in series.values()
+    ]
+    known = [timestamps for timestamps in known if len(timestamps)]
+    grid_timestamps: np.ndarray = (
+        grid(
+            min(int(t.min()) for t in known), max(int(t.max()) for t in known), period
+        ) if known else np.empty(0, dtype=np.int64)
+    )
+    modes: dict[str, str] = (
+        mode if isinstance(mode, dict) else dict.fromkeys(series, mode)
+    )
+    return AlignedSeries(grid_timestamps, {
+        name: _resample(
+            grid_timestamps, period, timestamps, values,
+            modes.get(name, LINEAR_RESAMPLING), max_gap
+        )
+        for name, (timestamps, values) in series.items()
+    })
+
+
+def align_records(
+        records: RecordArrays,
+        columns: tuple[str, ...] = ("heart_rate", "speed", "altitude"),
+        period: int = 1,
+        mode: str | dict[str, str] = LINEAR_RESAMPLING,
+        max_gap: float | None = None
+) -> AlignedSeries:
+    """Resample record columns (see RECORD_ARRAY_COLUMNS) to the same grid
+    (see align).
+    """
+    timestamps: np.ndarray = records.timestamp
+    return align(
+        {name: (timestamps, records.column(name)) for name in columns},
+        period, mode, max_gap
+    )
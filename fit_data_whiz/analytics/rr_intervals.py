@@ -0,0 +1,151 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Physiological limits (seconds) of an RR interval: 200 and 30 bpm.
+MIN_RR_INTERVAL = 0.3
+MAX_RR_INTERVAL = 2.0
+
+# Artifacts differ from the median of the intervals around them more than
+# this fraction of it.
+MAX_RR_DEVIATION = 0.2
+ARTIFACT_WINDOW = 5
+
+# Successive differences (seconds) counted by pNN50.
+NN50_DIFFERENCE = 0.05
+
+# Default sliding windows (seconds).
+HRV_WINDOW = 300.0
+HRV_STEP = 30.0
+
+HrvMetrics = namedtuple(
+    "HrvMetrics", [
+        "beats",    # valid intervals
+        "mean_rr",  # ms
+        "rmssd",    # root mean square of successive differences (ms)
+        "sdnn",     # standard deviation of the intervals (ms)
+        "pnn50"     # % of successive differences longer than 50 ms
+    ]
+)
+SlidingHrv = namedtuple(
+    "SlidingHrv", [
+        "start",  # seconds from the first beat to the start of each window
+        "beats",
+        "rmssd",  # ms, NaN in windows without successive differences
+        "sdnn",   # ms, NaN in windows without intervals
+        "pnn50"   # %
+    ]
+)
+
+
+def filter_artifacts(
+        rr_intervals: np.ndarray,
+        min_interval: float = MIN_RR_INTERVAL,
+        max_interval: float = MAX_RR_INTERVAL,
+        max_deviation: float = MAX_RR_DEVIATION,
+        window: int = ARTIFACT_WINDOW
+) -> np.ndarray:
+    """Return which RR intervals (seconds) are valid beats.
+
+    Intervals outside the physiological limits and the ones that differ more
+    than max_deviation from the median of the window intervals centered on
+    them (missed or extra beats) are artifacts.
+    """
+    rr_intervals = np.asarray(rr_intervals, dtype=np.float64)
+    valid: np.ndarray = (rr_intervals >= min_interval) & (rr_intervals <= max_interval)
+    if len(rr_intervals) < window:
+        return valid
+    padded: np.ndarray = np.pad(rr_intervals, window // 2, mode="edge")
+    medians: np.ndarray = np.median(
+        np.lib.stride_tricks.sliding_window_view(padded, window), axis=1
+    )
+    return valid & (np.abs(rr_intervals - medians) <= max_deviation * medians)
+
+
+def _successive_differences(
+        rr_intervals: np.ndarray, valid: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the difference of every interval with the previous one and which
+    of them are between two valid beats (the first one never is).
+    """
+    differences: np.ndarray = np.diff(rr_intervals, prepend=np.nan)
+    paired: np.ndarray = valid & np.concatenate(([False], valid[:-1]))
+    return np.where(paired, differences, 0.0), paired
+
+
+def hrv_metrics(rr_intervals: np.ndarray, valid: np.ndarray | None = None) -> HrvMetrics:
+    """Compute the time domain HRV metrics of the valid RR intervals (see
+    filter_artifacts, used if valid isn't given).
+
+    Successive differences are only taken between consecutive valid beats.
+    """
+    rr_intervals = np.asarray(rr_intervals, dtype=np.float64)
+    if valid is None:
+        valid = filter_artifacts(rr_intervals)
+    beats: np.ndarray = rr_intervals[valid] * 1000
+    differences, paired = _successive_differences(rr_intervals, valid)
+    differences = differences[paired] * 1000
+    if len(beats) == 0:
+        return HrvMetrics(0, np.nan, np.nan, np.nan, np.nan)
+    return HrvMetrics(
+        len(beats),
+        float(beats.mean()),
+        float(np.sqrt(np.mean(differences ** 2))) if len(differences) else np.nan,
+        float(beats.std()),
+        float(np.mean(np.abs(differences) > NN50_DIFFERENCE * 1000) * 100)
+        if len(differences) else np.nan
+    )
+
+
+def sliding_hrv(
+        rr_intervals: np.ndarray,
+        window: float = HRV_WINDOW,
+        step: float = HRV_STEP,
+        valid: np.ndarray | None = None
+) -> SlidingHrv:
+    """Compute the time domain HRV metrics (see hrv_metrics) of windows of
+    window seconds every step seconds.
+
+    Beats are placed in time by the cumulative sum of all intervals (artifacts
+    included) and every metric of all windows comes from cumulative sums, so
+    the cost doesn't depend on the number of windows.
+    """
+    rr_intervals = np.asarray(rr_intervals, dtype=np.float64)
+    if valid is None:
+        valid = filter_artifacts(rr_intervals)
+    times: np.ndarray = np.cumsum(rr_intervals)
+    # Windows inside the beats, or one window if they last less than it.
+    duration: float = float(times[-1]) if len(times) else -1.0
+    windows: int = int((duration - window) // step) + 1 if duration >= window else (
+        1 if duration >= 0 else 0
+    )
+    starts: np.ndarray = np.arange(windows) * step
+
+    beats: np.ndarray = np.where(valid, rr_intervals * 1000, 0.0)
+    differences, paired = _successive_differences(rr_intervals, valid)
+    differences = differences * 1000
+
+    # Beats ending inside [start, start + window).
+    first: np.ndarray = np.searchsorted(times, starts, side="left")
+    last: np.ndarray = np.searchsorted(times, starts + window, side="left")
+
+    def window_sums(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Sums of values of the beats (and of the successive differences, from
+        the second beat) inside every window.
+        """
+        sums: np.ndarray = np.concatenate(([0.0], np.cumsum(values)))
+        return sums[last] - sums[first], sums[last] - sums[np.minimum(first + 1, last)]
+
+    count, _ = window_sums(valid.astype(np.float64))
+    total, _ = window_sums(beats)
+    squares, _ = window_sums(beats * beats)
+    _, pairs = window_sums(paired.astype(np.float64))
+    _, squared_differences = window_sums(differences * differences)
+    _, nn50 = window_sums((np.abs(differences) > NN50_DIFFERENCE * 1000) & paired)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean: np.ndarray = total / count
+        sdnn: np.ndarray = np.sqrt(np.maximum(squares / count - mean * mean, 0.0))
+        rmssd: np.ndarray = np.sqrt(squared_differences / pairs)
+        pnn50: np.ndarray = nn50 / pairs * 100
+    return SlidingHrv(starts, count.astype(np.int64), rmssd, sdnn, pnn50)
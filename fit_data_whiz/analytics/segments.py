@@ -0,0 +1,219 @@
+from collections import namedtuple
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+
+import numpy as np
+
+from fit_data_whiz.fit.arrays import RecordArrays
+from fit_data_whiz.fit.results import FitDistanceActivity
+from fit_data_whiz.library.spatial import SpatialIndex
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+from fit_data_whiz.utils.geo_utils import to_local_meters
+
+# Distance (meters) the track can be from the segment and still follow it.
+SEGMENT_TOLERANCE = 25.0
+
+SegmentEffort = namedtuple(
+    "SegmentEffort", [
+        "activity_id",
+        "start_index",  # record index where the effort starts
+        "end_index",    # record index where the effort ends (included)
+        "start",        # UTC datetime
+        "elapsed"       # seconds
+    ]
+)
+
+
+class Segment:
+    """A section of a route given as a polyline of (lat, lon) degrees.
+
+    The polyline is resampled every tolerance meters: a track follows the
+    segment when it passes, in order, within tolerance of every sample.
+    """
+    __slots__ = ("name", "lat", "lon", "tolerance", "bounds", "_x", "_y")
+
+    def __init__(
+            self,
+            name: str,
+            lat: np.ndarray,
+            lon: np.ndarray,
+            tolerance: float = SEGMENT_TOLERANCE
+    ) -> None:
+        valid: np.ndarray = ~np.isnan(lat) & ~np.isnan(lon)
+        if valid.sum() < 2:
+            raise ValueError("A segment needs at least two positions")
+        self.name: str = name
+        self.lat: np.ndarray = np.asarray(lat, dtype=np.float64)[valid]
+        self.lon: np.ndarray = np.asarray(lon, dtype=np.float64)[valid]
+        self.tolerance: float = tolerance
+        # (min lat, min lon, max lat, max lon)
+        self.bounds: tuple[float, float, float, float] = (
+            float(self.lat.min()), float(self.lon.min()),
+            float(self.lat.max()), float(self.lon.max())
+        )
+
+        x, y = self.to_meters(self.lat, self.lon)
+        lengths: np.ndarray = np.concatenate(([0.0], np.hypot(np.diff(x), np.diff(y))))
+        covered: np.ndarray = np.cumsum(lengths)
+        samples: np.ndarray = np.append(
+            np.arange(0, covered[-1], tolerance), covered[-1]
+        )
+        self._x: np.ndarray = np.interp(samples, covered, x)
+        self._y: np.ndarray = np.interp(samples, covered, y)
+
+    @property
+    def start(self) -> tuple[float, float]:
+        return float(self.lat[0]), float(self.lon[0])
+
+    @property
+    def end(self) -> tuple[float, float]:
+        return float(self.lat[-1]), float(self.lon[-1])
+
+    def to_meters(
+            self, lat: np.ndarray, lon: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Project degrees to meters from the start of the segment."""
+        return to_local_meters(lat, lon, self.lat[0], self.lon[0])
+
+    def match(self, lat: np.ndarray, lon: np.ndarray) -> list[tuple[int, int]]:
+        """Return the (start, end) record indexes of every pass of the track
+        through the segment, both included.
+
+        Passes end at the closest point to the segment end and start at the
+        last closest point to the segment start before it. A pass is only
+        accepted if the track goes, in the segment direction, within tolerance
+        of every segment sample.
+        """
+        indexes: np.ndarray = np.flatnonzero(~np.isnan(lat) & ~np.isnan(lon))
+        if len(indexes) < 2:
+            return []
+        x, y = self.to_meters(lat[indexes], lon[indexes])
+
+        starts: np.ndarray = self._closest_passes(x, y, self._x[0], self._y[0])
+        ends: np.ndarray = self._closest_passes(x, y, self._x[-1], self._y[-1])
+        passes: list[tuple[int, int]] = []
+        last_end: int = -1
+        for end in ends.tolist():
+            # The pass starts at the last time the track was near the start.
+            position: int = int(np.searchsorted(starts, end, side="left")) - 1
+            if position < 0 or starts[position] <= last_end:
+                continue
+            start: int = int(starts[position])
+            if self._follows(x[start:end + 1], y[start:end + 1]):
+                passes.append((int(indexes[start]), int(indexes[end])))
+                last_end = end
+        return passes
+
+    def _closest_passes(
+            self, x: np.ndarray, y: np.ndarray, point_x: float, point_y: float
+    ) -> np.ndarray:
+        """Return the index of the closest point of every run of consecutive
+        points within tolerance of the point.
+        """
+        distances: np.ndarray = np.hypot(x - point_x, y - point_y)
+        near: np.ndarray = distances <= self.tolerance
+        if not near.any():
+            return np.empty(0, dtype=np.int64)
+        edges: np.ndarray = np.diff(np.concatenate(([0], near.astype(np.int8), [0])))
+        run_starts: np.ndarray = np.flatnonzero(edges == 1)
+        run_ends: np.ndarray = np.flatnonzero(edges == -1)
+        return np.array([
+            run_start + int(np.argmin(distances[run_start:run_end]))
+            for run_start, run_end in zip(run_starts.tolist(), run_ends.tolist())
+        ], dtype=np.int64)
+
+    def _follows(self, x: np.ndarray, y: np.ndarray) -> bool:
+        """Whether the track goes near every inner sample of the segment in
+        order.
+        """
+        inner_x: np.ndarray = self._x[1:-1]
+        inner_y: np.ndarray = self._y[1:-1]
+        if len(inner_x) == 0:
+            return True
+        distances: np.ndarray = np.hypot(
+            inner_x[:, None] - x[None, :], inner_y[:, None] - y[None, :]
+        )
+        nearest: np.ndarray = np.argmin(distances, axis=1)
+        if np.any(distances[np.arange(len(nearest)), nearest] > self.tolerance):
+            return False
+        return bool(np.all(np.diff(nearest) >= 0))
+
+
+def track_efforts(
+        segment: Segment, activity_id: str, records: RecordArrays
+) -> list[SegmentEffort]:
+    """Return the efforts of the track on the segment."""
+    timestamps: np.ndarray = records.timestamp
+    return [
+        SegmentEffort(
+            activity_id=activity_id,
+            start_index=start,
+            end_index=end,
+            start=datetime.fromtimestamp(int(timestamps[start]), timezone.utc),
+            elapsed=float(timestamps[end] - timestamps[start])
+        )
+        for start, end in segment.match(records.position_lat, records.position_long)
+    ]
+
+
+def activity_segment_efforts(
+        segment: Segment, activity: FitDistanceActivity, activity_id: str = ""
+) -> list[SegmentEffort]:
+    return track_efforts(segment, activity_id, activity.record_arrays)
+
+
+def store_track_loader(store: FitSqliteStore) -> Callable[[str], RecordArrays | None]:
+    """Return a loader of the records of an activity saved into store by its
+    fingerprint.
+    """
+    def load(fingerprint: str) -> RecordArrays | None:
+        row_id: int | None = store.file_id(fingerprint)
+        return store.record_arrays(row_id) if row_id is not None else None
+    return load
+
+
+class SegmentMatcher:
+    """Find the efforts of many activities on a segment.
+
+    The spatial index discards the activities that don't go near the start
+    and the end of the segment, so only the records of the candidates are
+    loaded (with load_track, from the activity id) and matched.
+
+    Example:
+        matcher = SegmentMatcher(library.spatial, store_track_loader(store))
+        matcher.efforts(Segment("the climb", lat, lon))
+    """
+
+    def __init__(
+            self,
+            spatial: SpatialIndex,
+            load_track: Callable[[str], RecordArrays | None]
+    ) -> None:
+        self.spatial: SpatialIndex = spatial
+        self.load_track: Callable[[str], RecordArrays | None] = load_track
+
+    def candidates(self, segment: Segment) -> set[str]:
+        """Return the ids of the activities that could have an effort."""
+        return (
+            self.spatial.near(*segment.start, radius=segment.tolerance)
+            & self.spatial.near(*segment.end, radius=segment.tolerance)
+            & self.spatial.in_box(*segment.bounds)
+        )
+
+    def efforts(
+            self, segment: Segment, activity_ids: Iterable[str] | None = None
+    ) -> list[SegmentEffort]:
+        """Return the efforts on the segment ordered by start.
+
+        Only the candidates in activity_ids are matched, if given.
+        """
+        candidates: set[str] = self.candidates(segment)
+        if activity_ids is not None:
+            candidates &= set(activity_ids)
+
+        efforts: list[SegmentEffort] = []
+        for activity_id in candidates:
+            records: RecordArrays | None = self.load_track(activity_id)
+            if records is not None:
+                efforts.extend(track_efforts(segment, activity_id, records))
+        return sorted(efforts, key=lambda e: e.start)
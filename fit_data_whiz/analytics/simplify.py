@@ -0,0 +1,139 @@
+import heapq
+
+import numpy as np
+
+from fit_data_whiz.fit.results import FitDistanceActivity
+from fit_data_whiz.utils.geo_utils import to_local_meters
+
+
+def _track_meters(
+        lat: np.ndarray, lon: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the record indexes with position and their (x, y) meters."""
+    indexes: np.ndarray = np.flatnonzero(~np.isnan(lat) & ~np.isnan(lon))
+    if len(indexes) == 0:
+        return indexes, np.empty(0), np.empty(0)
+    x, y = to_local_meters(
+        lat[indexes], lon[indexes], float(lat[indexes[0]]), float(lon[indexes[0]])
+    )
+    return indexes, x, y
+
+
+def douglas_peucker(lat: np.ndarray, lon: np.ndarray, epsilon: float) -> np.ndarray:
+    """Simplify a track with the Douglas-Peucker algorithm.
+
+    Return the sorted indexes of the kept points: no removed point is further
+    than epsilon meters from the simplified track. Points without position
+    are never kept.
+    """
+    indexes, x, y = _track_meters(lat, lon)
+    if len(indexes) < 3:
+        return indexes
+
+    keep: np.ndarray = np.zeros(len(indexes), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack: list[tuple[int, int]] = [(0, len(indexes) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        px: np.ndarray = x[first + 1:last] - x[first]
+        py: np.ndarray = y[first + 1:last] - y[first]
+        dx: float = x[last] - x[first]
+        dy: float = y[last] - y[first]
+        length: float = dx * dx + dy * dy
+        # Distance from each inner point to the segment first-last.
+        if length > 0:
+            t: np.ndarray = np.clip((px * dx + py * dy) / length, 0.0, 1.0)
+            distances: np.ndarray = np.hypot(px - t * dx, py - t * dy)
+        else:
+            distances = np.hypot(px, py)
+        farthest: int = int(np.argmax(distances))
+        if distances[farthest] > epsilon:
+            middle: int = first + 1 + farthest
+            keep[middle] = True
+            stack.append((first, middle))
+            stack.append((middle, last))
+
+    return indexes[keep]
+
+
+def visvalingam(lat: np.ndarray, lon: np.ndarray, budget: int) -> np.ndarray:
+    """Simplify a track to at most budget points with Visvalingam-Whyatt.
+
+    The point making the smallest triangle with its neighbours is removed
+    until budget points are left. Return the sorted indexes of the kept
+    points; first and last points are always kept.
+    """
+    indexes, x, y = _track_meters(lat, lon)
+    size: int = len(indexes)
+    budget = max(budget, 2)
+    if size <= budget:
+        return indexes
+
+    # Initial areas of the inner points, vectorized.
+    areas: list[float] = (np.abs(
+        (x[:-2] - x[2:]) * (y[1:-1] - y[:-2]) - (x[:-2] - x[1:-1]) * (y[2:] - y[:-2])
+    ) / 2).tolist()
+    heap: list[tuple[float, int]] = [(area, i + 1) for i, area in enumerate(areas)]
+    heapq.heapify(heap)
+    current: list[float] = [np.inf] + areas + [np.inf]
+    previous: list[int] = list(range(-1, size - 1))
+    following: list[int] = list(range(1, size + 1))
+    removed: list[bool] = [False] * size
+    xs: list[float] = x.tolist()
+    ys: list[float] = y.tolist()
+
+    def area(i: int) -> float:
+        a, c = previous[i], following[i]
+        return abs(
+            (xs[a] - xs[c]) * (ys[i] - ys[a]) - (xs[a] - xs[i]) * (ys[c] - ys[a])
+        ) / 2
+
+    left: int = size
+    while left > budget:
+        point_area, point = heapq.heappop(heap)
+        if removed[point] or point_area != current[point]:
+            continue
+        removed[point] = True
+        left -= 1
+        before, after = previous[point], following[point]
+        following[before] = after
+        previous[after] = before
+        for neighbour in (before, after):
+            if 0 < neighbour < size - 1:
+                # A neighbour is never easier to remove than the removed point.
+                current[neighbour] = max(area(neighbour), point_area)
+                heapq.heappush(heap, (current[neighbour], neighbour))
+
+    return indexes[~np.array(removed)]
+
+
+def activity_douglas_peucker(
+        activity: FitDistanceActivity, epsilon: float
+) -> np.ndarray:
+    """Return the record indexes of the simplified track of the activity.
+
+    The result is cached on the activity for each epsilon (meters).
+    """
+    key: tuple = ("douglas_peucker", epsilon)
+    if key not in activity.cache:
+        records = activity.record_arrays
+        activity.cache[key] = douglas_peucker(
+            records.position_lat, records.position_long, epsilon
+        )
+    return activity.cache[key]
+
+
+def activity_visvalingam(activity: FitDistanceActivity, budget: int) -> np.ndarray:
+    """Return the record indexes of the simplified track of the activity.
+
+    The result is cached on the activity for each budget (points).
+    """
+    key: tuple = ("visvalingam", budget)
+    if key not in activity.cache:
+        records = activity.record_arrays
+        activity.cache[key] = visvalingam(
+            records.position_lat, records.position_long, budget
+        )
+    return activity.cache[key]
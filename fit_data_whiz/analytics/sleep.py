@@ -0,0 +1,180 @@
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+
+from fit_data_whiz.analytics.tables import ActivityTable, in_dates
+from fit_data_whiz.fit.definitions import (
+    SLEEP_LEVEL_AWAKE,
+    SLEEP_LEVEL_DEEP,
+    SLEEP_LEVEL_LIGHT,
+    SLEEP_LEVEL_REM
+)
+from fit_data_whiz.fit.results import FitSleep
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+
+# Stages that are sleep (not awake nor unmeasurable).
+ASLEEP_STAGES = (SLEEP_LEVEL_LIGHT, SLEEP_LEVEL_DEEP, SLEEP_LEVEL_REM)
+
+# Columns of SleepTable (but activity) and their types.
+SLEEP_COLUMNS: dict[str, str] = {
+    "day": "datetime64[D]",  # date of the night (the one saved by FitSqliteStore)
+    "start": "int64",        # POSIX seconds
+    "end": "int64",          # POSIX seconds
+    "stage": "int8"          # sleep level code (see SLEEP_LEVEL)
+}
+
+SleepNights = namedtuple(
+    "SleepNights", [
+        "activity_ids",
+        "dates",          # datetime64[D] array with the date of each night
+        "deep",           # seconds
+        "light",          # seconds
+        "rem",            # seconds
+        "awake",          # seconds
+        "onset",          # POSIX seconds of the first sleep stage, -1 if none
+        "wake",           # POSIX seconds of the end of the last one, -1 if none
+        "awakenings",     # awake runs between onset and wake
+        "stage_changes"   # runs between onset and wake minus one
+    ]
+)
+MonthlySleep = namedtuple(
+    "MonthlySleep", [
+        "months",  # datetime64[M] array
+        "nights",  # nights of each month
+        "deep",    # mean seconds per night
+        "light",   # mean seconds per night
+        "rem",     # mean seconds per night
+        "awake"    # mean seconds per night
+    ]
+)
+
+
+class SleepTable(ActivityTable):
+    """Columnar table of the sleep stage runs (see SleepTimeline) of many
+    nights (see ActivityTable and SLEEP_COLUMNS).
+
+    Example:
+        table = SleepTable.from_store(store)
+        nights = sleep_nights(table)
+        monthly_sleep(nights).deep
+    """
+
+    COLUMNS = SLEEP_COLUMNS
+
+    @classmethod
+    def from_store(
+            cls, store: FitSqliteStore, athlete: str | None = None
+    ) -> "SleepTable":
+        table = cls(store.time_zone(athlete))
+        rows_by_fingerprint: dict[str, list] = {}
+        for row in store.sleep_stages(athlete):
+            rows_by_fingerprint.setdefault(row["fingerprint"], []).append(row)
+        for fingerprint, rows in rows_by_fingerprint.items():
+            table.add_stages(
+                fingerprint,
+                date.fromisoformat(rows[0]["date"]),
+                [r["start_time"] for r in rows],
+                [r["end_time"] for r in rows],
+                [r["stage"] for r in rows]
+            )
+        return table
+
+    def add(self, activity_id: str, sleep: FitSleep) -> None:
+        """Add (or replace) the stages of a night."""
+        if not sleep.dates:
+            return
+        self.add_stages(
+            activity_id,
+            sleep.dates[-1],
+            sleep.timeline.start,
+            sleep.timeline.end,
+            sleep.timeline.stage
+        )
+
+    def add_stages(
+            self,
+            activity_id: str,
+            day: date,
+            starts: list[int],
+            ends: list[int],
+            stages: list[int]
+    ) -> None:
+        """Add (or replace) the stage runs of the night of day."""
+        self.add_columns(activity_id, {
+            "day": np.full(len(stages), np.datetime64(day, "D")),
+            "start": starts,
+            "end": ends,
+            "stage": stages
+        })
+
+
+def sleep_nights(
+        table: SleepTable, date_from: date | None = None, date_to: date | None = None
+) -> SleepNights:
+    """Compute the time in every stage, the sleep onset and wake times and the
+    fragmentation of every night between both days (included).
+    """
+    activity: np.ndarray = table.column("activity")
+    start: np.ndarray = table.column("start")
+    end: np.ndarray = table.column("end")
+    stage: np.ndarray = table.column("stage")
+    duration: np.ndarray = (end - start).astype(np.float64)
+    size: int = len(table.activity_ids)
+
+    def total(stage_code: int) -> np.ndarray:
+        rows: np.ndarray = stage == stage_code
+        return np.bincount(activity[rows], weights=duration[rows], minlength=size)
+
+    asleep: np.ndarray = np.isin(stage, ASLEEP_STAGES)
+    onset: np.ndarray = np.full(size, np.iinfo(np.int64).max)
+    np.minimum.at(onset, activity[asleep], start[asleep])
+    wake: np.ndarray = np.full(size, -1, dtype=np.int64)
+    np.maximum.at(wake, activity[asleep], end[asleep])
+    slept: np.ndarray = wake >= 0
+    onset[~slept] = -1
+
+    # Runs inside the sleep period of their night.
+    inside: np.ndarray = (start >= onset[activity]) & (end <= wake[activity])
+    awakenings: np.ndarray = np.bincount(
+        activity[inside & (stage == SLEEP_LEVEL_AWAKE)], minlength=size
+    )
+    stage_changes: np.ndarray = np.maximum(
+        np.bincount(activity[inside], minlength=size) - 1, 0
+    )
+
+    dates: np.ndarray = np.full(size, np.datetime64("NaT"), dtype="datetime64[D]")
+    dates[activity] = table.column("day")
+    selected: np.ndarray = np.flatnonzero(in_dates(dates, date_from, date_to))
+    return SleepNights(
+        [table.activity_ids[i] for i in selected],
+        dates[selected],
+        total(SLEEP_LEVEL_DEEP)[selected],
+        total(SLEEP_LEVEL_LIGHT)[selected],
+        total(SLEEP_LEVEL_REM)[selected],
+        total(SLEEP_LEVEL_AWAKE)[selected],
+        onset[selected],
+        wake[selected],
+        awakenings[selected],
+        stage_changes[selected]
+    )
+
+
+def monthly_sleep(nights: SleepNights) -> MonthlySleep:
+    """Average the time in every stage per night of each month."""
+    months, month_index = np.unique(
+        nights.dates.astype("datetime64[M]"), return_inverse=True
+    )
+    counts: np.ndarray = np.bincount(month_index, minlength=len(months))
+
+    def mean(values: np.ndarray) -> np.ndarray:
+        return np.bincount(month_index, weights=values, minlength=len(months)) / counts
+
+    return MonthlySleep(
+        months,
+        counts,
+        mean(nights.deep),
+        mean(nights.light),
+        mean(nights.rem),
+        mean(nights.awake)
+    )
@@ -0,0 +1,212 @@
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+
+from fit_data_whiz.analytics.tables import ActivityTable, in_dates, nan, week_starts
+from fit_data_whiz.fit.definitions import ExerciseCategories
+from fit_data_whiz.fit.results import FitSetActivity
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+
+# Exercise categories by code: the category column of SetTable is the index
+# of the category in this list.
+CATEGORIES: list[ExerciseCategories] = list(ExerciseCategories)
+_CATEGORY_CODES: dict[str, int] = {c.value: i for i, c in enumerate(CATEGORIES)}
+_UNKNOWN_CODE: int = _CATEGORY_CODES[ExerciseCategories.UNKNOWN]
+_REST_CODE: int = _CATEGORY_CODES[ExerciseCategories.REST]
+
+# Sets with more repetitions than this don't estimate the one rep max: the
+# Epley formula isn't reliable with them.
+MAX_ONE_REP_MAX_REPETITIONS = 12
+
+# Columns of SetTable (but activity) and their types.
+SET_COLUMNS: dict[str, str] = {
+    "day": "datetime64[D]",  # local date of the activity
+    "category": "int16",     # position of the exercise category in CATEGORIES
+    "duration": "float64",   # seconds
+    "repetitions": "float64",
+    "weight": "float64"      # kilograms
+}
+
+WeeklyVolume = namedtuple(
+    "WeeklyVolume", [
+        "weeks",        # datetime64[D] array with the monday of each week
+        "categories",   # exercise categories of the columns
+        "tonnage",      # kilograms (weight * repetitions): weeks x categories
+        "repetitions",  # weeks x categories
+        "sets"          # weeks x categories
+    ]
+)
+OneRepMaxTrend = namedtuple(
+    "OneRepMaxTrend", [
+        "dates",        # datetime64[D] array with the days the exercise was done
+        "one_rep_max"   # best estimated one rep max (kilograms) of each day
+    ]
+)
+RestStats = namedtuple(
+    "RestStats", [
+        "activity_ids",
+        "count",  # rest intervals of each activity
+        "total",  # seconds
+        "mean"    # seconds, NaN if the activity has no rest intervals
+    ]
+)
+
+
+def _category_code(exercise: str | None) -> int:
+    return _CATEGORY_CODES.get(exercise, _UNKNOWN_CODE) if exercise else _UNKNOWN_CODE
+
+
+class SetTable(ActivityTable):
+    """Columnar table of the sets of many set activities (see ActivityTable
+    and SET_COLUMNS).
+
+    Rest intervals are the sets whose exercise is rest (the exercise of a
+    FitSet without category is its set_type).
+
+    Example:
+        table = SetTable.from_store(store)
+        weekly_volume(table).tonnage
+    """
+
+    COLUMNS = SET_COLUMNS
+
+    @classmethod
+    def from_store(
+            cls, store: FitSqliteStore, athlete: str | None = None
+    ) -> "SetTable":
+        table = cls(store.time_zone(athlete))
+        rows_by_fingerprint: dict[str, list] = {}
+        for row in store.sets(athlete):
+            rows_by_fingerprint.setdefault(row["fingerprint"], []).append(row)
+        for fingerprint, rows in rows_by_fingerprint.items():
+            table.add_sets(
+                fingerprint,
+                date.fromisoformat(rows[0]["date"]),
+                [r["exercise"] for r in rows],
+                [nan(r["duration"]) for r in rows],
+                [nan(r["repetitions"]) for r in rows],
+                [nan(r["weight"]) for r in rows]
+            )
+        return table
+
+    def add(self, activity_id: str, activity: FitSetActivity) -> None:
+        """Add (or replace) the sets of activity."""
+        self.add_sets(
+            activity_id,
+            self.time_zone.to_local(activity.time.start_time).date(),
+            [s.exercise for s in activity.sets],
+            [nan(s.time.elapsed) for s in activity.sets],
+            [nan(s.repetitions) for s in activity.sets],
+            [nan(s.weight) for s in activity.sets]
+        )
+
+    def add_sets(
+            self,
+            activity_id: str,
+            day: date,
+            exercises: list[str | None],
+            durations: list[float],
+            repetitions: list[float],
+            weights: list[float]
+    ) -> None:
+        """Add (or replace) the sets of an activity done on day (local)."""
+        self.add_columns(activity_id, {
+            "day": np.full(len(exercises), np.datetime64(day, "D")),
+            "category": [_category_code(e) for e in exercises],
+            "duration": durations,
+            "repetitions": repetitions,
+            "weight": weights
+        })
+
+
+def weekly_volume(
+        table: SetTable, date_from: date | None = None, date_to: date | None = None
+) -> WeeklyVolume:
+    """Compute the tonnage, repetitions and sets of each exercise category in
+    every week (from monday) with sets between both days (included).
+
+    Rest intervals aren't counted and sets without weight (body weight
+    exercises) count their repetitions but no tonnage.
+    """
+    category: np.ndarray = table.column("category")
+    days: np.ndarray = table.column("day")
+    selected: np.ndarray = (category != _REST_CODE) & in_dates(days, date_from, date_to)
+
+    weeks, week_index = np.unique(week_starts(days[selected]), return_inverse=True)
+    codes, category_index = np.unique(category[selected], return_inverse=True)
+    cells: np.ndarray = week_index * len(codes) + category_index
+
+    repetitions: np.ndarray = np.nan_to_num(table.column("repetitions")[selected])
+    weights: np.ndarray = np.nan_to_num(table.column("weight")[selected])
+
+    def total(values: np.ndarray | None) -> np.ndarray:
+        sums: np.ndarray = np.bincount(
+            cells, weights=values, minlength=len(weeks) * len(codes)
+        )
+        return sums.reshape(len(weeks), len(codes))
+
+    return WeeklyVolume(
+        weeks,
+        [CATEGORIES[c] for c in codes],
+        total(repetitions * weights),
+        total(repetitions),
+        total(None)
+    )
+
+
+def one_rep_max(weights: np.ndarray, repetitions: np.ndarray) -> np.ndarray:
+    """Estimate the one rep max with the Epley formula.
+
+    NaN for the sets without weight or repetitions and for the sets with more
+    than MAX_ONE_REP_MAX_REPETITIONS repetitions.
+    """
+    valid: np.ndarray = (
+        (weights > 0) & (repetitions >= 1)
+        & (repetitions <= MAX_ONE_REP_MAX_REPETITIONS)
+    )
+    estimates: np.ndarray = np.where(
+        repetitions == 1, weights, weights * (1 + repetitions / 30)
+    )
+    return np.where(valid, estimates, np.nan)
+
+
+def one_rep_max_trend(
+        table: SetTable,
+        category: str,
+        date_from: date | None = None,
+        date_to: date | None = None
+) -> OneRepMaxTrend:
+    """Return the best estimated one rep max (see one_rep_max) of each day the
+    exercise category was done between both days (included).
+    """
+    days: np.ndarray = table.column("day")
+    estimates: np.ndarray = one_rep_max(
+        table.column("weight"), table.column("repetitions")
+    )
+    selected: np.ndarray = (
+        (table.column("category") == _category_code(category))
+        & ~np.isnan(estimates) & in_dates(days, date_from, date_to)
+    )
+    dates, day_index = np.unique(days[selected], return_inverse=True)
+    best: np.ndarray = np.full(len(dates), -np.inf)
+    np.maximum.at(best, day_index, estimates[selected])
+    return OneRepMaxTrend(dates, best)
+
+
+def rest_stats(table: SetTable) -> RestStats:
+    """Compute the number, total and mean duration of the rest intervals of
+    every activity in the table.
+    """
+    activity: np.ndarray = table.column("activity")
+    rest: np.ndarray = (table.column("category") == _REST_CODE) & ~np.isnan(
+        table.column("duration")
+    )
+    size: int = len(table.activity_ids)
+    count: np.ndarray = np.bincount(activity[rest], minlength=size)
+    total: np.ndarray = np.bincount(
+        activity[rest], weights=table.column("duration")[rest], minlength=size
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean: np.ndarray = total / count
+    return RestStats(table.activity_ids, count, total, mean)
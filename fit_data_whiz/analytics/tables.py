@@ -0,0 +1,98 @@
+from datetime import date
+
+import numpy as np
+
+from fit_data_whiz.utils.timezones import TimeZone, default_time_zone
+
+
+def nan(value: float | None) -> float:
+    return np.nan if value is None else value
+
+
+def week_starts(days: np.ndarray) -> np.ndarray:
+    """Return the monday of the week of each day (datetime64[D])."""
+    # 1970-01-01 was a thursday.
+    offsets: np.ndarray = (days.astype(np.int64) + 3) % 7
+    return days - offsets.astype("timedelta64[D]")
+
+
+def in_dates(
+        days: np.ndarray, date_from: date | None, date_to: date | None
+) -> np.ndarray:
+    """Return which days are between both days (included)."""
+    selected: np.ndarray = np.ones(len(days), dtype=bool)
+    if date_from is not None:
+        selected &= days >= np.datetime64(date_from, "D")
+    if date_to is not None:
+        selected &= days <= np.datetime64(date_to, "D")
+    return selected
+
+
+class ActivityTable:
+    """Columnar table of the rows (sets, climbs...) of many activities.
+
+    Every column (see COLUMNS) is a NumPy array with one value per row, NaN
+    for missing values, so the aggregations over years of activities are a
+    few vectorized operations. The activity column has the position of the
+    activity id of each row in activity_ids.
+
+    Activities are kept apart and concatenated the first time the columns are
+    read after adding or removing some.
+
+    Local dates of the activities are computed in time_zone (the default one
+    if it isn't given, see utils.timezones).
+    """
+
+    # Columns (but activity) and their types.
+    COLUMNS: dict[str, str] = {}
+
+    def __init__(self, time_zone: TimeZone | None = None) -> None:
+        self.time_zone: TimeZone = time_zone or default_time_zone()
+        # Activity id -> columns of its rows.
+        self._activities: dict[str, dict[str, np.ndarray]] = {}
+        self._columns: dict[str, np.ndarray] | None = None
+
+    def __len__(self) -> int:
+        return len(self.columns["activity"])
+
+    def __contains__(self, activity_id: str) -> bool:
+        return activity_id in self._activities
+
+    def add_columns(self, activity_id: str, columns: dict[str, np.ndarray]) -> None:
+        """Add (or replace) the rows of an activity."""
+        self._activities[activity_id] = {
+            name: np.asarray(columns[name], dtype=dtype)
+            for name, dtype in self.COLUMNS.items()
+        }
+        self._columns = None
+
+    def remove(self, activity_id: str) -> bool:
+        if self._activities.pop(activity_id, None) is None:
+            return False
+        self._columns = None
+        return True
+
+    @property
+    def activity_ids(self) -> list[str]:
+        """Activity ids by the values of the activity column."""
+        return list(self._activities)
+
+    @property
+    def columns(self) -> dict[str, np.ndarray]:
+        if self._columns is None:
+            activities: list[dict[str, np.ndarray]] = list(self._activities.values())
+            sizes: list[int] = [
+                len(next(iter(c.values()))) if c else 0 for c in activities
+            ]
+            self._columns = {
+                "activity": np.repeat(np.arange(len(sizes), dtype=np.int32), sizes)
+            }
+            for name, dtype in self.COLUMNS.items():
+                self._columns[name] = (
+                    np.concatenate([c[name] for c in activities])
+                    if activities else np.empty(0, dtype=dtype)
+                )
+        return self._columns
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name]
@@ -0,0 +1,242 @@
+from collections import namedtuple
+from datetime import date, timedelta
+from math import exp
+
+import numpy as np
+
+from fit_data_whiz.fit.models import SessionModel
+from fit_data_whiz.fit.results import FitActivity
+from fit_data_whiz.utils.array_utils import exponential_moving_average
+from fit_data_whiz.utils.timezones import TimeZone, default_time_zone
+
+# Time constants (days) of the acute (fatigue) and chronic (fitness) loads.
+ACUTE_LOAD_DAYS = 7
+CHRONIC_LOAD_DAYS = 42
+# Load of each point of total training effect (0 to 5): a session of 3.0 is
+# close to the TRIMP of an hour at 60% of the heart rate reserve.
+TRAINING_EFFECT_LOAD = 25.0
+
+TrainingLoadDay = namedtuple(
+    "TrainingLoadDay", [
+        "date",
+        "load",  # total load of the day
+        "atl",   # acute training load at the end of the day
+        "ctl",   # chronic training load at the end of the day
+        "tsb"    # training stress balance (form) at the start of the day
+    ]
+)
+TrainingLoadSeries = namedtuple(
+    "TrainingLoadSeries", [
+        "dates",  # datetime64[D] array
+        "load",
+        "atl",
+        "ctl",
+        "tsb"
+    ]
+)
+
+
+def session_load(
+        session: SessionModel,
+        max_heart_rate: int | None = None,
+        resting_heart_rate: int | None = None
+) -> float | None:
+    """Return the training load of a session.
+
+    It's the training_load_peak of the session if the device recorded it.
+    Otherwise, if both max_heart_rate and resting_heart_rate are given, it's
+    the Banister TRIMP computed from the average heart rate and the timer
+    time. Otherwise it's the total_training_effect of the session scaled by
+    TRAINING_EFFECT_LOAD. None if none can be computed.
+    """
+    if session.training_load_peak is not None:
+        return float(session.training_load_peak)
+    if (
+            max_heart_rate is None or resting_heart_rate is None
+            or session.avg_heart_rate is None or not session.total_timer_time
+            or max_heart_rate <= resting_heart_rate
+    ):
+        if session.total_training_effect is not None:
+            return session.total_training_effect * TRAINING_EFFECT_LOAD
+        return None
+    reserve: float = (session.avg_heart_rate - resting_heart_rate) / (
+        max_heart_rate - resting_heart_rate
+    )
+    reserve = min(max(reserve, 0.0), 1.0)
+    return session.total_timer_time / 60 * reserve * 0.64 * exp(1.92 * reserve)
+
+
+class TrainingLoad:
+    """Daily acute and chronic training loads of many activities.
+
+    Loads of the activities are summed per local day and the acute (ATL) and
+    chronic (CTL) loads are exponentially weighted averages of the daily
+    totals. Adding, removing or back-filling an activity only recomputes the
+    series from its day forward, and any day is read in O(1).
+
+    Local days of the activities are computed in time_zone (the default one if
+    it isn't given, see utils.timezones).
+
+    Example:
+        training_load = TrainingLoad()
+        training_load.add_activity(activity_id, fit_activity)
+        training_load.at(date.today()).tsb
+    """
+
+    def __init__(
+            self,
+            acute_days: float = ACUTE_LOAD_DAYS,
+            chronic_days: float = CHRONIC_LOAD_DAYS,
+            time_zone: TimeZone | None = None
+    ) -> None:
+        self.time_zone: TimeZone = time_zone or default_time_zone()
+        self._acute_alpha: float = 1 - exp(-1 / acute_days)
+        self._chronic_alpha: float = 1 - exp(-1 / chronic_days)
+        # Activity id -> (day, load)
+        self._activities: dict[str, tuple[date, float]] = {}
+        self.first_day: date | None = None
+        self.loads: np.ndarray = np.empty(0)
+        self.atl: np.ndarray = np.empty(0)
+        self.ctl: np.ndarray = np.empty(0)
+
+    def __len__(self) -> int:
+        return len(self._activities)
+
+    @property
+    def last_day(self) -> date | None:
+        if self.first_day is None:
+            return None
+        return self.first_day + timedelta(days=len(self.loads) - 1)
+
+    def add(self, activity_id: str, day: date, load: float) -> None:
+        """Add (or replace) the load of an activity done on day (local)."""
+        previous: tuple[date, float] | None = self._activities.pop(activity_id, None)
+        affected: int = self._extend(day)
+        if previous is not None:
+            self.loads[self._index(previous[0])] -= previous[1]
+            affected = min(affected, self._index(previous[0]))
+
+        index: int = self._index(day)
+        self.loads[index] += load
+        self._activities[activity_id] = (day, load)
+        self._recompute(min(affected, index))
+
+    def add_activity(
+            self,
+            activity_id: str,
+            activity: FitActivity,
+            max_heart_rate: int | None = None,
+            resting_heart_rate: int | None = None
+    ) -> float | None:
+        """Add the load of activity (see session_load) and return it, or None if
+        the activity has no load.
+        """
+        session: SessionModel = activity.model.session
+        load: float | None = session_load(session, max_heart_rate, resting_heart_rate)
+        if load is not None:
+            day: date = self.time_zone.to_local(session.start_time).date()
+            self.add(activity_id, day, load)
+        return load
+
+    def remove(self, activity_id: str) -> bool:
+        previous: tuple[date, float] | None = self._activities.pop(activity_id, None)
+        if previous is None:
+            return False
+        index: int = self._index(previous[0])
+        self.loads[index] -= previous[1]
+        self._recompute(index)
+        return True
+
+    def at(self, day: date) -> TrainingLoadDay:
+        """Return the loads of day.
+
+        Days after the last one with activities decay without load.
+        """
+        if self.first_day is None or day < self.first_day:
+            return TrainingLoadDay(day, 0.0, 0.0, 0.0, 0.0)
+
+        index: int = self._index(day)
+        last: int = len(self.loads) - 1
+        if index <= last:
+            atl, ctl = float(self.atl[index]), float(self.ctl[index])
+            tsb: float = (
+                float(self.ctl[index - 1] - self.atl[index - 1]) if index > 0 else 0.0
+            )
+            return TrainingLoadDay(day, float(self.loads[index]), atl, ctl, tsb)
+
+        acute_decay: float = 1 - self._acute_alpha
+        chronic_decay: float = 1 - self._chronic_alpha
+        days: int = index - last
+        atl_before: float = float(self.atl[last]) * acute_decay ** (days - 1)
+        ctl_before: float = float(self.ctl[last]) * chronic_decay ** (days - 1)
+        return TrainingLoadDay(
+            day,
+            0.0,
+            atl_before * acute_decay,
+            ctl_before * chronic_decay,
+            ctl_before - atl_before
+        )
+
+    def series(
+            self, date_from: date | None = None, date_to: date | None = None
+    ) -> TrainingLoadSeries:
+        """Return the daily loads between both days (included), limited to the
+        days with the series computed.
+        """
+        if self.first_day is None:
+            empty: np.ndarray = np.empty(0)
+            return TrainingLoadSeries(
+                np.empty(0, "datetime64[D]"), empty, empty, empty, empty
+            )
+
+        start: int = max(self._index(date_from), 0) if date_from is not None else 0
+        stop: int = (
+            min(self._index(date_to) + 1, len(self.loads))
+            if date_to is not None else len(self.loads)
+        )
+        stop = max(stop, start)
+        form: np.ndarray = np.concatenate(([0.0], self.ctl[:-1] - self.atl[:-1]))
+        return TrainingLoadSeries(
+            np.datetime64(self.first_day, "D") + np.arange(start, stop),
+            self.loads[start:stop],
+            self.atl[start:stop],
+            self.ctl[start:stop],
+            form[start:stop]
+        )
+
+    def _index(self, day: date) -> int:
+        return (day - self.first_day).days
+
+    def _extend(self, day: date) -> int:
+        """Make room for day in the series and return the first index whose
+        loads must be recomputed.
+        """
+        if self.first_day is None:
+            self.first_day = day
+            self._resize(0, 1)
+            return 0
+        if day < self.first_day:
+            self._resize((self.first_day - day).days, 0)
+            self.first_day = day
+            return 0
+        if day > self.last_day:
+            size: int = len(self.loads)
+            self._resize(0, (day - self.last_day).days)
+            return size
+        return len(self.loads)
+
+    def _resize(self, before: int, after: int) -> None:
+        self.loads = np.pad(self.loads, (before, after))
+        self.atl = np.pad(self.atl, (before, after))
+        self.ctl = np.pad(self.ctl, (before, after))
+
+    def _recompute(self, index: int) -> None:
+        if index >= len(self.loads):
+            return
+        loads: np.ndarray = self.loads[index:]
+        self.atl[index:] = exponential_moving_average(
+            loads, self._acute_alpha, float(self.atl[index - 1]) if index > 0 else 0.0
+        )
+        self.ctl[index:] = exponential_moving_average(
+            loads, self._chronic_alpha, float(self.ctl[index - 1]) if index > 0 else 0.0
+        )
@@ -0,0 +1,174 @@
+from collections import namedtuple
+
+from fit_data_whiz.fit.models import LapModel
+from fit_data_whiz.fit.results import FitActivity, FitWorkout, FitWorkoutStep
+
+StepStats = namedtuple(
+    "StepStats", [
+        "step_index",      # message_index of the workout step
+        "name",
+        "intensity",       # warmup, active, rest...
+        "laps",            # positions of the laps of the step
+        "elapsed",         # seconds
+        "timer",           # seconds
+        "distance",        # meters
+        "avg_heart_rate",  # weighted by the timer time of the laps
+        "avg_speed",       # m/s
+        "avg_power",       # weighted by the timer time of the laps
+        "target_type",     # heart_rate, speed, power... or None
+        "target_low",      # bpm, m/s or watts
+        "target_high",
+        "in_target"        # whether the average is in the target range, or None
+    ]
+)
+RepeatStats = namedtuple(
+    "RepeatStats", [
+        "step_index",   # message_index of the repeat step
+        "first_step",   # message_index of the first step repeated
+        "planned",      # repetitions in the workout
+        "repetitions"   # list of the StepStats of each repetition done
+    ]
+)
+
+
+def laps_by_step(laps: list[LapModel]) -> dict[int, list[int]]:
+    """Map each workout step index to the positions of its laps, in one pass.
+
+    Laps without workout step aren't mapped.
+    """
+    steps: dict[int, list[int]] = {}
+    for position, lap in enumerate(laps):
+        if lap.wkt_step_index is not None:
+            steps.setdefault(lap.wkt_step_index, []).append(position)
+    return steps
+
+
+def _weighted_average(values: list[tuple[float | None, float]]) -> float | None:
+    """Average of the (value, weight) pairs with value."""
+    total: float = sum(weight for value, weight in values if value is not None)
+    if not total:
+        return None
+    return sum(value * weight for value, weight in values if value is not None) / total
+
+
+def _step_stats(
+        step_index: int,
+        step: FitWorkoutStep | None,
+        laps: list[LapModel],
+        positions: list[int]
+) -> StepStats:
+    step_laps: list[LapModel] = [laps[p] for p in positions]
+    elapsed: float = sum(lap.total_elapsed_time or 0.0 for lap in step_laps)
+    timer: float = sum(lap.total_timer_time or 0.0 for lap in step_laps)
+    distance: float = sum(lap.total_distance or 0.0 for lap in step_laps)
+    avg_heart_rate: float | None = _weighted_average(
+        [(lap.avg_heart_rate, lap.total_timer_time or 0.0) for lap in step_laps]
+    )
+    avg_power: float | None = _weighted_average(
+        [(lap.avg_power, lap.total_timer_time or 0.0) for lap in step_laps]
+    )
+    avg_speed: float | None = distance / timer if timer and distance else None
+
+    target_type: str | None = step.target_type if step is not None else None
+    target_low: float | None = step.target_low if step is not None else None
+    target_high: float | None = step.target_high if step is not None else None
+    value: float | None = {
+        "heart_rate": avg_heart_rate, "speed": avg_speed, "power": avg_power
+    }.get(target_type)
+    in_target: bool | None = (
+        target_low <= value <= target_high
+        if None not in (value, target_low, target_high) else None
+    )
+    return StepStats(
+        step_index,
+        step.name if step is not None else None,
+        step.intensity if step is not None else None,
+        positions,
+        elapsed,
+        timer,
+        distance,
+        avg_heart_rate,
+        avg_speed,
+        avg_power,
+        target_type,
+        target_low,
+        target_high,
+        in_target
+    )
+
+
+def _activity_laps(activity: FitActivity) -> list[LapModel]:
+    return getattr(activity.model, "laps", [])
+
+
+def workout_step_stats(activity: FitActivity) -> list[StepStats]:
+    """Compute the aggregated stats of each workout step of activity.
+
+    Every step (but the repeat ones) of the workout is returned in order,
+    even if it has no laps. If the activity has no workout, the steps are the
+    workout step indexes of the laps.
+
+    Only the laps are read, so it's cheap enough to run over many activities.
+    """
+    laps: list[LapModel] = _activity_laps(activity)
+    steps_laps: dict[int, list[int]] = laps_by_step(laps)
+    workout: FitWorkout | None = activity.workout
+    if workout is None:
+        return [
+            _step_stats(index, None, laps, positions)
+            for index, positions in sorted(steps_laps.items())
+        ]
+    return [
+        _step_stats(
+            step.message_index, step, laps, steps_laps.get(step.message_index, [])
+        )
+        for step in workout.steps
+        if not step.is_repeat
+    ]
+
+
+def workout_repeats(activity: FitActivity) -> list[RepeatStats]:
+    """Compute the stats of every repetition of each repeat step of activity.
+
+    A repetition starts when the laps go back to a previous step of the
+    block (or on every lap if only one step is repeated). Each repetition has
+    the StepStats of its steps, in order, so the intervals of a session can
+    be compared with each other.
+    """
+    workout: FitWorkout | None = activity.workout
+    if workout is None:
+        return []
+
+    laps: list[LapModel] = _activity_laps(activity)
+    steps: dict[int, FitWorkoutStep] = {s.message_index: s for s in workout.steps}
+    result: list[RepeatStats] = []
+    for repeat in workout.steps:
+        if not repeat.is_repeat or repeat.repeat_from is None:
+            continue
+
+        # Lap positions of each step of each repetition.
+        single_step: bool = repeat.message_index - repeat.repeat_from == 1
+        repetitions: list[dict[int, list[int]]] = []
+        previous: int | None = None
+        for position, lap in enumerate(laps):
+            index: int | None = lap.wkt_step_index
+            if index is None or not repeat.repeat_from <= index < repeat.message_index:
+                continue
+            if previous is None or index < previous or single_step:
+                repetitions.append({})
+            repetitions[-1].setdefault(index, []).append(position)
+            previous = index
+
+        result.append(RepeatStats(
+            repeat.message_index,
+            repeat.repeat_from,
+            repeat.repetitions,
+            [
+                [
+                    _step_stats(index, steps.get(index), laps, positions)
+                    for index, positions in repetition.items()
+                ]
+                for repetition in repetitions
+            ]
+        ))
+    return result
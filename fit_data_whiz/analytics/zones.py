@@ -0,0 +1,162 @@
+from collections import namedtuple
+
+import numpy as np
+
+from fit_data_whiz.analytics.moving import MAX_RECORDING_GAP
+from fit_data_whiz.fit.models import TimeInZoneModel
+from fit_data_whiz.fit.results import FitDistanceActivity, FitMonitor
+
+# Monitoring heart rates are logged every few minutes, so the gap they can
+# span (seconds) is longer than the activity records one.
+MAX_MONITORING_GAP = 600
+
+# TIME_IN_ZONE reference messages.
+SESSION_REFERENCE = "session"
+LAP_REFERENCE = "lap"
+
+# TIME_IN_ZONE fields of each record column that has zones.
+ZONE_FIELDS: dict[str, tuple[str, str]] = {
+    "heart_rate": ("time_in_hr_zone", "hr_zone_high_boundary"),
+    "power": ("time_in_power_zone", "power_zone_high_boundary"),
+    "speed": ("time_in_speed_zone", "speed_zone_high_boundary")
+}
+
+TimeInZones = namedtuple(
+    "TimeInZones", [
+        "boundaries",  # upper boundary (included) of every zone but the last
+        "seconds"      # seconds in each zone: len(boundaries) + 1 values
+    ]
+)
+
+
+def time_in_zones(
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        boundaries: list[float],
+        max_gap: float = MAX_RECORDING_GAP
+) -> TimeInZones:
+    """Compute the seconds spent in each zone.
+
+    Every interval between two samples belongs to the zone of the value at its
+    start. Intervals longer than max_gap and samples without value (NaN)
+    aren't counted. Zone i holds the values from boundaries[i - 1] (excluded)
+    to boundaries[i] (included).
+    """
+    zones_count: int = len(boundaries) + 1
+    if len(timestamps) < 2:
+        return TimeInZones(list(boundaries), np.zeros(zones_count))
+
+    deltas: np.ndarray = np.diff(timestamps).astype(np.float64)
+    starts: np.ndarray = values[:-1]
+    counted: np.ndarray = (deltas <= max_gap) & ~np.isnan(starts)
+    zones: np.ndarray = np.searchsorted(
+        np.asarray(boundaries, dtype=np.float64), starts[counted], side="left"
+    )
+    seconds: np.ndarray = np.bincount(
+        zones, weights=deltas[counted], minlength=zones_count
+    )
+    return TimeInZones(list(boundaries), seconds)
+
+
+def _message_zones(
+        message: TimeInZoneModel, column: str, boundaries: list[float] | None
+) -> TimeInZones | None:
+    """Return the zones of the TIME_IN_ZONE message if it has them for column
+    and the same boundaries (if given).
+
+    Devices write the high boundary of every zone or of all but the last one,
+    so the boundary of the last zone is dropped when there are as many as
+    seconds. Messages with other lengths or missing boundaries aren't valid.
+    """
+    seconds_field, boundaries_field = ZONE_FIELDS.get(column, (None, None))
+    if seconds_field is None:
+        return None
+    seconds: list | None = getattr(message, seconds_field)
+    message_boundaries: list | None = getattr(message, boundaries_field)
+    if not seconds or not message_boundaries or None in message_boundaries:
+        return None
+    if len(message_boundaries) == len(seconds):
+        message_boundaries = message_boundaries[:-1]
+    if len(seconds) != len(message_boundaries) + 1:
+        return None
+    if boundaries is not None and list(boundaries) != message_boundaries:
+        return None
+    return TimeInZones(
+        message_boundaries, np.array([s or 0.0 for s in seconds], dtype=np.float64)
+    )
+
+
+def _find_message(
+        activity: FitDistanceActivity, reference: str, index: int | None = None
+) -> TimeInZoneModel | None:
+    for message in activity.model.time_in_zones:
+        if str(message.reference_mesg) != reference:
+            continue
+        if index is None or message.reference_index == index:
+            return message
+    return None
+
+
+def activity_time_in_zones(
+        activity: FitDistanceActivity,
+        boundaries: list[float] | None = None,
+        column: str = "heart_rate",
+        max_gap: float = MAX_RECORDING_GAP
+) -> TimeInZones | None:
+    """Compute the time in zones of a record column (heart_rate, power...)
+    in the whole activity.
+
+    If the FIT file has a valid TIME_IN_ZONE message of the session with the
+    same boundaries (or boundaries aren't given) its values are returned
+    without reading the records (see _message_zones). Otherwise boundaries are
+    needed, so None is returned without them.
+    """
+    message: TimeInZoneModel | None = _find_message(activity, SESSION_REFERENCE)
+    zones: TimeInZones | None = (
+        _message_zones(message, column, boundaries) if message is not None else None
+    )
+    if zones is not None or boundaries is None:
+        return zones
+
+    records = activity.record_arrays
+    return time_in_zones(records.timestamp, records.column(column), boundaries, max_gap)
+
+
+def laps_time_in_zones(
+        activity: FitDistanceActivity,
+        boundaries: list[float] | None = None,
+        column: str = "heart_rate",
+        max_gap: float = MAX_RECORDING_GAP
+) -> list[TimeInZones | None]:
+    """Compute the time in zones of every lap (see activity_time_in_zones)."""
+    records = activity.record_arrays
+    result: list[TimeInZones | None] = []
+    for lap, (start, stop) in zip(activity.laps, activity.lap_ranges):
+        message: TimeInZoneModel | None = _find_message(
+            activity, LAP_REFERENCE, lap.message_index
+        )
+        zones: TimeInZones | None = (
+            _message_zones(message, column, boundaries) if message is not None
+            else None
+        )
+        if zones is None and boundaries is not None:
+            lap_records = records.slice(start, stop)
+            zones = time_in_zones(
+                lap_records.timestamp, lap_records.column(column), boundaries, max_gap
+            )
+        result.append(zones)
+    return result
+
+
+def monitor_time_in_zones(
+        monitor: FitMonitor,
+        boundaries: list[float],
+        max_gap: float = MAX_MONITORING_GAP
+) -> TimeInZones:
+    """Compute the heart rate time in zones of a whole monitoring day."""
+    series = monitor.heart_rate_series
+    order: np.ndarray = np.argsort(series.timestamp, kind="stable")
+    return time_in_zones(
+        series.timestamp[order], series.values[order].astype(np.float64), boundaries,
+        max_gap
+    )
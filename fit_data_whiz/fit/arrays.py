@@ -0,0 +1,283 @@
+from collections.abc import Sequence
+from datetime import datetime
+
+import numpy as np
+
+from fit_data_whiz.fit.models import MonitoringModel, RecordModel
+
+# FIT positions are in semicircles.
+SEMICIRCLES_TO_DEGREES = 180 / 2 ** 31
+
+# FIT timestamps are seconds since 1989-12-31T00:00:00Z: this many seconds
+# after the POSIX epoch.
+FIT_EPOCH_OFFSET = 631065600
+
+# timestamp_16 fields are the lower 16 bits of a FIT timestamp.
+TIMESTAMP_16_MASK = 0xFFFF
+
+# Columns of RecordArrays.
+# Each column is built from the first RecordModel field whose value is not
+# None, in the order given (0 is a valid value).
+RECORD_ARRAY_COLUMNS: dict[str, tuple[str, ...]] = {
+    "timestamp": ("timestamp",),
+    "position_lat": ("position_lat",),
+    "position_long": ("position_long",),
+    "distance": ("enhanced_distance", "distance"),
+    "speed": ("enhanced_speed", "speed"),
+    "altitude": ("enhanced_altitude", "altitude"),
+    "heart_rate": ("heart_rate",),
+    "cadence": ("cadence",),
+    "power": ("power",),
+    "temperature": ("temperature",)
+}
+
+
+def record_field_array(records: Sequence[RecordModel], field: str) -> np.ndarray:
+    """Return the values of a RecordModel field as an array.
+
+    timestamp is returned as int64 POSIX seconds. Any other field is returned
+    as float64 with NaN where the value is None.
+    """
+    if field == "timestamp":
+        return np.fromiter(
+            (r.timestamp.timestamp() for r in records), dtype=np.int64, count=len(records)
+        )
+    return np.array([getattr(r, field) for r in records], dtype=np.float64)
+
+
+class RecordArrays:
+    """Columnar, read only view of the records of an activity.
+
+    Every column (see RECORD_ARRAY_COLUMNS) is a NumPy array with one value
+    per record: timestamps are int64 POSIX seconds, positions are degrees and
+    the rest are float64 with NaN for missing values.
+
+    Columns are built the first time they are used, either from a list of
+    RecordModel or from raw columns (one array per RecordModel field, as the
+    ones returned by record_field_array). slice() returns NumPy views of the
+    columns instead of copies.
+    """
+    __slots__ = ("_records", "_raw_columns", "_columns", "_size", "_parent", "_range")
+
+    def __init__(
+            self,
+            records: Sequence[RecordModel] | None = None,
+            raw_columns: dict[str, np.ndarray] | None = None
+    ) -> None:
+        self._records: Sequence[RecordModel] = records if records is not None else []
+        self._raw_columns: dict[str, np.ndarray] = raw_columns or {}
+        self._columns: dict[str, np.ndarray] = {}
+        self._size: int = (
+            len(next(iter(self._raw_columns.values())))
+            if self._raw_columns else len(self._records)
+        )
+        # Records of a slice are the ones in range of the parent.
+        self._parent: RecordArrays | None = None
+        self._range: slice = slice(0, self._size)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self._columns:
+            self._columns[name] = self._build_column(name)
+        return self._columns[name]
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self.column("timestamp")
+
+    @property
+    def position_lat(self) -> np.ndarray:
+        return self.column("position_lat")
+
+    @property
+    def position_long(self) -> np.ndarray:
+        return self.column("position_long")
+
+    @property
+    def distance(self) -> np.ndarray:
+        return self.column("distance")
+
+    @property
+    def speed(self) -> np.ndarray:
+        return self.column("speed")
+
+    @property
+    def altitude(self) -> np.ndarray:
+        return self.column("altitude")
+
+    @property
+    def heart_rate(self) -> np.ndarray:
+        return self.column("heart_rate")
+
+    @property
+    def cadence(self) -> np.ndarray:
+        return self.column("cadence")
+
+    @property
+    def power(self) -> np.ndarray:
+        return self.column("power")
+
+    @property
+    def temperature(self) -> np.ndarray:
+        return self.column("temperature")
+
+    def slice(self, start: int, stop: int) -> "RecordArrays":
+        """Return the records from start to stop (excluded)."""
+        sliced = RecordArrays()
+        sliced._parent = self
+        sliced._range = slice(*slice(start, stop).indices(self._size)[:2])
+        sliced._size = max(sliced._range.stop - sliced._range.start, 0)
+        return sliced
+
+    def index_range(self, datetime_from: float, datetime_to: float) -> tuple[int, int]:
+        """Return the (start, stop) indexes of the records between both POSIX
+        timestamps (both included).
+        """
+        timestamps: np.ndarray = self.timestamp
+        return (
+            int(np.searchsorted(timestamps, datetime_from, side="left")),
+            int(np.searchsorted(timestamps, datetime_to, side="right"))
+        )
+
+    def _raw(self, field: str) -> np.ndarray | None:
+        if self._raw_columns:
+            return self._raw_columns.get(field)
+        return record_field_array(self._records, field)
+
+    def _build_column(self, name: str) -> np.ndarray:
+        if self._parent is not None:
+            return self._parent.column(name)[self._range]
+
+        if name == "timestamp":
+            timestamps: np.ndarray | None = self._raw("timestamp")
+            return (
+                timestamps.astype(np.int64, copy=False) if timestamps is not None
+                else np.zeros(self._size, dtype=np.int64)
+            )
+
+        column: np.ndarray = np.full(self._size, np.nan)
+        for field in RECORD_ARRAY_COLUMNS[name]:
+            missing: np.ndarray = np.isnan(column)
+            if not missing.any():
+                break
+            values: np.ndarray | None = self._raw(field)
+            if values is not None:
+                column[missing] = values[missing]
+
+        if name in ("position_lat", "position_long"):
+            column *= SEMICIRCLES_TO_DEGREES
+        return column
+
+
+class SequenceView(Sequence):
+    """Read only view of a range of a sequence (records, laps...).
+
+    Unlike slicing a list, nothing is copied: items are read from the
+    sequence when they are accessed.
+    """
+    __slots__ = ("_sequence", "_range")
+
+    def __init__(self, sequence: Sequence, start: int, stop: int) -> None:
+        self._sequence: Sequence = sequence
+        self._range: range = range(len(sequence))[start:stop]
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            indexes: range = self._range[index]
+            if indexes.step == 1:
+                return SequenceView(self._sequence, indexes.start, indexes.stop)
+            return [self._sequence[i] for i in indexes]
+        return self._sequence[self._range[index]]
+
+    def __iter__(self):
+        return map(self._sequence.__getitem__, self._range)
+
+
+def expand_timestamp_16(timestamps: np.ndarray, timestamps_16: np.ndarray) -> np.ndarray:
+    """Return the POSIX timestamps of messages with timestamp or timestamp_16.
+
+    timestamps are POSIX seconds and timestamps_16 the raw timestamp_16 values,
+    both in file order with -1 where the message doesn't have them. A
+    timestamp_16 is the time elapsed (modulo 2^16 seconds) since the previous
+    message with time, so each message is the last full timestamp plus the
+    cumulative sum of those increments. The counter rolling over is handled
+    as long as consecutive messages are less than 18 hours apart.
+
+    The result has -1 for the messages without time and for the ones before
+    the first full timestamp.
+    """
+    result: np.ndarray = np.full(len(timestamps), -1, dtype=np.int64)
+    full: np.ndarray = timestamps >= 0
+    timed: np.ndarray = np.flatnonzero(full | (timestamps_16 >= 0))
+    if len(timed) == 0:
+        return result
+
+    timed_full: np.ndarray = full[timed]
+    timed_timestamps: np.ndarray = timestamps[timed]
+    lower_bits: np.ndarray = np.where(
+        timed_full, timed_timestamps - FIT_EPOCH_OFFSET, timestamps_16[timed]
+    ) & TIMESTAMP_16_MASK
+    increments: np.ndarray = (
+        np.diff(lower_bits, prepend=lower_bits[0]) & TIMESTAMP_16_MASK
+    )
+    increments[timed_full] = 0
+    elapsed: np.ndarray = np.cumsum(increments)
+
+    last_full: np.ndarray = np.maximum.accumulate(
+        np.where(timed_full, np.arange(len(timed)), -1)
+    )
+    known: np.ndarray = last_full >= 0
+    anchors: np.ndarray = last_full[known]
+    result[timed[known]] = (
+        timed_timestamps[anchors] + elapsed[known] - elapsed[anchors]
+    )
+    return result
+
+
+def monitoring_timestamps(
+        monitorings: Sequence[MonitoringModel], reference: datetime | None = None
+) -> np.ndarray:
+    """Return the POSIX timestamps of the monitoring messages (see
+    expand_timestamp_16), -1 for the ones without time.
+
+    reference is the full timestamp before the first message, if any (the
+    monitoring_info one).
+    """
+    size: int = len(monitorings)
+    timestamps: np.ndarray = np.fromiter(
+        (int(m.timestamp.timestamp()) if m.timestamp is not None else -1
+         for m in monitorings),
+        dtype=np.int64, count=size
+    )
+    timestamps_16: np.ndarray = np.fromiter(
+        (m.timestamp_16 if m.timestamp_16 is not None else -1 for m in monitorings),
+        dtype=np.int64, count=size
+    )
+    if reference is None:
+        return expand_timestamp_16(timestamps, timestamps_16)
+    return expand_timestamp_16(
+        np.concatenate(([int(reference.timestamp())], timestamps)),
+        np.concatenate(([-1], timestamps_16))
+    )[1:]
+
+
+def run_length_encode(
+        timestamps: np.ndarray, values: np.ndarray, last_duration: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the runs (start, end, value) of consecutive equal values.
+
+    timestamps are the sorted POSIX seconds when each value starts. A run ends
+    when the next one starts, and the last one lasts last_duration seconds
+    from its last timestamp.
+    """
+    if len(timestamps) == 0:
+        return timestamps[:0], timestamps[:0], values[:0]
+    starts: np.ndarray = np.flatnonzero(np.diff(values) != 0) + 1
+    starts = np.concatenate(([0], starts))
+    ends: np.ndarray = np.append(timestamps[starts[1:]], timestamps[-1] + last_duration)
+    return timestamps[starts], ends, values[starts]
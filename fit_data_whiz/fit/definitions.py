@@ -7,6 +7,7 @@ from fit_data_whiz.fit.models import (
     SessionModel,
     SetModel,
     SplitModel,
+    TimeInZoneModel,
     WorkoutModel,
     WorkoutStepModel,
     MonitoringHrDataModel,
@@ -21,6 +22,18 @@ from fit_data_whiz.fit.models import (
 )
 
 
+# Messages decoded straight into an array with the values of one of its
+# fields, without a model per message (there can be thousands of them).
+# Each message has the name and number in the FIT SDK Profile and the field.
+ARRAY_MESSAGES = {
+    # Beat to beat (RR) intervals in seconds, up to 5 per message.
+    "HRV": {
+        "name": "HRV",
+        "num": 78,
+        "field": "time"
+    }
+}
+
 # All messages supported.
 # Each message (whose key is in the FIT SDK Profile) has:
 # - The name you can find in the FIT SDK Profile.
@@ -74,11 +87,11 @@ MESSAGES = {
         "num": 312,
         "model_cls": SplitModel
     },
-    # "TIME_IN_ZONE": {
-    #     "name": "TIME_IN_ZONE",
-    #     "num": 216,
-    #     "model_cls": None
-    # },
+    "TIME_IN_ZONE": {
+        "name": "TIME_IN_ZONE",
+        "num": 216,
+        "model_cls": TimeInZoneModel
+    },
     "SESSION": {
         "name": "SESSION",
         "num": 18,
@@ -167,6 +180,11 @@ class SplitType(StrEnum):
     UNKNOWN = "unknown"
 
 
+# Split's types by value, to look them up without building the enum members
+# list for every split.
+SPLIT_TYPES: dict[str, SplitType] = {t.value: t for t in SplitType}
+
+
 # Split's result.
 class ClimbResult(Enum):
     COMPLETED = 1
@@ -284,6 +302,12 @@ SLEEP_LEVEL = {
     3: "deep",
     4: "rem"
 }
+SLEEP_LEVEL_CODES = {name: code for code, name in SLEEP_LEVEL.items()}
+SLEEP_LEVEL_UNMEASURABLE = 0
+SLEEP_LEVEL_AWAKE = 1
+SLEEP_LEVEL_LIGHT = 2
+SLEEP_LEVEL_DEEP = 3
+SLEEP_LEVEL_REM = 4
 
 
 def is_distance_sport(sport: str) -> bool:
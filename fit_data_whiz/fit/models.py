@@ -1,6 +1,8 @@
+import hashlib
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field
 
 from fit_data_whiz.utils.date_utils import try_to_compute_local_datetime
 
@@ -13,6 +15,23 @@ class FileIdModel(BaseModel):
     product: int | None = None
     garmin_product: str | None = None
 
+    def fingerprint(self) -> str:
+        """Return a stable identifier of the FIT file.
+
+        The same file (or a copy of it) always has the same fingerprint, so it
+        can be used as a key to ingest a file more than once without
+        duplicating its data.
+        """
+        parts: list[str] = [
+            str(self.file_type),
+            str(self.serial_number),
+            self.time_created.isoformat() if self.time_created else "",
+            str(self.manufacturer),
+            str(self.product),
+            str(self.garmin_product)
+        ]
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
 
 class SessionModel(BaseModel):
     message_index: int
@@ -133,6 +152,9 @@ class LapModel(BaseModel):
     max_cadence: int | None = None
     max_running_cadence: int | None = None
 
+    avg_power: int | None = None
+    max_power: int | None = None
+
     total_ascent: int | None = None
     total_descent: int | None = None
     avg_altitude: float | None = None
@@ -285,6 +307,31 @@ class WorkoutStepModel(BaseModel):
     secondary_custom_target_power_high: int | None = None
 
 
+class TimeInZoneModel(BaseModel):
+    # Only the zones are used, so a message without timestamp is still valid.
+    timestamp: datetime | None = None
+    reference_mesg: str | int | None = None  # session or lap
+    reference_index: int | None = None  # message_index of the session or lap
+
+    # Seconds in each zone.
+    time_in_hr_zone: list[float | None] | None = None
+    time_in_speed_zone: list[float | None] | None = None
+    time_in_cadence_zone: list[float | None] | None = None
+    time_in_power_zone: list[float | None] | None = None
+
+    # Upper boundary of each zone.
+    hr_zone_high_boundary: list[int | None] | None = None
+    speed_zone_high_boundary: list[float | None] | None = None
+    power_zone_high_boundary: list[int | None] | None = None
+
+    hr_calc_type: str | int | None = None
+    max_heart_rate: int | None = None
+    resting_heart_rate: int | None = None
+    threshold_heart_rate: int | None = None
+    pwr_calc_type: str | int | None = None
+    functional_threshold_power: int | None = None
+
+
 class MonitoringInfoModel(BaseModel):
     timestamp: datetime
     local_timestamp: int | None = None
@@ -395,16 +442,32 @@ class SleepLevelModel(BaseModel):
     sleep_level: str | int | None = None  # see SLEEP_LEVEL in definitions
 
 
+def _empty_array() -> np.ndarray:
+    return np.empty(0)
+
+
 class ActivityModel(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     session: SessionModel
-    workout: WorkoutModel | None = None,
+    file_id: FileIdModel | None = None
+    workout: WorkoutModel | None = None
     workout_steps: list[WorkoutStepModel] = []
+    time_in_zones: list[TimeInZoneModel] = []
+    # Beat to beat (RR) intervals in seconds from the HRV messages.
+    rr_intervals: np.ndarray = Field(default_factory=_empty_array)
 
 
 class MultisportActivityModel(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     sessions: list[SessionModel]
+    file_id: FileIdModel | None = None
     records: list[RecordModel]
     laps: list[LapModel]
+    time_in_zones: list[TimeInZoneModel] = []
+    # Beat to beat (RR) intervals in seconds from the HRV messages.
+    rr_intervals: np.ndarray = Field(default_factory=_empty_array)
 
 
 class DistanceActivityModel(ActivityModel):
@@ -422,6 +485,7 @@ class SetActivityModel(ActivityModel):
 
 class MonitorModel(BaseModel):
     monitoring_info: MonitoringInfoModel
+    file_id: FileIdModel | None = None
     monitorings: list[MonitoringModel]
     hr_datas: list[MonitoringHrDataModel] = []
     stress_levels: list[StressLevelModel] = []
@@ -430,9 +494,11 @@ class MonitorModel(BaseModel):
 
 class HrvModel(BaseModel):
     summary: HrvStatusSummaryModel
+    file_id: FileIdModel | None = None
     values: list[HrvValueModel] = []
 
 
 class SleepModel(BaseModel):
     assessment: SleepAssessmentModel
+    file_id: FileIdModel | None = None
     levels: list[SleepLevelModel] = []
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
 from pydantic import ValidationError, BaseModel
 
 from fit_data_whiz.fit.results import (
@@ -24,6 +25,7 @@ from fit_data_whiz.fit.exceptions import (
     FitMessageValidationException
 )
 from fit_data_whiz.fit.models import (
+    FileIdModel,
     MultisportActivityModel,
     DistanceActivityModel,
     ClimbActivityModel,
@@ -42,17 +44,28 @@ from fit_data_whiz.fit.models import (
     HrvStatusSummaryModel,
     HrvValueModel
 )
+from fit_data_whiz.utils.timezones import TimeZone
 
 
 class FitAbstractParser(ABC):
     @abstractmethod
-    def __init__(self, fit_file_path: str, messages: dict[str, list[BaseModel]]) -> None:
+    def __init__(
+            self,
+            fit_file_path: str,
+            messages: dict[str, list[BaseModel]],
+            time_zone: TimeZone | None = None,
+            arrays: dict[str, np.ndarray] | None = None
+    ) -> None:
         pass
 
     @abstractmethod
     def parse(self) -> FitResult:
         pass
 
+    def _file_id(self) -> FileIdModel | None:
+        file_ids: list[FileIdModel] = self._messages.get("FILE_ID", [])
+        return file_ids[0] if file_ids else None
+
 
 class FitActivityParser(FitAbstractParser):
     """Parser for fit activity files.
@@ -63,9 +76,16 @@ class FitActivityParser(FitAbstractParser):
     Also, it handles the errors that save into an array of errors.
     """
 
-    def __init__(self, fit_file_path: str, messages: dict[str, list[BaseModel]]) -> None:
+    def __init__(
+            self,
+            fit_file_path: str,
+            messages: dict[str, list[BaseModel]],
+            time_zone: TimeZone | None = None,
+            arrays: dict[str, np.ndarray] | None = None
+    ) -> None:
         self._fit_file_path: str = fit_file_path
         self._messages: dict[str, list] = messages
+        self._arrays: dict[str, np.ndarray] = arrays or {}
 
     def parse(self) -> FitActivity | FitError:
         if not self._messages["SESSION"]:
@@ -89,6 +109,10 @@ class FitActivityParser(FitAbstractParser):
         except NotSupportedFitSportException as error:
             return FitError(self._fit_file_path, [error])
 
+    def _rr_intervals(self) -> np.ndarray:
+        rr_intervals: np.ndarray | None = self._arrays.get("HRV")
+        return rr_intervals if rr_intervals is not None else np.empty(0)
+
     def _supported_sport_in_session(self) -> bool:
         supported: list[str] = [n for k, v in SPORTS.items() for n in v.keys()]
         not_supported: list[str] = [
@@ -111,7 +135,10 @@ class FitActivityParser(FitAbstractParser):
             model = MultisportActivityModel(
                 sessions=[session_model for session_model in self._messages["SESSION"]],
                 records=[record_model for record_model in self._messages["RECORD"]],
-                laps=[lap_model for lap_model in self._messages["LAP"]]
+                laps=[lap_model for lap_model in self._messages["LAP"]],
+                time_in_zones=self._messages["TIME_IN_ZONE"],
+                rr_intervals=self._rr_intervals(),
+                file_id=self._file_id()
             )
             return FitMultisportActivity(fit_file_path, model)
 
@@ -127,7 +154,10 @@ class FitActivityParser(FitAbstractParser):
                 records=[r for r in self._messages["RECORD"]],
                 laps=[lap for lap in self._messages["LAP"]],
                 workout=workout,
-                workout_steps=workout_steps
+                workout_steps=workout_steps,
+                time_in_zones=self._messages["TIME_IN_ZONE"],
+                rr_intervals=self._rr_intervals(),
+                file_id=self._file_id()
             )
             return FitDistanceActivity(fit_file_path, model)
 
@@ -136,7 +166,10 @@ class FitActivityParser(FitAbstractParser):
                 session=session,
                 splits=[s for s in self._messages["SPLIT"]],
                 workout=workout,
-                workout_steps=workout_steps
+                workout_steps=workout_steps,
+                time_in_zones=self._messages["TIME_IN_ZONE"],
+                rr_intervals=self._rr_intervals(),
+                file_id=self._file_id()
             )
             return FitClimbActivity(fit_file_path, model)
 
@@ -145,7 +178,10 @@ class FitActivityParser(FitAbstractParser):
                 session=session,
                 sets=[s for s in self._messages["SET"]],
                 workout=workout,
-                workout_steps=workout_steps
+                workout_steps=workout_steps,
+                time_in_zones=self._messages["TIME_IN_ZONE"],
+                rr_intervals=self._rr_intervals(),
+                file_id=self._file_id()
             )
             return FitSetActivity(fit_file_path, model)
 
@@ -153,9 +189,16 @@ class FitActivityParser(FitAbstractParser):
 
 
 class FitMonitoringParser(FitAbstractParser):
-    def __init__(self, fit_file_path: str, messages: dict[str, list[BaseModel]]) -> None:
+    def __init__(
+            self,
+            fit_file_path: str,
+            messages: dict[str, list[BaseModel]],
+            time_zone: TimeZone | None = None,
+            arrays: dict[str, np.ndarray] | None = None
+    ) -> None:
         self._fit_file_path: str = fit_file_path
         self._messages: dict[str, list] = messages
+        self._time_zone: TimeZone | None = time_zone
 
     def parse(self) -> FitMonitor | FitError:
         if "MONITORING_INFO" not in self._messages:
@@ -204,13 +247,21 @@ class FitMonitoringParser(FitAbstractParser):
                 monitorings=monitorings,
                 hr_datas=hr_datas,
                 stress_levels=stress_levels,
-                respiration_rates=respiration_rates
-            )
+                respiration_rates=respiration_rates,
+                file_id=self._file_id()
+            ),
+            self._time_zone
         )
 
 
 class FitHrvParser(FitAbstractParser):
-    def __init__(self, fit_file_path: str, messages: dict[str, list[BaseModel]]) -> None:
+    def __init__(
+            self,
+            fit_file_path: str,
+            messages: dict[str, list[BaseModel]],
+            time_zone: TimeZone | None = None,
+            arrays: dict[str, np.ndarray] | None = None
+    ) -> None:
         self._fit_file_path: str = fit_file_path
         self._messages: dict[str, list[BaseModel]] = messages
 
@@ -236,16 +287,23 @@ class FitHrvParser(FitAbstractParser):
         try:
             summary: HrvStatusSummaryModel = self._messages["HRV_STATUS_SUMMARY"][0]
             values: list[HrvValueModel] = self._messages["HRV_VALUE"]
-            model = HrvModel(summary=summary, values=values)
+            model = HrvModel(summary=summary, values=values, file_id=self._file_id())
             return FitHrv(self._fit_file_path, model)
         except ValidationError as error:
             return FitError(self._fit_file_path, [FitMessageValidationException(error)])
 
 
 class FitSleepParser(FitAbstractParser):
-    def __init__(self, fit_file_path: str, messages: dict[str, list[BaseModel]]) -> None:
+    def __init__(
+            self,
+            fit_file_path: str,
+            messages: dict[str, list[BaseModel]],
+            time_zone: TimeZone | None = None,
+            arrays: dict[str, np.ndarray] | None = None
+    ) -> None:
         self._fit_file_path: str = fit_file_path
         self._messages: dict[str, list] = messages
+        self._time_zone: TimeZone | None = time_zone
 
     def parse(self) -> FitSleep | FitError:
         if "SLEEP_ASSESSMENT" not in self._messages:
@@ -275,7 +333,9 @@ class FitSleepParser(FitAbstractParser):
         try:
             assessment = self._messages["SLEEP_ASSESSMENT"][0]
             levels = [level for level in self._messages["SLEEP_LEVEL"]]
-            model = SleepModel(assessment=assessment, levels=levels)
-            return FitSleep(self._fit_file_path, model)
+            model = SleepModel(
+                assessment=assessment, levels=levels, file_id=self._file_id()
+            )
+            return FitSleep(self._fit_file_path, model, self._time_zone)
         except ValidationError as error:
             return FitError(self._fit_file_path, [FitMessageValidationException(error)])
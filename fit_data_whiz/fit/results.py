@@ -1,16 +1,25 @@
 from abc import ABC
-from datetime import date, datetime, timedelta
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone
 from collections import namedtuple
 
+import numpy as np
+
 from fit_data_whiz.fit.definitions import (
     HRV_STATUS,
     ACTIVITY_TYPES,
     ACTIVITY_TYPE_UNKNOWN,
     SplitType,
+    SPLIT_TYPES,
     ClimbResult,
     TRANSITION_SPORT,
     is_distance_sport,
-    SLEEP_LEVEL
+    SLEEP_LEVEL,
+    SLEEP_LEVEL_CODES,
+    SLEEP_LEVEL_UNMEASURABLE
+)
+from fit_data_whiz.fit.arrays import (
+    RecordArrays, SequenceView, monitoring_timestamps, run_length_encode
 )
 from fit_data_whiz.fit.models import (
     HrvModel,
@@ -34,10 +43,7 @@ from fit_data_whiz.fit.models import (
     SessionModel,
     RecordModel
 )
-from fit_data_whiz.utils.date_utils import (
-    try_to_compute_local_datetime,
-    combine_date_and_seconds
-)
+from fit_data_whiz.utils.timezones import SECONDS_PER_DAY, TimeZone, default_time_zone
 
 DoubleStat = namedtuple("DoubleStat", ["max", "avg"])
 TripleStat = namedtuple("TripleStat", ["max", "min", "avg"])
@@ -81,6 +87,10 @@ def filter_by_session(
     )
 
 
+def _record_timestamp(record: RecordModel) -> datetime:
+    return record.timestamp
+
+
 class FitResult(ABC):
     __slots__ = ("fit_file_path",)
 
@@ -97,10 +107,51 @@ class FitError(FitResult):
 
 
 class FitWorkoutStep:
-    __slots__ = ("message_index",)
+    __slots__ = (
+        "message_index", "name", "intensity", "duration_type", "duration_time",
+        "duration_distance", "target_type", "target_low", "target_high",
+        "repeat_from", "repetitions"
+    )
 
     def __init__(self, step: WorkoutStepModel) -> None:
-        self.message_index = step.message_index
+        self.message_index: int = step.message_index
+        self.name: str | None = step.wkt_step_name
+        self.intensity: str | None = step.intensity
+        self.duration_type: str | None = step.duration_type
+        self.duration_time: float | None = step.duration_time
+        self.duration_distance: float | None = step.duration_distance
+        self.target_type: str | None = step.target_type
+        # Target range in bpm, m/s or watts. None if there is no target or
+        # it's relative (% of max heart rate or FTP).
+        self.target_low: float | None = None
+        self.target_high: float | None = None
+        if self.target_type == "heart_rate":
+            self.target_low = _absolute(step.custom_target_heart_rate_low, 100)
+            self.target_high = _absolute(step.custom_target_heart_rate_high, 100)
+        elif self.target_type == "speed":
+            self.target_low = step.custom_target_speed_low
+            self.target_high = step.custom_target_speed_high
+        elif self.target_type == "power":
+            self.target_low = _absolute(step.custom_target_power_low, 1000)
+            self.target_high = _absolute(step.custom_target_power_high, 1000)
+        # Steps repeated by this one: from repeat_from to this step (excluded).
+        self.repeat_from: int | None = (
+            step.duration_step if self.is_repeat else None
+        )
+        self.repetitions: int | None = step.repeat_steps if self.is_repeat else None
+
+    @property
+    def is_repeat(self) -> bool:
+        return bool(self.duration_type and self.duration_type.startswith("repeat"))
+
+
+def _absolute(value: int | None, offset: int) -> float | None:
+    """Return the absolute value of a workout heart rate or power target.
+
+    Values above offset are absolute ones plus offset; the others are a
+    percentage of the max heart rate or FTP, so they aren't returned.
+    """
+    return float(value - offset) if value is not None and value > offset else None
 
 
 class FitWorkout:
@@ -109,13 +160,19 @@ class FitWorkout:
     def __init__(self, workout: WorkoutModel, steps: list[WorkoutStepModel]) -> None:
         self.name: str = workout.wkt_name
         self.sport: str = workout.sport
-        self.steps: list[WorkoutStepModel] = [WorkoutStepModel(s) for s in steps]
+        self.steps: list[FitWorkoutStep] = [FitWorkoutStep(s) for s in steps]
+
+    def step(self, message_index: int) -> FitWorkoutStep | None:
+        for step in self.steps:
+            if step.message_index == message_index:
+                return step
+        return None
 
 
 class FitActivity(FitResult):
     __slots__ = (
         "model", "name", "sport", "sub_sport", "time", "hr", "temperature",
-        "total_calories", "workout"
+        "total_calories", "workout", "rr_intervals"
     )
 
     def __init__(self, fit_file_path: str, model: ActivityModel) -> None:
@@ -143,6 +200,8 @@ class FitActivity(FitResult):
         self.workout = (
             FitWorkout(model.workout, model.workout_steps) if model.workout else None
         )
+        # Beat to beat intervals (seconds), empty without HRV messages.
+        self.rr_intervals: np.ndarray = model.rr_intervals
 
 
 class FitLap:
@@ -190,16 +249,24 @@ class FitLap:
 class FitDistanceActivity(FitActivity):
     __slots__ = (
         "start_location", "end_location", "total_distance", "speed", "cadence",
-        "altitude", "total_strides", "laps"
+        "altitude", "total_strides", "laps", "cache", "_record_arrays"
     )
 
-    def __init__(self, fit_file_path: str, model: DistanceActivityModel) -> None:
+    def __init__(
+            self,
+            fit_file_path: str,
+            model: DistanceActivityModel,
+            record_arrays: RecordArrays | None = None
+    ) -> None:
         super().__init__(fit_file_path, model)
+        self._record_arrays: RecordArrays = (
+            record_arrays if record_arrays is not None else RecordArrays(model.records)
+        )
+        # Values computed from the records by the analytics modules, by key.
+        self.cache: dict = {}
 
-        altitudes: list[float] = [
-            record.enhanced_altitude or record.altitude for record in model.records
-            if record.enhanced_altitude or record.altitude
-        ]
+        altitudes: np.ndarray = self._record_arrays.altitude
+        altitudes = altitudes[~np.isnan(altitudes)]
 
         self.total_distance: float | None = model.session.total_distance
         self.speed: DoubleStat = DoubleStat(
@@ -211,8 +278,8 @@ class FitDistanceActivity(FitActivity):
             avg=model.session.avg_cadence or model.session.avg_running_cadence
         )
         self.altitude: AltitudeStat = AltitudeStat(
-            max=max(altitudes) if altitudes else None,
-            min=min(altitudes) if altitudes else None,
+            max=float(altitudes.max()) if altitudes.size else None,
+            min=float(altitudes.min()) if altitudes.size else None,
             gain=model.session.total_ascent,
             loss=model.session.total_descent
         )
@@ -229,6 +296,29 @@ class FitDistanceActivity(FitActivity):
             lon=model.session.end_position_long
         )
 
+    @property
+    def record_arrays(self) -> RecordArrays:
+        """The records of the activity as NumPy arrays (see RecordArrays)."""
+        return self._record_arrays
+
+    @property
+    def lap_ranges(self) -> list[tuple[int, int]]:
+        """The (start, stop) indexes of the records of each lap in laps.
+
+        A lap without start time starts where the previous one ended.
+        """
+        ranges: list[tuple[int, int]] = []
+        lap_from: float | None = None
+        for lap in self.laps:
+            if lap.time.start_time is not None:
+                lap_from = lap.time.start_time.timestamp()
+            lap_to: float = lap.timestamp.timestamp()
+            ranges.append(self._record_arrays.index_range(
+                lap_from if lap_from is not None else lap_to, lap_to
+            ))
+            lap_from = lap_to
+        return ranges
+
 
 class FitClimb:
     __slots__ = ("time", "split_type", "hr", "total_calories", "difficulty", "result")
@@ -240,10 +330,7 @@ class FitClimb:
             elapsed=split.total_elapsed_time,
             timer=split.total_timer_time
         )
-        self.split_type: SplitType = (
-            split.split_type if split.split_type in list(SplitType)
-            else SplitType.UNKNOWN
-        )
+        self.split_type: SplitType = SPLIT_TYPES.get(split.split_type, SplitType.UNKNOWN)
         self.hr: DoubleStat = DoubleStat(max=split.max_hr, avg=split.avg_hr)
         self.total_calories: int = split.total_calories
         self.difficulty: int = split.difficulty
@@ -315,39 +402,91 @@ class FitTransitionActivity:
 
 
 class FitMultisportActivity(FitResult):
-    __slots__ = ("model", "fit_activities",)
-
-    def __init__(self, fit_file_path: str, model: MultisportActivityModel) -> None:
+    """Activity with many sessions (triathlon...), one child activity per
+    session in fit_activities.
+
+    Children of distance sessions are views of the multisport records: their
+    models (built without validating the records again) hold a SequenceView of
+    the records of the session and their RecordArrays are slices of the ones of
+    the whole file, so the columns are built once for all of them. Records are
+    in time order, as FIT files write them, so the records of a session are
+    found by binary search.
+    """
+    __slots__ = ("model", "fit_activities", "rr_intervals", "_record_arrays")
+
+    def __init__(
+            self,
+            fit_file_path: str,
+            model: MultisportActivityModel,
+            record_arrays: RecordArrays | None = None
+    ) -> None:
         super().__init__(fit_file_path)
         self.model: MultisportActivityModel = model
+        self._record_arrays: RecordArrays = (
+            record_arrays if record_arrays is not None else RecordArrays(model.records)
+        )
+        # Beat to beat intervals (seconds) of the whole file.
+        self.rr_intervals: np.ndarray = model.rr_intervals
         self.fit_activities: list[FitActivity] = []
 
         for session in model.sessions:
             if session.sport == TRANSITION_SPORT:
                 activity = FitTransitionActivity(session)
             elif is_distance_sport(session.sport):
-                session_records, session_laps = filter_by_session(
-                    session, model.records, model.laps
-                )
-                activity = FitDistanceActivity(
-                    fit_file_path,
-                    DistanceActivityModel(
-                        session=session,
-                        workout=None,
-                        workout_steps=[],
-                        records=session_records,
-                        laps=session_laps
-                    )
-                )
+                activity = self._session_view(fit_file_path, session)
             else:
                 activity = FitActivity(fit_file_path, ActivityModel(session=session))
             self.fit_activities.append(activity)
 
+    @property
+    def record_arrays(self) -> RecordArrays:
+        """The records of all sessions as NumPy arrays (see RecordArrays)."""
+        return self._record_arrays
+
+    def _session_view(
+            self, fit_file_path: str, session: SessionModel
+    ) -> FitDistanceActivity:
+        """Return the distance activity of session, with the same records and
+        laps filter_by_session returns.
+        """
+        start, stop = 0, 0
+        laps: list[LapModel] = []
+        if (
+                isinstance(session.start_time, datetime) and
+                isinstance(session.total_timer_time, int | float)
+        ):
+            datetime_from: datetime = session.start_time
+            datetime_to: datetime = (
+                datetime_from + timedelta(seconds=session.total_timer_time)
+            )
+            start = bisect_left(
+                self.model.records, datetime_from, key=_record_timestamp
+            )
+            stop = bisect_right(
+                self.model.records, datetime_to, lo=start, key=_record_timestamp
+            )
+            laps = [
+                lap for lap in self.model.laps
+                if datetime_from <= lap.timestamp <= datetime_to
+            ]
+        return FitDistanceActivity(
+            fit_file_path,
+            DistanceActivityModel.model_construct(
+                session=session,
+                workout=None,
+                workout_steps=[],
+                records=SequenceView(self.model.records, start, stop),
+                laps=laps
+            ),
+            self._record_arrays.slice(start, stop)
+        )
+
 
 class FitSteps:
-    __slots__ = ("steps", "distance", "calories")
+    __slots__ = ("steps", "distance", "calories", "datetime_utc")
 
     def __init__(self, monitoring: MonitoringModel) -> None:
+        self.datetime_utc: datetime | None = monitoring.timestamp
         self.steps = monitoring.steps or 0
         self.distance = monitoring.distance or 0
         self.calories = monitoring.active_calories or monitoring.calories or 0
@@ -356,15 +495,12 @@ class FitSteps:
 class FitHeartRate:
     __slots__ = ("heart_rate", "datetime_utc", "datetime_local")
 
-    def __init__(self, monitoring_date: date, monitoring: MonitoringModel) -> None:
-        self.heart_rate: int | None = monitoring.heart_rate
-        self.datetime_utc: datetime | None = combine_date_and_seconds(
-            monitoring_date, monitoring.timestamp_16
-        ) if monitoring.timestamp_16 is not None else None
-        self.datetime_local: datetime | None = (
-            try_to_compute_local_datetime(self.datetime_utc)
-            if self.datetime_utc is not None else None
-        )
+    def __init__(
+            self, heart_rate: int, datetime_utc: datetime, datetime_local: datetime
+    ) -> None:
+        self.heart_rate: int = heart_rate
+        self.datetime_utc: datetime = datetime_utc
+        self.datetime_local: datetime = datetime_local
 
 
 class FitActivityIntensity:
@@ -372,31 +508,48 @@ class FitActivityIntensity:
         "moderate_minutes", "vigorous_minutes", "datetime_utc", "datetime_local"
     )
 
-    def __init__(self, monitoring_date: date, monitoring: MonitoringModel) -> None:
+    def __init__(
+            self,
+            monitoring: MonitoringModel,
+            datetime_utc: datetime | None,
+            datetime_local: datetime | None
+    ) -> None:
         self.moderate_minutes: int = monitoring.moderate_activity_minutes or 0
         self.vigorous_minutes: int = monitoring.vigorous_activity_minutes or 0
-        self.datetime_utc: datetime | None = combine_date_and_seconds(
-            monitoring_date, monitoring.timestamp_16
-        ) if monitoring.timestamp_16 is not None else None
-        self.datetime_local: datetime | None = (
-            try_to_compute_local_datetime(self.datetime_utc)
-            if self.datetime_utc is not None else None
-        )
+        self.datetime_utc: datetime | None = datetime_utc
+        self.datetime_local: datetime | None = datetime_local
+
+
+MonitoringSeries = namedtuple(
+    "MonitoringSeries", [
+        "timestamp",        # int64 POSIX seconds
+        "local_timestamp",  # int64 seconds of the local time
+        "values"
+    ]
+)
 
 
 class FitMonitor(FitResult):
     __slots__ = (
-        "model", "datetime_utc", "datetime_local", "monitoring_date",
+        "model", "time_zone", "datetime_utc", "datetime_local", "monitoring_date",
         "metabolic_calories", "activities", "active_calories", "steps",
-        "heart_rates", "activity_intensities", "respiration_rates",
-        "stress_levels"
+        "total_steps", "ascent", "descent", "daily_logs", "timestamps",
+        "local_timestamps", "heart_rate_series", "_heart_rates",
+        "activity_intensities", "respiration_rates", "stress_levels",
+        "stress_series", "respiration_series"
     )
 
-    def __init__(self, fit_file_path: str, model: MonitorModel) -> None:
+    def __init__(
+            self,
+            fit_file_path: str,
+            model: MonitorModel,
+            time_zone: TimeZone | None = None
+    ) -> None:
         super().__init__(fit_file_path)
         self.model: MonitorModel = model
+        self.time_zone: TimeZone = time_zone or default_time_zone()
         self.datetime_utc: datetime = self.model.monitoring_info.timestamp
-        self.datetime_local: datetime = try_to_compute_local_datetime(self.datetime_utc)
+        self.datetime_local: datetime = self.time_zone.to_local(self.datetime_utc)
         self.monitoring_date: date = date(
             year=self.datetime_local.year,
             month=self.datetime_local.month,
@@ -406,37 +559,134 @@ class FitMonitor(FitResult):
             self.model.monitoring_info.resting_metabolic_rate or 0
         )
         self.activities: list[str] = self._activity_types_as_str()
-        self.active_calories: int = sum([
-            (value if value is not None else 0)
-            for m in self.model.monitorings if m.is_daily_log()
-            for value in [m.active_calories, m.calories] if value is not None
-        ])
-        self.steps: list[FitSteps] = [
-            FitSteps(m) for m in self.model.monitorings
-            if m.is_daily_log() and m.steps is not None
-        ]
-        self.heart_rates: list[FitHeartRate] = [
-            FitHeartRate(self.monitoring_date, m) for m in self.model.monitorings
-            if m.heart_rate is not None and m.timestamp_16 is not None
-        ]
-        self.activity_intensities: list[FitActivityIntensity] = [
-            FitActivityIntensity(self.monitoring_date, m) for m in self.model.monitorings
-            if m.timestamp_16 is not None and (
+
+        # Every message is classified in one pass, with the local times of all
+        # of them computed at once.
+        self.timestamps: np.ndarray = monitoring_timestamps(
+            self.model.monitorings, self.datetime_utc
+        )
+        self.local_timestamps: np.ndarray = self.time_zone.local_timestamps(
+            self.timestamps
+        )
+        daily_logs: list[bool] = (
+            (self.timestamps >= 0) & (self.local_timestamps % SECONDS_PER_DAY == 0)
+        ).tolist()
+        self.daily_logs: list[MonitoringModel] = []
+        self.active_calories: int = 0
+        self.steps: list[FitSteps] = []
+        self.ascent: float = 0.0
+        self.descent: float = 0.0
+        heart_rate_indexes: list[int] = []
+        heart_rates: list[int] = []
+        intensities: list[int] = []
+        for i, m in enumerate(self.model.monitorings):
+            if m.heart_rate is not None:
+                heart_rate_indexes.append(i)
+                heart_rates.append(m.heart_rate)
+            if (
                     m.moderate_activity_minutes is not None or
                     m.vigorous_activity_minutes is not None
+            ):
+                intensities.append(i)
+            if not m.timestamp or not daily_logs[i]:
+                continue
+            self.daily_logs.append(m)
+            for value in (m.active_calories, m.calories):
+                if value is not None:
+                    self.active_calories += value
+            if m.steps is not None:
+                self.steps.append(FitSteps(m))
+            self.ascent += m.ascent or 0.0
+            self.descent += m.descent or 0.0
+        self.total_steps: int = sum(steps.steps for steps in self.steps)
+
+        # Intraday series, without the messages whose time is unknown.
+        indexes: np.ndarray = np.array(heart_rate_indexes, dtype=np.int64)
+        timestamps: np.ndarray = self.timestamps[indexes]
+        timed: np.ndarray = timestamps >= 0
+        self.heart_rate_series: MonitoringSeries = MonitoringSeries(
+            timestamps[timed],
+            self.local_timestamps[indexes][timed],
+            np.array(heart_rates, dtype=np.int64)[timed]
+        )
+        self._heart_rates: list[FitHeartRate] | None = None
+        self.activity_intensities: list[FitActivityIntensity] = [
+            FitActivityIntensity(
+                self.model.monitorings[i], *self._datetimes(i)
             )
+            for i in intensities
         ]
+
         self.respiration_rates: list[RespirationRateModel] = self.model.respiration_rates
         self.stress_levels: list[StressLevelModel] = self.model.stress_levels
-
-    @property
-    def total_steps(self) -> int:
-        return sum([steps.steps for steps in self.steps])
+        # Negative stress levels are the times it couldn't be measured
+        # (off-wrist, motion...), so they aren't in the series.
+        measured: list[StressLevelModel] = [
+            s for s in self.stress_levels if s.stress_level_value >= 0
+        ]
+        self.stress_series: MonitoringSeries = self._series(
+            [s.stress_level_time for s in measured],
+            np.fromiter(
+                (s.stress_level_value for s in measured),
+                dtype=np.int64, count=len(measured)
+            )
+        )
+        self.respiration_series: MonitoringSeries = self._series(
+            [r.timestamp for r in self.respiration_rates],
+            np.fromiter(
+                (r.respiration_rate for r in self.respiration_rates),
+                dtype=np.float64, count=len(self.respiration_rates)
+            )
+        )
 
     @property
     def total_calories(self) -> int:
         return self.metabolic_calories + self.active_calories
 
+    @property
+    def heart_rates(self) -> list[FitHeartRate]:
+        """Heart rates as FitHeartRate, built from heart_rate_series the first
+        time they are used.
+        """
+        if self._heart_rates is None:
+            series: MonitoringSeries = self.heart_rate_series
+            self._heart_rates = [
+                FitHeartRate(
+                    heart_rate,
+                    datetime.fromtimestamp(utc, timezone.utc),
+                    datetime.fromtimestamp(local, timezone.utc)
+                )
+                for heart_rate, utc, local in zip(
+                    series.values.tolist(),
+                    series.timestamp.tolist(),
+                    series.local_timestamp.tolist()
+                )
+            ]
+        return self._heart_rates
+
+    def _series(self, datetimes: list[datetime], values: np.ndarray) -> MonitoringSeries:
+        """Return the series of the values at datetimes sorted by time."""
+        timestamps: np.ndarray = np.fromiter(
+            (int(dt.timestamp()) for dt in datetimes),
+            dtype=np.int64, count=len(datetimes)
+        )
+        order: np.ndarray = np.argsort(timestamps, kind="stable")
+        return MonitoringSeries(
+            timestamps[order],
+            self.time_zone.local_timestamps(timestamps[order]),
+            values[order]
+        )
+
+    def _datetimes(self, index: int) -> tuple[datetime | None, datetime | None]:
+        """Return the UTC and local datetimes of a monitoring message."""
+        timestamp: int = int(self.timestamps[index])
+        if timestamp < 0:
+            return None, None
+        return (
+            datetime.fromtimestamp(timestamp, timezone.utc),
+            datetime.fromtimestamp(int(self.local_timestamps[index]), timezone.utc)
+        )
+
     def _activity_types_as_str(self) -> list[str]:
         if self.model.monitoring_info.activity_type is None:
             return []
@@ -483,12 +733,34 @@ class FitHrv(FitResult):
         return self.model.summary.status
 
 
+# Seconds the last sleep level of a file lasts.
+SLEEP_LEVEL_INTERVAL = 60
+
+SleepTimeline = namedtuple(
+    "SleepTimeline", [
+        "start",  # int64 POSIX seconds
+        "end",    # int64 POSIX seconds, the start of the next run
+        "stage"   # int8 code of the sleep level (see SLEEP_LEVEL)
+    ]
+)
+
+
+def sleep_level_code(sleep_level: str | int) -> int:
+    if isinstance(sleep_level, str):
+        return SLEEP_LEVEL_CODES.get(sleep_level, SLEEP_LEVEL_UNMEASURABLE)
+    return sleep_level if sleep_level in SLEEP_LEVEL else SLEEP_LEVEL_UNMEASURABLE
+
+
 class FitSleepLevel:
     __slots__ = ("datetime_utc", "datetime_local", "level")
 
-    def __init__(self, level_model: SleepLevelModel) -> None:
+    def __init__(
+            self, level_model: SleepLevelModel, time_zone: TimeZone | None = None
+    ) -> None:
         self.datetime_utc: datetime = level_model.timestamp
-        self.datetime_local: datetime = try_to_compute_local_datetime(self.datetime_utc)
+        self.datetime_local: datetime = (
+            time_zone or default_time_zone()
+        ).to_local(self.datetime_utc)
         self.level: str = (
             level_model.sleep_level if isinstance(level_model.sleep_level, str) else (
                 SLEEP_LEVEL[level_model.sleep_level]
@@ -498,22 +770,51 @@ class FitSleepLevel:
 
 
 class FitSleep(FitResult):
+    """Sleep assessment and levels of a night.
+
+    The levels are kept as a run length encoded timeline (see SleepTimeline):
+    one run per stage change instead of one object per level message.
+    """
     __slots__ = (
-        "model", "dates", "levels", "combined_awake_score", "awake_time_score",
+        "model", "time_zone", "timeline", "dates", "_levels",
+        "combined_awake_score", "awake_time_score",
         "awakenings_count_score", "deep_sleep_score", "sleep_duration_score",
         "light_sleep_score", "overall_sleep_score", "sleep_quality_score",
         "sleep_recovery_score", "rem_sleep_score", "sleep_restlessness_score",
         "awakenings_count", "interruptions_score", "average_stress_during_sleep"
     )
 
-    def __init__(self, fit_file_path: str, model: SleepModel) -> None:
+    def __init__(
+            self,
+            fit_file_path: str,
+            model: SleepModel,
+            time_zone: TimeZone | None = None
+    ) -> None:
         super().__init__(fit_file_path)
         self.model: SleepModel = model
-        self.levels: list[FitSleepLevel] = [
-            FitSleepLevel(level) for level in self.model.levels
-            if level.sleep_level is not None
+        self.time_zone: TimeZone = time_zone or default_time_zone()
+
+        levels: list[SleepLevelModel] = [
+            level for level in self.model.levels if level.sleep_level is not None
         ]
-        self.dates = sorted(set([level.datetime_utc.date() for level in self.levels]))
+        timestamps: np.ndarray = np.fromiter(
+            (int(level.timestamp.timestamp()) for level in levels),
+            dtype=np.int64, count=len(levels)
+        )
+        codes: np.ndarray = np.fromiter(
+            (sleep_level_code(level.sleep_level) for level in levels),
+            dtype=np.int8, count=len(levels)
+        )
+        order: np.ndarray = np.argsort(timestamps, kind="stable")
+        timestamps, codes = timestamps[order], codes[order]
+        self.timeline: SleepTimeline = SleepTimeline(
+            *run_length_encode(timestamps, codes, SLEEP_LEVEL_INTERVAL)
+        )
+        # Local dates of the levels.
+        self.dates: list[date] = np.unique(
+            self.time_zone.local_timestamps(timestamps) // SECONDS_PER_DAY
+        ).astype("datetime64[D]").tolist()
+        self._levels: list[FitSleepLevel] | None = None
         self.combined_awake_score: int = model.assessment.combined_awake_score
         self.awake_time_score: int = model.assessment.awake_time_score
         self.awakenings_count_score: int = model.assessment.awakenings_count_score
@@ -530,3 +831,25 @@ class FitSleep(FitResult):
         self.average_stress_during_sleep: float = (
             model.assessment.average_stress_during_sleep
         )
+
+    @property
+    def levels(self) -> list[FitSleepLevel]:
+        """Sleep levels as FitSleepLevel, built the first time they are used."""
+        if self._levels is None:
+            self._levels = [
+                FitSleepLevel(level, self.time_zone) for level in self.model.levels
+                if level.sleep_level is not None
+            ]
+        return self._levels
+
+    @property
+    def start_time(self) -> datetime | None:
+        if len(self.timeline.start) == 0:
+            return None
+        return datetime.fromtimestamp(int(self.timeline.start[0]), timezone.utc)
+
+    @property
+    def end_time(self) -> datetime | None:
+        if len(self.timeline.end) == 0:
+            return None
+        return datetime.fromtimestamp(int(self.timeline.end[-1]), timezone.utc)
@@ -0,0 +1,154 @@
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from multiprocessing.shared_memory import SharedMemory
+from types import UnionType
+from typing import get_args
+
+import numpy as np
+
+from fit_data_whiz.fit.arrays import RecordArrays, record_field_array
+from fit_data_whiz.fit.models import RecordModel
+from fit_data_whiz.fit.results import (
+    FitResult,
+    FitDistanceActivity,
+    FitMultisportActivity
+)
+
+# RecordModel fields whose values are integers.
+RECORD_INT_FIELDS: frozenset[str] = frozenset(
+    name for name, field in RecordModel.model_fields.items()
+    if isinstance(field.annotation, UnionType)
+    and int in get_args(field.annotation) and float not in get_args(field.annotation)
+)
+
+
+def record_columns(records: Sequence[RecordModel]) -> dict[str, np.ndarray]:
+    """Return one array per RecordModel field (see record_field_array).
+
+    Fields without any value in records are not returned.
+    """
+    columns: dict[str, np.ndarray] = {}
+    for field in RecordModel.model_fields:
+        values: np.ndarray = record_field_array(records, field)
+        if field == "timestamp" or not np.isnan(values).all():
+            columns[field] = values
+    return columns
+
+
+class ColumnarRecords(Sequence):
+    """Read only sequence of RecordModel backed by record columns.
+
+    A RecordModel is only built (without validation) when it's accessed, so
+    records can be handed to a result without building thousands of objects.
+    """
+    __slots__ = ("columns",)
+
+    def __init__(self, columns: dict[str, np.ndarray]) -> None:
+        self.columns: dict[str, np.ndarray] = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"]) if "timestamp" in self.columns else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ColumnarRecords(
+                {field: values[index] for field, values in self.columns.items()}
+            )
+
+        data: dict = {}
+        for field, values in self.columns.items():
+            value = values[index]
+            if field == "timestamp":
+                data[field] = datetime.fromtimestamp(int(value), timezone.utc)
+            elif not np.isnan(value):
+                data[field] = int(value) if field in RECORD_INT_FIELDS else float(value)
+        return RecordModel.model_construct(**data)
+
+
+class PackedResult:
+    """Compact and cheap to pickle representation of a FitResult.
+
+    Results with records (FitDistanceActivity and FitMultisportActivity) are
+    packed as its models without records plus one contiguous typed array per
+    record field. The arrays can travel inside the pickle or through a
+    multiprocessing shared memory block. Any other result is kept as is.
+
+    Use pack() in the process that parses the FIT file and unpack() in the
+    process that receives the result.
+    """
+    __slots__ = (
+        "fit_file_path", "result_cls", "model", "columns", "result",
+        "shared_memory_name", "shared_memory_layout"
+    )
+
+    def __init__(self, fit_file_path: str) -> None:
+        self.fit_file_path: str = fit_file_path
+        self.result_cls: type | None = None
+        self.model = None
+        self.columns: dict[str, np.ndarray] | None = None
+        self.result: FitResult | None = None
+        self.shared_memory_name: str | None = None
+        # (field, dtype, offset, length) of each column in the shared memory.
+        self.shared_memory_layout: list[tuple[str, str, int, int]] = []
+
+
+def pack(result: FitResult, shared_memory: bool = False) -> PackedResult:
+    """Return the packed representation of result.
+
+    If shared_memory is True the record columns are copied into a shared
+    memory block that unpack() releases, so unpack() must be called once.
+    """
+    packed = PackedResult(result.fit_file_path)
+    if not isinstance(result, (FitDistanceActivity, FitMultisportActivity)):
+        packed.result = result
+        return packed
+
+    packed.result_cls = type(result)
+    packed.model = result.model.model_copy(update={"records": []})
+    columns: dict[str, np.ndarray] = record_columns(result.model.records)
+
+    if not shared_memory:
+        packed.columns = columns
+        return packed
+
+    size: int = sum(values.nbytes for values in columns.values())
+    block = SharedMemory(create=True, size=max(size, 1))
+    offset: int = 0
+    for field, values in columns.items():
+        target = np.ndarray(values.shape, values.dtype, buffer=block.buf, offset=offset)
+        target[:] = values
+        del target
+        packed.shared_memory_layout.append((field, values.dtype.str, offset, len(values)))
+        offset += values.nbytes
+    packed.shared_memory_name = block.name
+    block.close()
+    return packed
+
+
+def unpack(packed: PackedResult) -> FitResult:
+    """Build the result back from its packed representation.
+
+    Records are not validated again: the result gets a ColumnarRecords and
+    RecordArrays built straight from the columns.
+    """
+    if packed.result is not None:
+        return packed.result
+
+    columns: dict[str, np.ndarray] = packed.columns or {}
+    if packed.shared_memory_name is not None:
+        block = SharedMemory(name=packed.shared_memory_name)
+        try:
+            columns = {
+                field: np.frombuffer(
+                    block.buf, dtype=dtype, count=length, offset=offset
+                ).copy()
+                for field, dtype, offset, length in packed.shared_memory_layout
+            }
+        finally:
+            block.close()
+            block.unlink()
+
+    model = packed.model.model_copy(update={"records": ColumnarRecords(columns)})
+    return packed.result_cls(
+        packed.fit_file_path, model, RecordArrays(raw_columns=columns)
+    )
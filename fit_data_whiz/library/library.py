@@ -0,0 +1,358 @@
+from bisect import bisect_left, insort
+from collections import namedtuple
+from datetime import date, datetime, timezone
+
+from fit_data_whiz.analytics.best_efforts import PersonalRecords
+from fit_data_whiz.fit.arrays import RecordArrays
+from fit_data_whiz.fit.definitions import MULTISPORT_CATEGORY
+from fit_data_whiz.fit.models import FileIdModel
+from fit_data_whiz.fit.results import (
+    FitResult,
+    FitError,
+    FitActivity,
+    FitDistanceActivity,
+    FitMultisportActivity,
+    FitMonitor,
+    FitHrv,
+    FitSleep
+)
+from fit_data_whiz.library.spatial import SpatialIndex
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore, result_fingerprint
+from fit_data_whiz.utils.date_utils import to_epoch_seconds
+from fit_data_whiz.utils.timezones import TimeZone, default_time_zone
+
+# A row of the library: everything but the records of the FIT file.
+ActivitySummary = namedtuple(
+    "ActivitySummary", [
+        "activity_id",     # FILE_ID fingerprint
+        "fit_file_path",
+        "file_type",       # FILE_ID type: activity, monitoring_b...
+        "sport",           # "multisport" for activities with several sessions
+        "sub_sport",
+        "start_time",      # UTC datetime
+        "date",            # local date
+        "elapsed",         # seconds
+        "distance",        # meters
+        "avg_heart_rate",
+        "has_heart_rate"
+    ]
+)
+
+
+def _summarize(result: FitResult, time_zone: TimeZone) -> ActivitySummary | None:
+    """Build the summary of result (with its local date in time_zone) or None if
+    result can't be in the library.
+    """
+    if isinstance(result, FitError):
+        return None
+
+    file_id: FileIdModel | None = getattr(result.model, "file_id", None)
+    file_type: str | None = str(file_id.file_type) if file_id else None
+
+    if isinstance(result, FitMultisportActivity):
+        sessions = result.model.sessions
+        heart_rates: list[float] = [
+            s.avg_heart_rate for s in sessions if s.avg_heart_rate is not None
+        ]
+        sport, sub_sport = MULTISPORT_CATEGORY, None
+        start_time: datetime = sessions[0].start_time
+        elapsed: float | None = sum(s.total_elapsed_time or 0 for s in sessions)
+        distance: float | None = sum(s.total_distance or 0 for s in sessions)
+        avg_heart_rate: float | None = (
+            sum(heart_rates) / len(heart_rates) if heart_rates else None
+        )
+    elif isinstance(result, FitActivity):
+        session = result.model.session
+        sport, sub_sport = session.sport, session.sub_sport
+        start_time = session.start_time
+        elapsed = session.total_elapsed_time
+        distance = session.total_distance
+        avg_heart_rate = session.avg_heart_rate
+    elif isinstance(result, (FitMonitor, FitHrv)):
+        sport, sub_sport = None, None
+        start_time = result.datetime_utc
+        elapsed, distance, avg_heart_rate = None, None, None
+    elif isinstance(result, FitSleep) and result.start_time is not None:
+        sport, sub_sport = None, None
+        start_time = result.start_time
+        elapsed = (result.end_time - start_time).total_seconds()
+        distance, avg_heart_rate = None, None
+    else:
+        return None
+
+    return ActivitySummary(
+        activity_id=result_fingerprint(result),
+        fit_file_path=result.fit_file_path,
+        file_type=file_type,
+        sport=sport,
+        sub_sport=sub_sport,
+        start_time=start_time,
+        date=time_zone.to_local(start_time).date(),
+        elapsed=elapsed,
+        distance=distance,
+        avg_heart_rate=avg_heart_rate,
+        has_heart_rate=avg_heart_rate is not None
+    )
+
+
+class FitLibrary:
+    """In memory library of FIT results with indexes to query them.
+
+    The library only keeps a summary row per FIT file (see ActivitySummary),
+    never its records, and it indexes them by start time, sport, sub sport,
+    file type and date.
+
+    Range queries use a sorted array of start times (binary search) and
+    filters use the posting sets of each index, so a query costs in the order
+    of the rows it returns rather than the rows in the library.
+
+    Tracks of the activities are indexed by location in spatial (see
+    SpatialIndex) and their best efforts update personal_records (see
+    PersonalRecords).
+
+    Example:
+        library = FitLibrary()
+        library.add(fit_result)
+        library.query(start=datetime(2023, 3, 1), end=datetime(2023, 4, 1),
+                      sport="running", sub_sport="trail", has_heart_rate=True)
+    """
+
+    def __init__(self, time_zone: TimeZone | None = None) -> None:
+        # Time zone of the local dates of the results added.
+        self.time_zone: TimeZone = time_zone or default_time_zone()
+        self._summaries: dict[str, ActivitySummary] = {}
+        # Sorted (start time, activity id) pairs.
+        self._timeline: list[tuple[int, str]] = []
+        self._by_sport: dict[str, set[str]] = {}
+        self._by_sub_sport: dict[tuple[str, str], set[str]] = {}
+        self._by_file_type: dict[str, set[str]] = {}
+        self._by_date: dict[date, set[str]] = {}
+        self._with_heart_rate: set[str] = set()
+        # Index entries of each row, so it can be removed from them.
+        self._postings: dict[str, list[set[str]]] = {}
+        self.spatial: SpatialIndex = SpatialIndex()
+        self.personal_records: PersonalRecords = PersonalRecords()
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    def __contains__(self, activity_id: str) -> bool:
+        return activity_id in self._summaries
+
+    @classmethod
+    def from_store(
+            cls, store: FitSqliteStore, athlete: str | None = None
+    ) -> "FitLibrary":
+        """Build the library from the results saved into store."""
+        library = cls(store.time_zone(athlete))
+        rows_by_fingerprint: dict[str, list] = {}
+        for row in store.sessions(athlete=athlete):
+            rows_by_fingerprint.setdefault(row["fingerprint"], []).append(row)
+
+        for fingerprint, rows in rows_by_fingerprint.items():
+            heart_rates: list[float] = [
+                r["avg_heart_rate"] for r in rows if r["avg_heart_rate"] is not None
+            ]
+            avg_heart_rate: float | None = (
+                sum(heart_rates) / len(heart_rates) if heart_rates else None
+            )
+            library.add_summary(ActivitySummary(
+                activity_id=fingerprint,
+                fit_file_path=rows[0]["fit_file_path"],
+                file_type=rows[0]["file_type"],
+                sport=rows[0]["sport"] if len(rows) == 1 else MULTISPORT_CATEGORY,
+                sub_sport=rows[0]["sub_sport"] if len(rows) == 1 else None,
+                start_time=datetime.fromtimestamp(rows[0]["start_time"], timezone.utc),
+                date=date.fromisoformat(rows[0]["date"]),
+                elapsed=sum(r["total_elapsed_time"] or 0 for r in rows),
+                distance=sum(r["total_distance"] or 0 for r in rows),
+                avg_heart_rate=avg_heart_rate,
+                has_heart_rate=avg_heart_rate is not None
+            ), sports=[(r["sport"], r["sub_sport"]) for r in rows])
+        for row in store.file_summaries(athlete):
+            start_time: datetime = datetime.fromtimestamp(row["start_time"], timezone.utc)
+            library.add_summary(ActivitySummary(
+                activity_id=row["fingerprint"],
+                fit_file_path=row["fit_file_path"],
+                file_type=row["file_type"],
+                sport=None,
+                sub_sport=None,
+                start_time=start_time,
+                date=library.time_zone.to_local(start_time).date(),
+                elapsed=(
+                    row["end_time"] - row["start_time"]
+                    if row["end_time"] is not None else None
+                ),
+                distance=None,
+                avg_heart_rate=None,
+                has_heart_rate=False
+            ))
+        library.spatial = SpatialIndex.from_store(store, athlete)
+        library.personal_records = PersonalRecords.from_store(store, athlete)
+
+        return library
+
+    def add(self, result: FitResult) -> str | None:
+        """Add (or replace) result into the library and return its id.
+
+        FitError results aren't added so None is returned.
+        """
+        summary: ActivitySummary | None = _summarize(result, self.time_zone)
+        if summary is None:
+            return None
+
+        sports: list[tuple[str, str]] = (
+            [(s.sport, s.sub_sport) for s in result.model.sessions]
+            if isinstance(result, FitMultisportActivity) else []
+        )
+        activity_id: str = self.add_summary(summary, sports)
+
+        records: RecordArrays | None = (
+            result.record_arrays
+            if isinstance(result, (FitDistanceActivity, FitMultisportActivity)) else None
+        )
+        if records is not None:
+            self.spatial.add(activity_id, records.position_lat, records.position_long)
+            self.personal_records.add_result(activity_id, result)
+
+        return activity_id
+
+    def add_summary(
+            self, summary: ActivitySummary, sports: list[tuple[str, str]] | None = None
+    ) -> str:
+        """Add (or replace) a summary row.
+
+        sports are additional (sport, sub sport) pairs the row is indexed by,
+        for example the sessions of a multisport activity.
+        """
+        activity_id: str = summary.activity_id
+        if activity_id in self._summaries:
+            self.remove(activity_id)
+
+        self._summaries[activity_id] = summary
+        insort(self._timeline, (to_epoch_seconds(summary.start_time), activity_id))
+
+        postings: list[set[str]] = []
+        pairs: set[tuple[str, str]] = set(sports or [])
+        if summary.sport is not None:
+            pairs.add((summary.sport, summary.sub_sport))
+        for sport in {sport for sport, _ in pairs}:
+            postings.append(self._by_sport.setdefault(sport, set()))
+        for pair in pairs:
+            if pair[1] is not None:
+                postings.append(self._by_sub_sport.setdefault(pair, set()))
+        if summary.file_type is not None:
+            postings.append(self._by_file_type.setdefault(summary.file_type, set()))
+        postings.append(self._by_date.setdefault(summary.date, set()))
+        if summary.has_heart_rate:
+            postings.append(self._with_heart_rate)
+
+        for posting in postings:
+            posting.add(activity_id)
+        self._postings[activity_id] = postings
+
+        return activity_id
+
+    def remove(self, activity_id: str) -> bool:
+        summary: ActivitySummary | None = self._summaries.pop(activity_id, None)
+        if summary is None:
+            return False
+
+        key: tuple[int, str] = (to_epoch_seconds(summary.start_time), activity_id)
+        del self._timeline[bisect_left(self._timeline, key)]
+
+        for posting in self._postings.pop(activity_id):
+            posting.discard(activity_id)
+        self.spatial.remove(activity_id)
+        self.personal_records.remove(activity_id)
+
+        return True
+
+    def get(self, activity_id: str) -> ActivitySummary | None:
+        return self._summaries.get(activity_id)
+
+    def on_date(self, day: date) -> list[ActivitySummary]:
+        """Return the rows of a local date ordered by start time."""
+        return sorted(
+            (self._summaries[i] for i in self._by_date.get(day, ())),
+            key=lambda s: s.start_time
+        )
+
+    def query(
+            self,
+            start: datetime | None = None,
+            end: datetime | None = None,
+            sport: str | None = None,
+            sub_sport: str | None = None,
+            file_type: str | None = None,
+            has_heart_rate: bool | None = None,
+            offset: int = 0,
+            limit: int | None = None
+    ) -> list[ActivitySummary]:
+        """Return the rows that match all filters ordered by start time.
+
+        start is included and end is excluded. Naive datetimes are UTC ones.
+        sub_sport without sport matches that sub sport of any sport.
+        Use offset and limit to paginate the result.
+        """
+        start_key: int | None = to_epoch_seconds(start) if start is not None else None
+        end_key: int | None = to_epoch_seconds(end) if end is not None else None
+        low: int = (
+            bisect_left(self._timeline, (start_key, "")) if start_key is not None else 0
+        )
+        high: int = (
+            bisect_left(self._timeline, (end_key, ""))
+            if end_key is not None else len(self._timeline)
+        )
+
+        postings: list[set[str]] = []
+        if sport is not None and sub_sport is not None:
+            postings.append(self._by_sub_sport.get((sport, sub_sport), set()))
+        elif sport is not None:
+            postings.append(self._by_sport.get(sport, set()))
+        elif sub_sport is not None:
+            # The sub sport of any sport (there are a few sport pairs).
+            postings.append(set().union(*(
+                ids for (_, pair_sub_sport), ids in self._by_sub_sport.items()
+                if pair_sub_sport == sub_sport
+            )))
+        if file_type is not None:
+            postings.append(self._by_file_type.get(file_type, set()))
+        if has_heart_rate is True:
+            postings.append(self._with_heart_rate)
+        postings.sort(key=len)
+
+        def matches(activity_id: str) -> bool:
+            if has_heart_rate is False and activity_id in self._with_heart_rate:
+                return False
+            return all(activity_id in p for p in postings)
+
+        stop: int | None = offset + limit if limit is not None else None
+        if postings and len(postings[0]) < high - low:
+            # Fewer rows in the smallest posting set than in the time range.
+            candidates: list[tuple[int, str]] = sorted(
+                (key, i) for i in postings[0]
+                for key in [to_epoch_seconds(self._summaries[i].start_time)]
+                if (start_key is None or key >= start_key)
+                and (end_key is None or key < end_key) and matches(i)
+            )
+            ids: list[str] = [i for _, i in candidates[offset:stop]]
+        else:
+            ids = []
+            skipped: int = 0
+            for position in range(low, high):
+                activity_id: str = self._timeline[position][1]
+                if not matches(activity_id):
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                ids.append(activity_id)
+                if limit is not None and len(ids) == limit:
+                    break
+
+        return [self._summaries[i] for i in ids]
+
+    def count(self, **filters) -> int:
+        """Return the number of rows that match the query filters."""
+        return len(self.query(**filters))
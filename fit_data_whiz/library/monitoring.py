@@ -0,0 +1,213 @@
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from fit_data_whiz.fit.results import FitMonitor
+from fit_data_whiz.storage.sqlite_store import (
+    FitSqliteStore,
+    HEART_RATE_METRIC,
+    MODERATE_MINUTES_METRIC,
+    RESPIRATION_METRIC,
+    STEPS_METRIC,
+    STRESS_METRIC,
+    VIGOROUS_MINUTES_METRIC
+)
+from fit_data_whiz.utils.date_utils import to_epoch_seconds
+
+MONITORING_METRICS = (
+    STEPS_METRIC,
+    HEART_RATE_METRIC,
+    STRESS_METRIC,
+    RESPIRATION_METRIC,
+    MODERATE_MINUTES_METRIC,
+    VIGOROUS_MINUTES_METRIC
+)
+
+# Metrics whose samples of one file at the same time are added up: daily
+# steps are logged once per activity type (walking, running...).
+SUMMED_METRICS = (STEPS_METRIC,)
+
+TimeSeries = namedtuple(
+    "TimeSeries", [
+        "timestamp",  # int64 POSIX seconds, sorted and unique
+        "values"      # float64
+    ]
+)
+
+# Samples of a metric and the writer (FILE_ID time_created) of each one.
+_Samples = namedtuple("_Samples", ["timestamp", "values", "writers"])
+
+
+def _empty_samples() -> _Samples:
+    return _Samples(np.empty(0, np.int64), np.empty(0), np.empty(0, np.int64))
+
+
+def _epoch_or_none(dt: datetime | None) -> int | None:
+    return to_epoch_seconds(dt) if dt is not None else None
+
+
+def monitor_samples(monitor: FitMonitor) -> dict[str, TimeSeries]:
+    """Return the samples with time of every metric of a monitoring file."""
+    pairs: dict[str, list[tuple[int | None, float | None]]] = {
+        STEPS_METRIC: [
+            (_epoch_or_none(s.datetime_utc), s.steps) for s in monitor.steps
+        ],
+        MODERATE_MINUTES_METRIC: [
+            (_epoch_or_none(i.datetime_utc), i.moderate_minutes)
+            for i in monitor.activity_intensities
+        ],
+        VIGOROUS_MINUTES_METRIC: [
+            (_epoch_or_none(i.datetime_utc), i.vigorous_minutes)
+            for i in monitor.activity_intensities
+        ]
+    }
+    samples: dict[str, TimeSeries] = {
+        metric: TimeSeries(
+            np.array([t for t, v in metric_pairs if t is not None and v is not None],
+                     dtype=np.int64),
+            np.array([v for t, v in metric_pairs if t is not None and v is not None],
+                     dtype=np.float64)
+        )
+        for metric, metric_pairs in pairs.items()
+    }
+    for metric, series in (
+            (HEART_RATE_METRIC, monitor.heart_rate_series),
+            (STRESS_METRIC, monitor.stress_series),
+            (RESPIRATION_METRIC, monitor.respiration_series)
+    ):
+        samples[metric] = TimeSeries(series.timestamp, series.values.astype(np.float64))
+    return samples
+
+
+def _file_series(metric: str, timestamps: np.ndarray, values: np.ndarray) -> TimeSeries:
+    """Sort the samples of one file and leave one per timestamp: the sum of
+    them for SUMMED_METRICS and the last one in file order for the rest.
+    """
+    order: np.ndarray = np.argsort(timestamps, kind="stable")
+    timestamps, values = timestamps[order], values[order]
+    if len(timestamps) == 0:
+        return TimeSeries(timestamps, values)
+    if metric in SUMMED_METRICS:
+        unique, index = np.unique(timestamps, return_inverse=True)
+        return TimeSeries(unique, np.bincount(index, weights=values))
+    last: np.ndarray = np.append(timestamps[1:] != timestamps[:-1], True)
+    return TimeSeries(timestamps[last], values[last])
+
+
+def _merge(samples: _Samples, new: TimeSeries, writer: int) -> _Samples:
+    """Merge the samples of a file (sorted and unique, see _file_series) into
+    samples.
+
+    When both have a sample at the same time the one of the latest writer
+    wins, and the new one on ties. Only the samples from the first new
+    timestamp are sorted again, so appending newer samples is cheap.
+    """
+    if len(new.timestamp) == 0:
+        return samples
+    start: int = int(np.searchsorted(samples.timestamp, new.timestamp[0], side="left"))
+    timestamps: np.ndarray = np.concatenate((samples.timestamp[start:], new.timestamp))
+    values: np.ndarray = np.concatenate((samples.values[start:], new.values))
+    writers: np.ndarray = np.concatenate(
+        (samples.writers[start:], np.full(len(new.timestamp), writer, dtype=np.int64))
+    )
+    # Stable, so new samples stay after the old ones of the same writer.
+    order: np.ndarray = np.lexsort((writers, timestamps))
+    timestamps, values, writers = timestamps[order], values[order], writers[order]
+    last: np.ndarray = np.append(timestamps[1:] != timestamps[:-1], True)
+    return _Samples(
+        np.concatenate((samples.timestamp[:start], timestamps[last])),
+        np.concatenate((samples.values[:start], values[last])),
+        np.concatenate((samples.writers[:start], writers[last]))
+    )
+
+
+class MonitoringStore:
+    """Continuous time series of the monitoring metrics of many files.
+
+    The watch writes overlapping and duplicated MONITORING messages across
+    the files of the Monitor folder (and rewrites them), so the samples of
+    every file are merged by timestamp into one sorted series per metric
+    (see MONITORING_METRICS) without duplicates. If several files have a
+    sample at the same time, the last writer (latest FILE_ID time_created)
+    wins.
+
+    New daily files are merged as they arrive, re-sorting only the samples
+    they overlap, and range queries are binary searches returning views.
+
+    Example:
+        monitoring = MonitoringStore.from_store(store)
+        monitoring.add(fit_monitor)
+        monitoring.series("heart_rate", start, end)
+    """
+
+    def __init__(self) -> None:
+        self._samples: dict[str, _Samples] = {
+            metric: _empty_samples() for metric in MONITORING_METRICS
+        }
+
+    def __len__(self) -> int:
+        return sum(len(s.timestamp) for s in self._samples.values())
+
+    @classmethod
+    def from_store(
+            cls, store: FitSqliteStore, athlete: str | None = None
+    ) -> "MonitoringStore":
+        """Merge the monitoring samples saved into store."""
+        monitoring = cls()
+        rows_by_fingerprint: dict[str, list] = {}
+        for row in store.monitoring_samples(athlete):
+            rows_by_fingerprint.setdefault(row["fingerprint"], []).append(row)
+        for rows in rows_by_fingerprint.values():
+            rows_by_metric: dict[str, list] = {}
+            for row in rows:
+                rows_by_metric.setdefault(row["metric"], []).append(row)
+            for metric, metric_rows in rows_by_metric.items():
+                monitoring.add_samples(
+                    metric,
+                    np.array([r["timestamp"] for r in metric_rows], dtype=np.int64),
+                    np.array([r["value"] for r in metric_rows], dtype=np.float64),
+                    rows[0]["time_created"] or 0
+                )
+        return monitoring
+
+    def add(self, monitor: FitMonitor) -> None:
+        """Merge the samples of a monitoring file."""
+        file_id = monitor.model.file_id
+        writer: int = (
+            to_epoch_seconds(file_id.time_created)
+            if file_id is not None and file_id.time_created is not None else 0
+        )
+        for metric, samples in monitor_samples(monitor).items():
+            self.add_samples(metric, samples.timestamp, samples.values, writer)
+
+    def add_samples(
+            self,
+            metric: str,
+            timestamps: np.ndarray,
+            values: np.ndarray,
+            writer: int = 0
+    ) -> None:
+        """Merge the samples of metric of one file written at writer (POSIX
+        seconds).
+        """
+        if metric not in self._samples:
+            raise ValueError(f"Unknown monitoring metric: {metric}")
+        self._samples[metric] = _merge(
+            self._samples[metric], _file_series(metric, timestamps, values), writer
+        )
+
+    def series(
+            self, metric: str, start: datetime | None = None, end: datetime | None = None
+    ) -> TimeSeries:
+        """Return the samples of metric between both datetimes (included)."""
+        samples: _Samples = self._samples[metric]
+        first: int = (
+            int(np.searchsorted(samples.timestamp, to_epoch_seconds(start), "left"))
+            if start is not None else 0
+        )
+        last: int = (
+            int(np.searchsorted(samples.timestamp, to_epoch_seconds(end), "right"))
+            if end is not None else len(samples.timestamp)
+        )
+        return TimeSeries(samples.timestamp[first:last], samples.values[first:last])
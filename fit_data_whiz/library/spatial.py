@@ -0,0 +1,193 @@
+import numpy as np
+
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+from fit_data_whiz.utils.geo_utils import (
+    EARTH_RADIUS,
+    GRID_CELL_SIZE,
+    GRID_COLUMNS,
+    cell_bounds,
+    grid_cells,
+    haversine
+)
+
+# Queries covering more cells than this scan the bounding boxes of the
+# activities instead of the cells.
+MAX_QUERY_CELLS = 4096
+
+
+def _cells_in_box(
+        min_lat: float, min_lon: float, max_lat: float, max_lon: float
+) -> np.ndarray:
+    """Return the codes of the grid cells that overlap the box."""
+    rows: np.ndarray = np.arange(
+        np.floor((min_lat + 90) / GRID_CELL_SIZE),
+        np.floor((max_lat + 90) / GRID_CELL_SIZE) + 1
+    ).astype(np.int64)
+    columns: np.ndarray = np.arange(
+        np.floor((min_lon + 180) / GRID_CELL_SIZE),
+        np.floor((max_lon + 180) / GRID_CELL_SIZE) + 1
+    ).astype(np.int64)
+    return (rows[:, None] * GRID_COLUMNS + columns[None, :]).ravel()
+
+
+def _cells_near(cells: np.ndarray, lat: float, lon: float, radius: float) -> np.ndarray:
+    """Return which cells have some point within radius meters of (lat, lon)."""
+    min_lat, min_lon, max_lat, max_lon = cell_bounds(cells)
+    nearest_lat: np.ndarray = np.clip(lat, min_lat, max_lat)
+    nearest_lon: np.ndarray = np.clip(lon, min_lon, max_lon)
+    return haversine(lat, lon, nearest_lat, nearest_lon) <= radius
+
+
+class SpatialIndex:
+    """Index of the tracks of many activities by location.
+
+    Every track is indexed by its bounding box and by the grid cells it passes
+    through (see geo_utils.grid_cells), so queries never read any record.
+    Answers are as precise as the grid: an activity is returned when it goes
+    through a cell that overlaps the queried area.
+
+    The FitSqliteStore saves the bounding boxes and cells when it ingests an
+    activity, so from_store() loads the index without reading records.
+
+    Example:
+        index = SpatialIndex.from_store(store)
+        index.in_box(40.40, -3.72, 40.45, -3.68)
+        index.near(40.4168, -3.7038, radius=500)
+    """
+
+    def __init__(self) -> None:
+        # Cell code -> ids of the activities that pass through it.
+        self._cells: dict[int, set[str]] = {}
+        # Activity id -> (min lat, min lon, max lat, max lon).
+        self._bounds: dict[str, tuple[float, float, float, float]] = {}
+        self._activity_cells: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._bounds)
+
+    def __contains__(self, activity_id: str) -> bool:
+        return activity_id in self._bounds
+
+    @classmethod
+    def from_store(
+            cls, store: FitSqliteStore, athlete: str | None = None
+    ) -> "SpatialIndex":
+        index = cls()
+        cells_by_fingerprint: dict[str, list[int]] = {}
+        for row in store.track_cells(athlete):
+            cells_by_fingerprint.setdefault(row["fingerprint"], []).append(row["cell"])
+        for row in store.track_bounds(athlete):
+            index.add_cells(
+                row["fingerprint"],
+                np.array(cells_by_fingerprint.get(row["fingerprint"], []), np.int64),
+                (row["min_lat"], row["min_lon"], row["max_lat"], row["max_lon"])
+            )
+        return index
+
+    def add(self, activity_id: str, lat: np.ndarray, lon: np.ndarray) -> bool:
+        """Add (or replace) the track of an activity from its positions in
+        degrees. Return False if the track has no position.
+        """
+        cells: np.ndarray = grid_cells(lat, lon)
+        if len(cells) == 0:
+            self.remove(activity_id)
+            return False
+        bounds = (
+            float(np.nanmin(lat)), float(np.nanmin(lon)),
+            float(np.nanmax(lat)), float(np.nanmax(lon))
+        )
+        self.add_cells(activity_id, cells, bounds)
+        return True
+
+    def add_cells(
+            self,
+            activity_id: str,
+            cells: np.ndarray,
+            bounds: tuple[float, float, float, float]
+    ) -> None:
+        """Add (or replace) a track already split into cells."""
+        self.remove(activity_id)
+        self._bounds[activity_id] = bounds
+        self._activity_cells[activity_id] = cells
+        for cell in cells.tolist():
+            self._cells.setdefault(cell, set()).add(activity_id)
+
+    def remove(self, activity_id: str) -> bool:
+        if self._bounds.pop(activity_id, None) is None:
+            return False
+        for cell in self._activity_cells.pop(activity_id).tolist():
+            ids: set[str] = self._cells[cell]
+            ids.discard(activity_id)
+            if not ids:
+                del self._cells[cell]
+        return True
+
+    def bounds(self, activity_id: str) -> tuple[float, float, float, float] | None:
+        """Return the (min lat, min lon, max lat, max lon) of the track."""
+        return self._bounds.get(activity_id)
+
+    def in_box(
+            self, min_lat: float, min_lon: float, max_lat: float, max_lon: float
+    ) -> set[str]:
+        """Return the ids of the activities that pass through the box."""
+        if self._box_cell_count(min_lat, min_lon, max_lat, max_lon) <= MAX_QUERY_CELLS:
+            return self._union(_cells_in_box(min_lat, min_lon, max_lat, max_lon).tolist())
+
+        found: set[str] = set()
+        for activity_id in self._overlapping(min_lat, min_lon, max_lat, max_lon):
+            a, b, c, d = self._bounds[activity_id]
+            if a >= min_lat and c <= max_lat and b >= min_lon and d <= max_lon:
+                # The whole track is inside the box.
+                found.add(activity_id)
+                continue
+            cell_min_lat, cell_min_lon, cell_max_lat, cell_max_lon = cell_bounds(
+                self._activity_cells[activity_id]
+            )
+            if np.any(
+                (cell_max_lat >= min_lat) & (cell_min_lat <= max_lat)
+                & (cell_max_lon >= min_lon) & (cell_min_lon <= max_lon)
+            ):
+                found.add(activity_id)
+        return found
+
+    def near(self, lat: float, lon: float, radius: float) -> set[str]:
+        """Return the ids of the activities that pass within radius meters of
+        (lat, lon).
+        """
+        lat_delta: float = np.degrees(radius / EARTH_RADIUS)
+        lon_delta: float = lat_delta / max(np.cos(np.radians(abs(lat) + lat_delta)), 1e-6)
+        box = (lat - lat_delta, lon - lon_delta, lat + lat_delta, lon + lon_delta)
+
+        if self._box_cell_count(*box) <= MAX_QUERY_CELLS:
+            cells: np.ndarray = _cells_in_box(*box)
+            cells = cells[_cells_near(cells, lat, lon, radius)]
+            return self._union(cells.tolist())
+
+        return {
+            activity_id for activity_id in self._overlapping(*box)
+            if np.any(_cells_near(self._activity_cells[activity_id], lat, lon, radius))
+        }
+
+    def _union(self, cells: list[int]) -> set[str]:
+        found: set[str] = set()
+        for cell in cells:
+            found.update(self._cells.get(cell, ()))
+        return found
+
+    def _overlapping(
+            self, min_lat: float, min_lon: float, max_lat: float, max_lon: float
+    ) -> list[str]:
+        """Return the ids of the activities whose bounding box overlaps the box."""
+        return [
+            activity_id for activity_id, (a, b, c, d) in self._bounds.items()
+            if c >= min_lat and a <= max_lat and d >= min_lon and b <= max_lon
+        ]
+
+    @staticmethod
+    def _box_cell_count(
+            min_lat: float, min_lon: float, max_lat: float, max_lon: float
+    ) -> float:
+        return (
+            ((max_lat - min_lat) / GRID_CELL_SIZE + 1)
+            * ((max_lon - min_lon) / GRID_CELL_SIZE + 1)
+        )
@@ -0,0 +1,832 @@
+import hashlib
+import sqlite3
+from collections.abc import Iterable
+from datetime import date, datetime
+
+import numpy as np
+
+from fit_data_whiz.fit.arrays import RecordArrays
+from fit_data_whiz.fit.models import FileIdModel, LapModel, RecordModel, SessionModel
+from fit_data_whiz.fit.results import (
+    FitResult,
+    FitError,
+    FitActivity,
+    FitDistanceActivity,
+    FitClimbActivity,
+    FitSetActivity,
+    FitMultisportActivity,
+    FitMonitor,
+    FitHrv,
+    FitSleep
+)
+from fit_data_whiz.utils.date_utils import to_epoch_seconds
+from fit_data_whiz.utils.geo_utils import grid_cells
+from fit_data_whiz.utils.timezones import (
+    SECONDS_PER_DAY,
+    TimeZone,
+    default_time_zone,
+    get_time_zone
+)
+
+DEFAULT_ATHLETE = "default"
+
+# Result types saved into the fit_files table.
+ACTIVITY_RESULT = "activity"
+MULTISPORT_RESULT = "multisport"
+MONITOR_RESULT = "monitor"
+HRV_RESULT = "hrv"
+SLEEP_RESULT = "sleep"
+
+# Metrics saved into the monitoring table.
+STEPS_METRIC = "steps"
+HEART_RATE_METRIC = "heart_rate"
+MODERATE_MINUTES_METRIC = "moderate_minutes"
+VIGOROUS_MINUTES_METRIC = "vigorous_minutes"
+STRESS_METRIC = "stress"
+RESPIRATION_METRIC = "respiration"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fit_files (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL UNIQUE,
+    athlete TEXT NOT NULL,
+    result_type TEXT NOT NULL,
+    file_type TEXT,
+    fit_file_path TEXT NOT NULL,
+    time_created INTEGER
+);
+CREATE INDEX IF NOT EXISTS fit_files_athlete ON fit_files (athlete, result_type);
+
+CREATE TABLE IF NOT EXISTS athletes (
+    athlete TEXT PRIMARY KEY,
+    time_zone TEXT
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    activity_id INTEGER NOT NULL REFERENCES fit_files (id) ON DELETE CASCADE,
+    session_index INTEGER NOT NULL,
+    sport TEXT NOT NULL,
+    sub_sport TEXT NOT NULL,
+    date TEXT NOT NULL,
+    start_time INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    total_elapsed_time REAL,
+    total_timer_time REAL,
+    total_distance REAL,
+    avg_speed REAL,
+    max_speed REAL,
+    avg_heart_rate REAL,
+    max_heart_rate REAL,
+    total_ascent REAL,
+    total_descent REAL,
+    total_calories REAL,
+    training_load_peak REAL,
+    total_training_effect REAL,
+    PRIMARY KEY (activity_id, session_index)
+);
+CREATE INDEX IF NOT EXISTS sessions_date ON sessions (date);
+CREATE INDEX IF NOT EXISTS sessions_start_time ON sessions (start_time);
+
+CREATE TABLE IF NOT EXISTS laps (
+    activity_id INTEGER NOT NULL REFERENCES fit_files (id) ON DELETE CASCADE,
+    message_index INTEGER NOT NULL,
+    start_time INTEGER,
+    timestamp INTEGER NOT NULL,
+    total_elapsed_time REAL,
+    total_timer_time REAL,
+    total_distance REAL,
+    avg_speed REAL,
+    avg_heart_rate REAL,
+    max_heart_rate REAL,
+    total_ascent REAL,
+    total_descent REAL,
+    wkt_step_index INTEGER
+);
+CREATE INDEX IF NOT EXISTS laps_activity ON laps (activity_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS records (
+    activity_id INTEGER NOT NULL REFERENCES fit_files (id) ON DELETE CASCADE,
+    timestamp INTEGER NOT NULL,
+    position_lat INTEGER,
+    position_long INTEGER,
+    distance REAL,
+    speed REAL,
+    altitude REAL,
+    heart_rate INTEGER,
+    cadence INTEGER,
+    power INTEGER,
+    temperature INTEGER
+);
+CREATE INDEX IF NOT EXISTS records_activity ON records (activity_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS track_bounds (
+    activity_id INTEGER PRIMARY KEY REFERENCES fit_files (id) ON DELETE CASCADE,
+    min_lat REAL NOT NULL,
+    min_lon REAL NOT NULL,
+    max_lat REAL NOT NULL,
+    max_lon REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS track_cells (
+    cell INTEGER NOT NULL,
+    activity_id INTEGER NOT NULL REFERENCES fit_files (id) ON DELETE CASCADE,
+    PRIMARY KEY (cell, activity_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS track_cells_activity ON track_cells (activity_id);
+
+CREATE TABLE IF NOT EXISTS sets (
+    activity_id INTEGER NOT NULL REFERENCES fit_files (id) ON DELETE CASCADE,
+    set_order INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    start_time INTEGER,
+    exercise TEXT,
+    duration REAL,
+    repetitions INTEGER,
+    weight REAL,
+    weight_unit TEXT
+);
+CREATE INDEX IF NOT EXISTS sets_activity ON sets (activity_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS climbs (
+    activity_id INTEGER NOT NULL REFERENCES fit_files (id) ON DELETE CASCADE,
+    start_time INTEGER NOT NULL,
+    split_type TEXT NOT NULL,
+    total_elapsed_time REAL,
+    total_timer_time REAL,
+    avg_heart_rate INTEGER,
+    max_heart_rate INTEGER,
+    total_calories INTEGER,
+    difficulty INTEGER,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS climbs_activity ON climbs (activity_id, start_time);
+
+CREATE TABLE IF NOT EXISTS monitoring_days (
+    file_id INTEGER NOT NULL REFERENCES fit_files (id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    timestamp INTEGER,
+    metabolic_calories INTEGER,
+    active_calories INTEGER,
+    total_steps INTEGER
+);
+CREATE INDEX IF NOT EXISTS monitoring_days_date ON monitoring_days (date);
+
+CREATE TABLE IF NOT EXISTS monitoring (
+    file_id INTEGER NOT NULL REFERENCES fit_files (id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    timestamp INTEGER,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS monitoring_date ON monitoring (date);
+CREATE INDEX IF NOT EXISTS monitoring_metric ON monitoring (metric, timestamp);
+CREATE INDEX IF NOT EXISTS monitoring_file ON monitoring (file_id);
+
+CREATE TABLE IF NOT EXISTS hrv_summaries (
+    file_id INTEGER NOT NULL REFERENCES fit_files (id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    weekly_average REAL,
+    last_night_average REAL,
+    last_night_5_min_high REAL,
+    baseline_low_upper REAL,
+    baseline_balanced_lower REAL,
+    baseline_balanced_upper REAL,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS hrv_summaries_date ON hrv_summaries (date);
+
+CREATE TABLE IF NOT EXISTS hrv_values (
+    file_id INTEGER NOT NULL REFERENCES fit_files (id) ON DELETE CASCADE,
+    timestamp INTEGER NOT NULL,
+    value INTEGER
+);
+CREATE INDEX IF NOT EXISTS hrv_values_file ON hrv_values (file_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS sleep_assessments (
+    file_id INTEGER NOT NULL REFERENCES fit_files (id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    overall_sleep_score INTEGER,
+    sleep_quality_score INTEGER,
+    sleep_duration_score INTEGER,
+    deep_sleep_score INTEGER,
+    light_sleep_score INTEGER,
+    rem_sleep_score INTEGER,
+    awakenings_count INTEGER,
+    average_stress_during_sleep REAL
+);
+CREATE INDEX IF NOT EXISTS sleep_assessments_date ON sleep_assessments (date);
+
+CREATE TABLE IF NOT EXISTS sleep_stages (
+    file_id INTEGER NOT NULL REFERENCES fit_files (id) ON DELETE CASCADE,
+    start_time INTEGER NOT NULL,
+    end_time INTEGER NOT NULL,
+    stage INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sleep_stages_file ON sleep_stages (file_id, start_time);
+"""
+
+# Child tables and the column that references fit_files (id).
+CHILD_TABLES = {
+    "sessions": "activity_id",
+    "laps": "activity_id",
+    "records": "activity_id",
+    "track_bounds": "activity_id",
+    "track_cells": "activity_id",
+    "sets": "activity_id",
+    "climbs": "activity_id",
+    "monitoring_days": "file_id",
+    "monitoring": "file_id",
+    "hrv_summaries": "file_id",
+    "hrv_values": "file_id",
+    "sleep_assessments": "file_id",
+    "sleep_stages": "file_id"
+}
+
+
+def result_fingerprint(result: FitResult) -> str:
+    """Return the fingerprint of the FIT file the result was built from.
+
+    It's the FILE_ID fingerprint when the message was found; otherwise it's
+    computed from the FIT file path.
+    """
+    model = getattr(result, "model", None)
+    file_id: FileIdModel | None = getattr(model, "file_id", None)
+    if file_id is not None:
+        return file_id.fingerprint()
+    return hashlib.sha1(result.fit_file_path.encode()).hexdigest()
+
+
+def _epoch(dt: datetime | None) -> int | None:
+    return to_epoch_seconds(dt) if dt is not None else None
+
+
+def _first(*values):
+    """Return the first value that is not None (0 is a valid value)."""
+    for value in values:
+        if value is not None:
+            return value
+    return None
+
+
+def _local_date(dt: datetime, time_zone: TimeZone) -> str:
+    return time_zone.to_local(dt).date().isoformat()
+
+
+def _local_dates(
+        timestamps: list[int | None], time_zone: TimeZone, default: str
+) -> list[str]:
+    """Return the local dates of POSIX timestamps (default for the None ones)."""
+    known: np.ndarray = np.array(
+        [t if t is not None else 0 for t in timestamps], dtype=np.int64
+    )
+    days: list[str] = np.datetime_as_string(
+        (time_zone.local_timestamps(known) // SECONDS_PER_DAY).astype("datetime64[D]")
+    ).tolist()
+    return [
+        day if t is not None else default for t, day in zip(timestamps, days)
+    ]
+
+
+class FitSqliteStore:
+    """SQLite store for FIT results.
+
+    It saves the results built by FitDataWhiz (activities with its sessions,
+    laps, records, sets and climbs; monitoring; HRV and sleep) so they can be
+    queried without parsing the FIT files again.
+
+    The track of every activity with positions is also saved as its bounding
+    box and the grid cells it passes through (see SpatialIndex).
+
+    Every FIT file is identified by its FILE_ID fingerprint, so ingesting a
+    file more than once replaces its data instead of duplicating it.
+
+    All rows of a batch of results are inserted with executemany inside one
+    transaction.
+
+    Local dates are computed in the time zone of each athlete (see
+    set_time_zone).
+    """
+
+    def __init__(self, db_path: str, athlete: str = DEFAULT_ATHLETE) -> None:
+        self.athlete: str = athlete
+        # Athlete -> time zone (see time_zone).
+        self._time_zones: dict[str, TimeZone] = {}
+        self._connection: sqlite3.Connection = sqlite3.connect(db_path)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        with self._connection:
+            self._connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "FitSqliteStore":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return self._connection
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def set_time_zone(self, time_zone: str | None, athlete: str | None = None) -> None:
+        """Set the IANA time zone ("Europe/Madrid"...) of the athlete, used to
+        compute the local dates of the results ingested from now on. None for
+        the default time zone (see utils.timezones).
+        """
+        athlete = athlete or self.athlete
+        if time_zone is not None:
+            get_time_zone(time_zone)
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO athletes (athlete, time_zone) VALUES (?, ?) "
+                "ON CONFLICT (athlete) DO UPDATE SET time_zone = excluded.time_zone",
+                (athlete, time_zone)
+            )
+        self._time_zones.pop(athlete, None)
+
+    def time_zone(self, athlete: str | None = None) -> TimeZone:
+        """Return the time zone of the athlete (see set_time_zone)."""
+        athlete = athlete or self.athlete
+        if athlete not in self._time_zones:
+            row = self._connection.execute(
+                "SELECT time_zone FROM athletes WHERE athlete = ?", (athlete,)
+            ).fetchone()
+            self._time_zones[athlete] = (
+                get_time_zone(row["time_zone"]) if row and row["time_zone"]
+                else default_time_zone()
+            )
+        return self._time_zones[athlete]
+
+    def ingest(self, result: FitResult, athlete: str | None = None) -> int | None:
+        """Save the result and return its id, or None if it can't be saved."""
+        return self.ingest_many([result], athlete)[0]
+
+    def ingest_many(
+            self, results: Iterable[FitResult], athlete: str | None = None
+    ) -> list[int | None]:
+        """Save all results in one transaction and return their ids.
+
+        FitError results are not saved, so its id is None.
+        """
+        ids: list[int | None] = []
+        with self._connection:
+            for result in results:
+                ids.append(self._ingest(result, athlete or self.athlete))
+        return ids
+
+    def delete(self, fingerprint: str) -> bool:
+        with self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM fit_files WHERE fingerprint = ?", (fingerprint,)
+            )
+        return cursor.rowcount > 0
+
+    def file_id(self, fingerprint: str) -> int | None:
+        row = self._connection.execute(
+            "SELECT id FROM fit_files WHERE fingerprint = ?", (fingerprint,)
+        ).fetchone()
+        return row["id"] if row else None
+
+    def sessions(
+            self,
+            athlete: str | None = None,
+            sport: str | None = None,
+            date_from: date | None = None,
+            date_to: date | None = None
+    ) -> list[sqlite3.Row]:
+        """Return the sessions, ordered by start time, that match the filters.
+
+        Dates are local dates and both ends are included.
+        """
+        conditions: list[str] = ["f.athlete = ?"]
+        params: list = [athlete or self.athlete]
+        if sport is not None:
+            conditions.append("s.sport = ?")
+            params.append(sport)
+        if date_from is not None:
+            conditions.append("s.date >= ?")
+            params.append(date_from.isoformat())
+        if date_to is not None:
+            conditions.append("s.date <= ?")
+            params.append(date_to.isoformat())
+
+        return self._connection.execute(
+            "SELECT f.fingerprint, f.fit_file_path, f.file_type, s.* "
+            "FROM sessions s JOIN fit_files f ON f.id = s.activity_id "
+            f"WHERE {' AND '.join(conditions)} "
+            "ORDER BY s.start_time, s.session_index",
+            params
+        ).fetchall()
+
+    def laps(self, activity_id: int) -> list[sqlite3.Row]:
+        return self._connection.execute(
+            "SELECT * FROM laps WHERE activity_id = ? ORDER BY timestamp", (activity_id,)
+        ).fetchall()
+
+    def records(self, activity_id: int) -> list[sqlite3.Row]:
+        return self._connection.execute(
+            "SELECT * FROM records WHERE activity_id = ? ORDER BY timestamp",
+            (activity_id,)
+        ).fetchall()
+
+    def record_arrays(self, activity_id: int) -> RecordArrays:
+        """Return the records of an activity as RecordArrays, reading them
+        with one query and without building any RecordModel.
+        """
+        fields: list[str] = [
+            "timestamp", "position_lat", "position_long", "distance", "speed",
+            "altitude", "heart_rate", "cadence", "power", "temperature"
+        ]
+        rows: list[tuple] = self._connection.execute(
+            f"SELECT {', '.join(fields)} FROM records WHERE activity_id = ? "
+            "ORDER BY timestamp",
+            (activity_id,)
+        ).fetchall()
+        values: np.ndarray = np.array(
+            [tuple(row) for row in rows], dtype=np.float64
+        ).reshape(len(rows), len(fields))
+        columns: dict[str, np.ndarray] = {
+            field: values[:, i] for i, field in enumerate(fields)
+        }
+        columns["timestamp"] = columns["timestamp"].astype(np.int64)
+        return RecordArrays(raw_columns=columns)
+
+    def track_bounds(self, athlete: str | None = None) -> list[sqlite3.Row]:
+        """Return the bounding box of the track of every activity."""
+        return self._connection.execute(
+            "SELECT f.fingerprint, b.min_lat, b.min_lon, b.max_lat, b.max_lon "
+            "FROM track_bounds b JOIN fit_files f ON f.id = b.activity_id "
+            "WHERE f.athlete = ?",
+            (athlete or self.athlete,)
+        ).fetchall()
+
+    def track_cells(self, athlete: str | None = None) -> list[sqlite3.Row]:
+        """Return the grid cells of the track of every activity."""
+        return self._connection.execute(
+            "SELECT f.fingerprint, c.cell "
+            "FROM track_cells c JOIN fit_files f ON f.id = c.activity_id "
+            "WHERE f.athlete = ? ORDER BY c.activity_id, c.cell",
+            (athlete or self.athlete,)
+        ).fetchall()
+
+    def sets(self, athlete: str | None = None) -> list[sqlite3.Row]:
+        """Return the sets of every set activity with its local date, ordered
+        by activity and set order.
+        """
+        return self._connection.execute(
+            "SELECT f.fingerprint, s.date, t.* "
+            "FROM sets t JOIN fit_files f ON f.id = t.activity_id "
+            "JOIN sessions s ON s.activity_id = t.activity_id AND s.session_index = 0 "
+            "WHERE f.athlete = ? ORDER BY t.activity_id, t.set_order",
+            (athlete or self.athlete,)
+        ).fetchall()
+
+    def climbs(self, athlete: str | None = None) -> list[sqlite3.Row]:
+        """Return the climbs of every climb activity with its local date,
+        ordered by activity and start time.
+        """
+        return self._connection.execute(
+            "SELECT f.fingerprint, s.date, c.* "
+            "FROM climbs c JOIN fit_files f ON f.id = c.activity_id "
+            "JOIN sessions s ON s.activity_id = c.activity_id AND s.session_index = 0 "
+            "WHERE f.athlete = ? ORDER BY c.activity_id, c.start_time",
+            (athlete or self.athlete,)
+        ).fetchall()
+
+    def hrv_summaries(self, athlete: str | None = None) -> list[sqlite3.Row]:
+        """Return the HRV summary of every night ordered by date."""
+        return self._connection.execute(
+            "SELECT f.fingerprint, h.* "
+            "FROM hrv_summaries h JOIN fit_files f ON f.id = h.file_id "
+            "WHERE f.athlete = ? ORDER BY h.date, h.timestamp",
+            (athlete or self.athlete,)
+        ).fetchall()
+
+    def sleep_stages(self, athlete: str | None = None) -> list[sqlite3.Row]:
+        """Return the sleep stage runs (see SleepTimeline) of every night with
+        its date, ordered by night and start time.
+        """
+        return self._connection.execute(
+            "SELECT f.fingerprint, a.date, t.start_time, t.end_time, t.stage "
+            "FROM sleep_stages t JOIN fit_files f ON f.id = t.file_id "
+            "JOIN sleep_assessments a ON a.file_id = t.file_id "
+            "WHERE f.athlete = ? ORDER BY t.file_id, t.start_time",
+            (athlete or self.athlete,)
+        ).fetchall()
+
+    def file_summaries(self, athlete: str | None = None) -> list[sqlite3.Row]:
+        """Return the start time (and the end time of sleep nights) of every
+        monitor, HRV and sleep file, the ones without sessions.
+        """
+        params: tuple = (athlete or self.athlete,) * 3
+        return self._connection.execute(
+            "SELECT f.fingerprint, f.fit_file_path, f.file_type, "
+            "m.timestamp AS start_time, NULL AS end_time "
+            "FROM monitoring_days m JOIN fit_files f ON f.id = m.file_id "
+            "WHERE f.athlete = ? AND m.timestamp IS NOT NULL "
+            "UNION ALL "
+            "SELECT f.fingerprint, f.fit_file_path, f.file_type, h.timestamp, NULL "
+            "FROM hrv_summaries h JOIN fit_files f ON f.id = h.file_id "
+            "WHERE f.athlete = ? "
+            "UNION ALL "
+            "SELECT f.fingerprint, f.fit_file_path, f.file_type, "
+            "MIN(t.start_time), MAX(t.end_time) "
+            "FROM sleep_stages t JOIN fit_files f ON f.id = t.file_id "
+            "WHERE f.athlete = ? GROUP BY t.file_id "
+            "ORDER BY start_time",
+            params
+        ).fetchall()
+
+    def monitoring(
+            self,
+            metric: str,
+            date_from: date,
+            date_to: date,
+            athlete: str | None = None
+    ) -> list[sqlite3.Row]:
+        """Return the monitoring samples of metric between both local dates."""
+        return self._connection.execute(
+            "SELECT m.date, m.timestamp, m.value "
+            "FROM monitoring m JOIN fit_files f ON f.id = m.file_id "
+            "WHERE f.athlete = ? AND m.metric = ? AND m.date BETWEEN ? AND ? "
+            "ORDER BY m.timestamp",
+            (athlete or self.athlete, metric, date_from.isoformat(), date_to.isoformat())
+        ).fetchall()
+
+    def monitoring_samples(self, athlete: str | None = None) -> list[sqlite3.Row]:
+        """Return the monitoring samples with timestamp of every file, ordered
+        by the FILE_ID time_created of their files.
+        """
+        return self._connection.execute(
+            "SELECT f.fingerprint, f.time_created, m.metric, m.timestamp, m.value "
+            "FROM monitoring m JOIN fit_files f ON f.id = m.file_id "
+            "WHERE f.athlete = ? AND m.timestamp IS NOT NULL "
+            "ORDER BY f.time_created, f.id",
+            (athlete or self.athlete,)
+        ).fetchall()
+
+    def _ingest(self, result: FitResult, athlete: str) -> int | None:
+        if isinstance(result, FitError):
+            return None
+
+        if isinstance(result, FitMultisportActivity):
+            result_type = MULTISPORT_RESULT
+        elif isinstance(result, FitActivity):
+            result_type = ACTIVITY_RESULT
+        elif isinstance(result, FitMonitor):
+            result_type = MONITOR_RESULT
+        elif isinstance(result, FitHrv):
+            result_type = HRV_RESULT
+        elif isinstance(result, FitSleep):
+            result_type = SLEEP_RESULT
+        else:
+            return None
+
+        row_id: int = self._upsert_file(result, result_type, athlete)
+        time_zone: TimeZone = self.time_zone(athlete)
+
+        if isinstance(result, FitMultisportActivity):
+            self._insert_sessions(row_id, result.model.sessions, time_zone)
+            self._insert_laps(row_id, result.model.laps)
+            self._insert_records(row_id, result.model.records)
+            self._insert_track(row_id, result.record_arrays)
+        elif isinstance(result, FitActivity):
+            self._insert_activity(row_id, result, time_zone)
+        elif isinstance(result, FitMonitor):
+            self._insert_monitor(row_id, result, time_zone)
+        elif isinstance(result, FitHrv):
+            self._insert_hrv(row_id, result, time_zone)
+        elif isinstance(result, FitSleep):
+            self._insert_sleep(row_id, result, time_zone)
+
+        return row_id
+
+    def _upsert_file(self, result: FitResult, result_type: str, athlete: str) -> int:
+        file_id: FileIdModel | None = getattr(result.model, "file_id", None)
+        row = self._connection.execute(
+            "INSERT INTO fit_files "
+            "(fingerprint, athlete, result_type, file_type, fit_file_path, time_created) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (fingerprint) DO UPDATE SET "
+            "athlete = excluded.athlete, result_type = excluded.result_type, "
+            "file_type = excluded.file_type, fit_file_path = excluded.fit_file_path, "
+            "time_created = excluded.time_created "
+            "RETURNING id",
+            (
+                result_fingerprint(result),
+                athlete,
+                result_type,
+                str(file_id.file_type) if file_id else None,
+                result.fit_file_path,
+                _epoch(file_id.time_created) if file_id else None
+            )
+        ).fetchone()
+        row_id: int = row["id"]
+
+        # The file could be ingested before: its previous data is replaced.
+        for table, column in CHILD_TABLES.items():
+            self._connection.execute(f"DELETE FROM {table} WHERE {column} = ?", (row_id,))
+
+        return row_id
+
+    def _insert_activity(
+            self, row_id: int, activity: FitActivity, time_zone: TimeZone
+    ) -> None:
+        self._insert_sessions(row_id, [activity.model.session], time_zone)
+
+        if isinstance(activity, FitDistanceActivity):
+            self._insert_laps(row_id, activity.model.laps)
+            self._insert_records(row_id, activity.model.records)
+            self._insert_track(row_id, activity.record_arrays)
+        elif isinstance(activity, FitClimbActivity):
+            self._connection.executemany(
+                "INSERT INTO climbs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        row_id, _epoch(c.time.start_time), str(c.split_type),
+                        c.time.elapsed, c.time.timer, c.hr.avg, c.hr.max,
+                        c.total_calories, c.difficulty, c.result.name.lower()
+                    )
+                    for c in activity.climbs
+                ]
+            )
+        elif isinstance(activity, FitSetActivity):
+            self._connection.executemany(
+                "INSERT INTO sets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        row_id, s.order, _epoch(s.time.timestamp),
+                        _epoch(s.time.start_time), s.exercise, s.time.elapsed,
+                        s.repetitions, s.weight, s.weight_unit
+                    )
+                    for s in activity.sets
+                ]
+            )
+
+    def _insert_sessions(
+            self, row_id: int, sessions: list[SessionModel], time_zone: TimeZone
+    ) -> None:
+        self._connection.executemany(
+            "INSERT INTO sessions VALUES "
+            "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    row_id, index, s.sport, s.sub_sport,
+                    _local_date(s.start_time, time_zone), _epoch(s.start_time),
+                    _epoch(s.timestamp), s.total_elapsed_time,
+                    s.total_timer_time, s.total_distance,
+                    _first(s.enhanced_avg_speed, s.avg_speed),
+                    _first(s.enhanced_max_speed, s.max_speed),
+                    s.avg_heart_rate, s.max_heart_rate, s.total_ascent,
+                    s.total_descent, s.total_calories, s.training_load_peak,
+                    s.total_training_effect
+                )
+                for index, s in enumerate(sessions)
+            ]
+        )
+
+    def _insert_laps(self, row_id: int, laps: list[LapModel]) -> None:
+        self._connection.executemany(
+            "INSERT INTO laps VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    row_id, lap.message_index, _epoch(lap.start_time),
+                    _epoch(lap.timestamp), lap.total_elapsed_time,
+                    lap.total_timer_time, lap.total_distance,
+                    _first(lap.enhanced_avg_speed, lap.avg_speed),
+                    lap.avg_heart_rate, lap.max_heart_rate, lap.total_ascent,
+                    lap.total_descent, lap.wkt_step_index
+                )
+                for lap in laps
+            ]
+        )
+
+    def _insert_records(self, row_id: int, records: list[RecordModel]) -> None:
+        self._connection.executemany(
+            "INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    row_id, _epoch(r.timestamp), r.position_lat, r.position_long,
+                    _first(r.enhanced_distance, r.distance),
+                    _first(r.enhanced_speed, r.speed),
+                    _first(r.enhanced_altitude, r.altitude),
+                    r.heart_rate, r.cadence, r.power, r.temperature
+                )
+                for r in records
+            ]
+        )
+
+    def _insert_track(self, row_id: int, records: RecordArrays) -> None:
+        lat, lon = records.position_lat, records.position_long
+        cells = grid_cells(lat, lon)
+        if len(cells) == 0:
+            return
+        self._connection.execute(
+            "INSERT INTO track_bounds VALUES (?, ?, ?, ?, ?)",
+            (
+                row_id, float(np.nanmin(lat)), float(np.nanmin(lon)),
+                float(np.nanmax(lat)), float(np.nanmax(lon))
+            )
+        )
+        self._connection.executemany(
+            "INSERT INTO track_cells VALUES (?, ?)",
+            [(cell, row_id) for cell in cells.tolist()]
+        )
+
+    def _insert_monitor(
+            self, row_id: int, monitor: FitMonitor, time_zone: TimeZone
+    ) -> None:
+        day: str = monitor.monitoring_date.isoformat()
+        self._connection.execute(
+            "INSERT INTO monitoring_days VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                row_id, day, _epoch(monitor.datetime_utc), monitor.metabolic_calories,
+                monitor.active_calories, monitor.total_steps
+            )
+        )
+
+        # (metric, timestamp, value) of every sample.
+        rows: list[tuple] = []
+        rows.extend(
+            (HEART_RATE_METRIC, timestamp, heart_rate)
+            for timestamp, heart_rate in zip(
+                monitor.heart_rate_series.timestamp.tolist(),
+                monitor.heart_rate_series.values.tolist()
+            )
+        )
+        for intensity in monitor.activity_intensities:
+            timestamp: int | None = _epoch(intensity.datetime_utc)
+            rows.append(
+                (MODERATE_MINUTES_METRIC, timestamp, intensity.moderate_minutes)
+            )
+            rows.append(
+                (VIGOROUS_MINUTES_METRIC, timestamp, intensity.vigorous_minutes)
+            )
+        for metric, series in (
+                (STRESS_METRIC, monitor.stress_series),
+                (RESPIRATION_METRIC, monitor.respiration_series)
+        ):
+            rows.extend(
+                (metric, timestamp, value)
+                for timestamp, value in zip(
+                    series.timestamp.tolist(), series.values.tolist()
+                )
+            )
+        rows.extend(
+            (STEPS_METRIC, _epoch(steps.datetime_utc), steps.steps)
+            for steps in monitor.steps
+        )
+        # Samples are dated by their own timestamps (a file may cross
+        # midnight), the ones without timestamp by the day of the file.
+        dates: list[str] = _local_dates([row[1] for row in rows], time_zone, day)
+        self._connection.executemany(
+            "INSERT INTO monitoring VALUES (?, ?, ?, ?, ?)",
+            [(row_id, row_date, *row) for row_date, row in zip(dates, rows)]
+        )
+
+    def _insert_hrv(self, row_id: int, hrv: FitHrv, time_zone: TimeZone) -> None:
+        self._connection.execute(
+            "INSERT INTO hrv_summaries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                row_id, _local_date(hrv.datetime_utc, time_zone),
+                _epoch(hrv.datetime_utc),
+                hrv.weekly_average, hrv.last_night_average, hrv.last_night_5_min_high,
+                hrv.baseline_low_upper, hrv.baseline_balanced_lower,
+                hrv.baseline_balanced_upper, hrv.status
+            )
+        )
+        self._connection.executemany(
+            "INSERT INTO hrv_values VALUES (?, ?, ?)",
+            [(row_id, _epoch(v.timestamp), v.value) for v in hrv.values]
+        )
+
+    def _insert_sleep(self, row_id: int, sleep: FitSleep, time_zone: TimeZone) -> None:
+        # The night is dated by the local day it ends.
+        day: str = (
+            _local_date(sleep.end_time, time_zone) if sleep.end_time is not None else ""
+        )
+        self._connection.execute(
+            "INSERT INTO sleep_assessments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                row_id, day, sleep.overall_sleep_score, sleep.sleep_quality_score,
+                sleep.sleep_duration_score, sleep.deep_sleep_score,
+                sleep.light_sleep_score, sleep.rem_sleep_score, sleep.awakenings_count,
+                sleep.average_stress_during_sleep
+            )
+        )
+        self._connection.executemany(
+            "INSERT INTO sleep_stages VALUES (?, ?, ?, ?)",
+            [
+                (row_id, start, end, stage)
+                for start, end, stage in zip(
+                    sleep.timeline.start.tolist(),
+                    sleep.timeline.end.tolist(),
+                    sleep.timeline.stage.tolist()
+                )
+            ]
+        )
@@ -0,0 +1,40 @@
+import numpy as np
+
+# Samples of each block of the exponential moving average.
+_EMA_BLOCK = 64
+# Smallest (1 - alpha) ** n of a block, far from float64 underflow.
+_EMA_MIN_POWER = 1e-100
+
+
+def exponential_moving_average(
+        values: np.ndarray, alpha: float, initial: float | None = None
+) -> np.ndarray:
+    """Exponential moving average: y[i] = alpha * x[i] + (1 - alpha) * y[i - 1].
+
+    y[-1] is initial, or values[0] if it isn't given.
+
+    Inside a block the recurrence is solved in closed form with cumulative
+    sums, so the loop is per block and not per sample. Blocks are short so
+    (1 - alpha) ** -n doesn't overflow: the closer alpha is to 1 the shorter
+    they are, down to one sample.
+    """
+    if len(values) == 0:
+        return np.empty(0)
+    decay: float = 1.0 - alpha
+    if decay <= 0.0:
+        # Every sample is its own average.
+        return np.asarray(values, dtype=np.float64).copy()
+    size: int = _EMA_BLOCK
+    if decay ** _EMA_BLOCK < _EMA_MIN_POWER:
+        size = max(int(np.log(_EMA_MIN_POWER) / np.log(decay)), 1)
+    result: np.ndarray = np.empty(len(values))
+    previous: float = float(values[0]) if initial is None else float(initial)
+    powers: np.ndarray = decay ** np.arange(1, size + 1)
+    for start in range(0, len(values), size):
+        block: np.ndarray = values[start:start + size]
+        block_powers: np.ndarray = powers[:len(block)]
+        result[start:start + len(block)] = block_powers * (
+            previous + alpha * np.cumsum(block / block_powers)
+        )
+        previous = float(result[start + len(block) - 1])
+    return result
@@ -1,25 +1,25 @@
-from datetime import datetime, tzinfo, timedelta, time, date
+from datetime import datetime, timedelta, time, date, timezone
+
+from fit_data_whiz.utils.timezones import default_time_zone
 
 
 def try_to_compute_local_datetime(dt_utc: datetime) -> datetime:
     """
-    Try to compute the local datetime from dt_utc and return the local datetime
-    or dt_utc itself.
+    Compute the local datetime from dt_utc in the default time zone (see
+    utils.timezones).
     """
-    info: tzinfo | None = datetime(
-        dt_utc.year, dt_utc.month, dt_utc.day
-    ).astimezone().tzinfo
+    return default_time_zone().to_local(dt_utc)
 
-    local_timedelta: timedelta | None = (
-        info.utcoffset(dt_utc) if info else timedelta(seconds=0)
-    )
 
-    datetime_local: datetime = (
-        dt_utc + (local_timedelta if local_timedelta else timedelta(seconds=0))
-    )
+def combine_date_and_seconds(d: date, s: int) -> datetime:
+    return datetime.combine(d, time.min) + timedelta(seconds=s)
 
-    return datetime_local
 
+def to_epoch_seconds(dt: datetime) -> int:
+    """Return the POSIX timestamp of dt.
 
-def combine_date_and_seconds(d: date, s: int) -> datetime:
-    return datetime.combine(d, time.min) + timedelta(seconds=s)
+    Naive datetimes are considered UTC datetimes.
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
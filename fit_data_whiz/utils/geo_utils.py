@@ -0,0 +1,57 @@
+import numpy as np
+
+# Mean Earth radius (meters).
+EARTH_RADIUS = 6_371_000.0
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Return the great circle distance (meters) between points in degrees.
+
+    Arguments can be floats or NumPy arrays (broadcast together).
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def to_local_meters(
+        lat: np.ndarray, lon: np.ndarray, lat0: float, lon0: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Project degrees to (x, y) meters from (lat0, lon0).
+
+    Equirectangular projection: accurate enough for the extent of an
+    activity, far from the poles.
+    """
+    x: np.ndarray = np.radians(lon - lon0) * EARTH_RADIUS * np.cos(np.radians(lat0))
+    y: np.ndarray = np.radians(lat - lat0) * EARTH_RADIUS
+    return x, y
+
+
+# Size (degrees) of the cells of the grid that tracks are indexed by. Cells
+# are saved into the store, so changing it needs the tracks indexed again.
+GRID_CELL_SIZE = 0.01
+
+# Columns of the grid: the cell code is row * GRID_COLUMNS + column.
+GRID_COLUMNS = int(round(360 / GRID_CELL_SIZE))
+
+
+def grid_cells(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Return the sorted, unique codes of the grid cells of the points.
+
+    Points without position (NaN) are skipped.
+    """
+    valid: np.ndarray = ~np.isnan(lat) & ~np.isnan(lon)
+    rows: np.ndarray = np.floor((lat[valid] + 90) / GRID_CELL_SIZE).astype(np.int64)
+    columns: np.ndarray = np.floor((lon[valid] + 180) / GRID_CELL_SIZE).astype(np.int64)
+    return np.unique(rows * GRID_COLUMNS + np.clip(columns, 0, GRID_COLUMNS - 1))
+
+
+def cell_bounds(cells: np.ndarray) -> tuple[np.ndarray, ...]:
+    """Return the (min lat, min lon, max lat, max lon) degrees of the cells."""
+    rows, columns = np.divmod(cells, GRID_COLUMNS)
+    min_lat: np.ndarray = rows * GRID_CELL_SIZE - 90
+    min_lon: np.ndarray = columns * GRID_CELL_SIZE - 180
+    return min_lat, min_lon, min_lat + GRID_CELL_SIZE, min_lon + GRID_CELL_SIZE
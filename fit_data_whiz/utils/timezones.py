@@ -0,0 +1,252 @@
+import os
+import struct
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from importlib import resources
+from zoneinfo import TZPATH, ZoneInfo
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+SECONDS_PER_HOUR = 3600
+
+# Transitions are only looked for between these years, enough for any FIT
+# file (FIT time starts in 1989).
+MIN_YEAR = 1970
+MAX_YEAR = 2100
+
+
+def _year_start(year: int) -> int:
+    return int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+def _year(epoch: int) -> int:
+    epoch = min(max(epoch, _year_start(MIN_YEAR)), _year_start(MAX_YEAR + 1) - 1)
+    return datetime.fromtimestamp(epoch, timezone.utc).year
+
+
+def _epoch(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _zone_data(key: str) -> bytes | None:
+    """Return the TZif data of an IANA key, looked for as ZoneInfo does: in
+    TZPATH and then in the tzdata package.
+    """
+    for path in TZPATH:
+        file_path: str = os.path.join(path, key)
+        if os.path.isfile(file_path):
+            with open(file_path, "rb") as zone_file:
+                return zone_file.read()
+    try:
+        return resources.files("tzdata.zoneinfo").joinpath(*key.split("/")).read_bytes()
+    except (ImportError, OSError):
+        return None
+
+
+def _zone_transitions(data: bytes) -> tuple[np.ndarray, np.ndarray] | None:
+    """Return the POSIX seconds of the transitions of TZif data and the UTC
+    offset (seconds) from each one, or None if data isn't TZif.
+
+    Transitions after the last one come from the rule of the footer, so they
+    aren't returned.
+    """
+    if data[:4] != b"TZif":
+        return None
+    time_size: int = 4
+    offset: int = 0
+    counts: tuple = struct.unpack(">6l", data[20:44])
+    if data[4:5] >= b"2":
+        # Skip the version 1 (32-bit) data block to the 64-bit one.
+        utc_count, std_count, leap_count, time_count, type_count, char_count = counts
+        offset = (
+            44 + time_count * 5 + type_count * 6 + char_count + leap_count * 8 +
+            std_count + utc_count
+        )
+        if data[offset:offset + 4] != b"TZif":
+            return None
+        counts = struct.unpack(">6l", data[offset + 20:offset + 44])
+        time_size = 8
+    time_count, type_count = counts[3], counts[4]
+    offset += 44
+
+    times: np.ndarray = np.frombuffer(
+        data, f">i{time_size}", time_count, offset
+    ).astype(np.int64)
+    offset += time_count * time_size
+    type_indexes: np.ndarray = np.frombuffer(data, np.uint8, time_count, offset)
+    offset += time_count
+    types: np.ndarray = np.frombuffer(
+        data, np.dtype([("utc_offset", ">i4"), ("is_dst", "u1"), ("abbr", "u1")]),
+        type_count, offset
+    )
+    return times, types["utc_offset"].astype(np.int64)[type_indexes]
+
+
+class TimeZone:
+    """UTC to local time conversions of an IANA time zone (or the host one).
+
+    The UTC offset transitions (DST changes...) of the zone are read from its
+    TZif data and cached per year, so the local time of a datetime is a binary
+    search and whole arrays of POSIX seconds are converted with a few
+    vectorized operations. Years after the last transition of the data follow
+    its yearly rule and are probed once a day, as the years of zones without
+    data (the host one) are once an hour, and every change is bisected to the
+    second it happens.
+
+    Local datetimes are the UTC datetime plus the UTC offset, the same way
+    they are computed everywhere in the library.
+
+    Example:
+        time_zone = get_time_zone("Europe/Madrid")
+        time_zone.to_local(datetime_utc)
+        time_zone.local_timestamps(timestamps)
+    """
+    __slots__ = (
+        "key", "_zone", "_data", "_first_year", "_last_year", "_transitions",
+        "_offsets"
+    )
+
+    def __init__(self, key: str | None = None) -> None:
+        # None for the time zone of the host.
+        self.key: str | None = key
+        self._zone: ZoneInfo | None = ZoneInfo(key) if key is not None else None
+        # Transitions and offsets of the TZif data (loaded with the first
+        # year), None if the zone doesn't have data.
+        self._data: tuple[np.ndarray, np.ndarray] | None = None
+        self._first_year: int | None = None
+        self._last_year: int | None = None
+        # POSIX seconds from which every offset (seconds) applies.
+        self._transitions: np.ndarray = np.empty(0, dtype=np.int64)
+        self._offsets: np.ndarray = np.empty(0, dtype=np.int64)
+
+    def __repr__(self) -> str:
+        return f"TimeZone({self.key!r})"
+
+    def utc_offset(self, dt_utc: datetime) -> timedelta:
+        """Return the UTC offset of the zone at dt_utc (naive datetimes are
+        UTC datetimes).
+        """
+        epoch: int = _epoch(dt_utc)
+        self._load(epoch, epoch)
+        return timedelta(seconds=int(self._offsets[self._index(epoch)]))
+
+    def to_local(self, dt_utc: datetime) -> datetime:
+        """Return the local datetime of dt_utc."""
+        return dt_utc + self.utc_offset(dt_utc)
+
+    def utc_offsets(self, timestamps: np.ndarray) -> np.ndarray:
+        """Return the UTC offset (seconds) at every POSIX timestamp."""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if len(timestamps) == 0:
+            return np.empty(0, dtype=np.int64)
+        self._load(int(timestamps.min()), int(timestamps.max()))
+        return self._offsets[self._index(timestamps)]
+
+    def local_timestamps(self, timestamps: np.ndarray) -> np.ndarray:
+        """Return the local time (seconds) of every POSIX timestamp."""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        return timestamps + self.utc_offsets(timestamps)
+
+    def _index(self, epochs):
+        index = np.searchsorted(self._transitions, epochs, side="right") - 1
+        return np.maximum(index, 0)
+
+    def _offset_at(self, epoch: int) -> int:
+        dt_utc: datetime = datetime.fromtimestamp(epoch, timezone.utc)
+        local: datetime = dt_utc.astimezone(self._zone)
+        offset: timedelta | None = local.utcoffset()
+        return int(offset.total_seconds()) if offset is not None else 0
+
+    def _load(self, start: int, end: int) -> None:
+        """Compute the transitions of the years between both POSIX timestamps
+        that aren't cached yet.
+        """
+        first_year, last_year = _year(start), _year(end)
+        if self._first_year is None:
+            if self.key is not None:
+                data: bytes | None = _zone_data(self.key)
+                self._data = _zone_transitions(data) if data is not None else None
+            parts: list[tuple[np.ndarray, np.ndarray]] = [
+                self._years(first_year, last_year)
+            ]
+        else:
+            if self._first_year <= first_year and last_year <= self._last_year:
+                return
+            parts = [(self._transitions, self._offsets)]
+            if first_year < self._first_year:
+                parts.insert(0, self._years(first_year, self._first_year - 1))
+            if last_year > self._last_year:
+                parts.append(self._years(self._last_year + 1, last_year))
+            first_year = min(first_year, self._first_year)
+            last_year = max(last_year, self._last_year)
+
+        transitions: np.ndarray = np.concatenate([part[0] for part in parts])
+        offsets: np.ndarray = np.concatenate([part[1] for part in parts])
+        # Only the transitions that change the offset are kept.
+        changes: np.ndarray = np.append(True, offsets[1:] != offsets[:-1])
+        self._first_year, self._last_year = first_year, last_year
+        self._transitions = transitions[changes]
+        self._offsets = offsets[changes]
+
+    def _years(self, first_year: int, last_year: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return the transitions from the start of first_year to the end of
+        last_year, the first one at the start with its offset.
+        """
+        start, end = _year_start(first_year), _year_start(last_year + 1)
+        transitions: list[int] = [start]
+        offsets: list[int] = [self._offset_at(start)]
+        probe_from: int = start
+        step: int = SECONDS_PER_HOUR
+        if self._data is not None:
+            data_transitions, data_offsets = self._data
+            inside: np.ndarray = (data_transitions > start) & (data_transitions < end)
+            transitions.extend(data_transitions[inside].tolist())
+            offsets.extend(data_offsets[inside].tolist())
+            if len(data_transitions):
+                probe_from = max(start, int(data_transitions[-1]))
+            step = SECONDS_PER_DAY
+
+        for probe in range(probe_from + step, end + step, step):
+            probe = min(probe, end)
+            offset: int = self._offset_at(probe)
+            if offset == offsets[-1]:
+                continue
+            low, high = probe - step, probe
+            while high - low > 1:
+                middle: int = (low + high) // 2
+                if self._offset_at(middle) == offset:
+                    high = middle
+                else:
+                    low = middle
+            transitions.append(high)
+            offsets.append(offset)
+        return np.array(transitions, dtype=np.int64), np.array(offsets, dtype=np.int64)
+
+
+@lru_cache(maxsize=None)
+def get_time_zone(key: str | None = None) -> TimeZone:
+    """Return the TimeZone of an IANA key ("Europe/Madrid"...) or the one of
+    the host if key is None.
+
+    There is one TimeZone per key so its transitions are computed only once.
+    """
+    return TimeZone(key)
+
+
+_default_key: str | None = None
+
+
+def set_default_time_zone(key: str | None) -> None:
+    """Set the time zone used when no other one is given (None for the time
+    zone of the host).
+    """
+    global _default_key
+    get_time_zone(key)
+    _default_key = key
+
+
+def default_time_zone() -> TimeZone:
+    return get_time_zone(_default_key)
@@ -1,22 +1,29 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 from pydantic import BaseModel
 from garmin_fit_sdk import Decoder, Stream, Profile
 
 from fit_data_whiz.logging.logging import get_logger, initialize, LogLevel
-from fit_data_whiz.fit.definitions import MESSAGES
+from fit_data_whiz.fit.definitions import ARRAY_MESSAGES, MESSAGES
 from fit_data_whiz.fit.exceptions import (
     FitException, NotFitMessageFoundException, NotSupportedFitFileException
 )
 from fit_data_whiz.fit.results import FitResult, FitError
+from fit_data_whiz.fit.transfer import PackedResult, pack, unpack
 from fit_data_whiz.fit.parsers import (
     FitActivityParser, FitMonitoringParser, FitHrvParser, FitSleepParser
 )
+from fit_data_whiz.utils.timezones import TimeZone, get_time_zone
 
 # Initialize logger system.
 initialize(LogLevel.DEBUG)
 
 
+# ARRAY_MESSAGES by number.
+ARRAY_MESSAGE_NUMS = {message["num"]: message for message in ARRAY_MESSAGES.values()}
+
 # All FIT files supported.
 FIT_FILE_SUPPORTED = {
     "activity": {
@@ -52,17 +59,59 @@ FIT_FILE_SUPPORTED = {
 }
 
 
+def parse_packed(
+        fit_file_path: str, shared_memory: bool = False, time_zone: str | None = None
+) -> PackedResult:
+    """Parse the FIT file and return its result packed (see fit.transfer).
+
+    It's meant to run in worker processes: the packed result is much cheaper
+    to send back to the parent process than the result itself.
+    """
+    return pack(FitDataWhiz(fit_file_path, time_zone).parse(), shared_memory)
+
+
 class FitReader:
-    def __init__(self, root_folder: str) -> None:
+    """It parses all FIT files inside root_folder (and its sub folders).
+
+    If max_workers is given, files are parsed in a pool of processes and the
+    results are sent back packed, optionally through shared memory.
+
+    Local times are computed in time_zone (IANA key) or the default one (see
+    utils.timezones).
+    """
+    def __init__(
+            self,
+            root_folder: str,
+            max_workers: int | None = None,
+            shared_memory: bool = False,
+            time_zone: str | None = None
+    ) -> None:
         self.fit_results: dict[str, FitResult] = {}
 
-        for dirpath, dirnames, filenames in os.walk(root_folder):
-            for filename in [name for name in filenames if name.lower().endswith(".fit")]:
-                print(os.path.join(dirpath, filename))
-                fit_file_path: str = os.path.join(dirpath, filename)
-                fit_parser = FitDataWhiz(fit_file_path)
+        fit_file_paths: list[str] = [
+            os.path.join(dirpath, filename)
+            for dirpath, dirnames, filenames in os.walk(root_folder)
+            for filename in filenames if filename.lower().endswith(".fit")
+        ]
+
+        if max_workers is None:
+            for fit_file_path in fit_file_paths:
+                print(fit_file_path)
+                fit_parser = FitDataWhiz(fit_file_path, time_zone)
                 fit_result: FitResult = fit_parser.parse()
                 self.fit_results[fit_file_path] = fit_result
+            return
+
+        with ProcessPoolExecutor(max_workers) as executor:
+            packed_results = executor.map(
+                parse_packed,
+                fit_file_paths,
+                [shared_memory] * len(fit_file_paths),
+                [time_zone] * len(fit_file_paths)
+            )
+            for fit_file_path, packed in zip(fit_file_paths, packed_results):
+                print(fit_file_path)
+                self.fit_results[fit_file_path] = unpack(packed)
 
 
 class FitDataWhiz:
@@ -80,10 +129,17 @@ class FitDataWhiz:
     Once you have the object of this class then call parse method and it returns
     a FitResult that can be a FitError, FitActivity or whatever fit result
     depending on the type of the fit file.
+
+    Local times are computed in time_zone (IANA key, for example the one of
+    the athlete) or in the default one (see utils.timezones).
     """
-    def __init__(self, fit_file_path: str) -> None:
+    def __init__(self, fit_file_path: str, time_zone: str | None = None) -> None:
         self._fit_file_path: str = fit_file_path
+        self._time_zone: TimeZone | None = (
+            get_time_zone(time_zone) if time_zone is not None else None
+        )
         self._messages: dict[str, list[BaseModel]] = {name: [] for name in MESSAGES}
+        self._arrays: dict[str, list[float]] = {name: [] for name in ARRAY_MESSAGES}
         self._errors: list[Exception] = []
         self._has_critical_error: bool = False
 
@@ -108,16 +164,33 @@ class FitDataWhiz:
 
         parser = FIT_FILE_SUPPORTED[file_type]["parser_cls"](
             fit_file_path=self._fit_file_path,
-            messages=self._messages
+            messages=self._messages,
+            time_zone=self._time_zone,
+            arrays={
+                name: np.array(values, dtype=np.float64)
+                for name, values in self._arrays.items()
+            }
         )
         return parser.parse()
 
     def _mesg_listener(self, mesg_num: int, mesg: dict) -> None:
         if self._has_critical_error:
             return
+        if mesg_num in ARRAY_MESSAGE_NUMS:
+            self._add_array_values(ARRAY_MESSAGE_NUMS[mesg_num], mesg)
+            return
         for profile_name, profile_num in Profile["mesg_num"].items():
             self._add_message_if_supported(profile_name, profile_num, mesg_num, mesg)
 
+    def _add_array_values(self, message: dict, mesg_data: dict) -> None:
+        values = mesg_data.get(message["field"])
+        if values is None:
+            return
+        self._arrays[message["name"]].extend(
+            value for value in (values if isinstance(values, list) else [values])
+            if value is not None
+        )
+
     def _add_message_if_supported(
             self, profile_name: str, profile_num: int, mesg_num: int, mesg_data: dict
     ) -> None:
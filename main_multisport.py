@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+
+from fit_data_whiz.whiz import FitDataWhiz
+from fit_data_whiz.fit.definitions import TRANSITION_SPORT, is_distance_sport
+from fit_data_whiz.fit.models import DistanceActivityModel
+from fit_data_whiz.fit.results import (
+    FitDistanceActivity,
+    FitMultisportActivity,
+    filter_by_session
+)
+
+
+def split_copying(activity: FitMultisportActivity) -> list[FitDistanceActivity]:
+    """Split the sessions copying and validating their records again."""
+    activities: list[FitDistanceActivity] = []
+    for session in activity.model.sessions:
+        if session.sport == TRANSITION_SPORT or not is_distance_sport(session.sport):
+            continue
+        records, laps = filter_by_session(
+            session, activity.model.records, activity.model.laps
+        )
+        activities.append(FitDistanceActivity(
+            activity.fit_file_path,
+            DistanceActivityModel(
+                session=session, workout=None, workout_steps=[], records=records,
+                laps=laps
+            )
+        ))
+    return activities
+
+
+def split_views(activity: FitMultisportActivity) -> list:
+    """Split the sessions as views of the multisport records."""
+    return FitMultisportActivity(activity.fit_file_path, activity.model).fit_activities
+
+
+if __name__ == "__main__":
+    folder_files: str = sys.argv[1] if len(sys.argv) > 1 else "tests/files"
+    repetitions: int = 25
+
+    activities: list[FitMultisportActivity] = []
+    for file in sorted(os.listdir(folder_files)):
+        path_file = os.path.join(folder_files, file)
+        if not os.path.isfile(path_file):
+            continue
+        result = FitDataWhiz(path_file).parse()
+        if isinstance(result, FitMultisportActivity):
+            activities.append(result)
+    print(f"Multisport files: {len(activities)}")
+
+    for name, split in (("copies", split_copying), ("views", split_views)):
+        start: float = time.perf_counter()
+        for _ in range(repetitions):
+            for activity in activities:
+                # Columns are built and used as the analytics modules do.
+                for session_activity in split(activity):
+                    if isinstance(session_activity, FitDistanceActivity):
+                        session_activity.record_arrays.heart_rate
+        elapsed: float = time.perf_counter() - start
+        print(f"{name}: {elapsed / repetitions * 1000:.2f} ms per pass")
@@ -0,0 +1,396 @@
+"""Builders of synthetic FIT results (and small FIT files) for the tests
+that don't need the FIT files of the repository.
+"""
+from datetime import datetime, timedelta, timezone
+
+from garmin_fit_sdk import Encoder, Profile
+
+from fit_data_whiz.fit.arrays import FIT_EPOCH_OFFSET
+from fit_data_whiz.fit.models import (
+    FileIdModel,
+    SessionModel,
+    RecordModel,
+    LapModel,
+    DistanceActivityModel,
+    MultisportActivityModel,
+    ClimbActivityModel,
+    SplitModel,
+    SetActivityModel,
+    SetModel,
+    MonitorModel,
+    MonitoringInfoModel,
+    MonitoringModel,
+    StressLevelModel,
+    RespirationRateModel,
+    SleepModel,
+    SleepAssessmentModel,
+    SleepLevelModel,
+    HrvModel,
+    HrvStatusSummaryModel,
+    HrvValueModel
+)
+from fit_data_whiz.fit.results import (
+    FitClimbActivity,
+    FitDistanceActivity,
+    FitHrv,
+    FitMonitor,
+    FitMultisportActivity,
+    FitSetActivity,
+    FitSleep
+)
+from fit_data_whiz.utils.timezones import TimeZone
+
+START_TIME = datetime(2023, 7, 25, 8, 0, 0, tzinfo=timezone.utc)
+
+# 1 degree expressed in FIT semicircles.
+SEMICIRCLES_PER_DEGREE = 2 ** 31 / 180
+
+
+def build_file_id(
+        serial_number: int = 1, time_created: datetime = START_TIME
+) -> FileIdModel:
+    return FileIdModel(**{
+        "type": "activity",
+        "serial_number": serial_number,
+        "time_created": time_created,
+        "manufacturer": "garmin"
+    })
+
+
+def build_session(
+        start_time: datetime = START_TIME,
+        seconds: int = 600,
+        sport: str = "running",
+        sub_sport: str = "generic",
+        **kwargs
+) -> SessionModel:
+    return SessionModel(
+        message_index=0,
+        timestamp=start_time + timedelta(seconds=seconds),
+        start_time=start_time,
+        total_elapsed_time=float(seconds),
+        total_timer_time=float(seconds),
+        sport=sport,
+        sub_sport=sub_sport,
+        **kwargs
+    )
+
+
+def build_records(
+        start_time: datetime = START_TIME,
+        speeds: list[float] | None = None,
+        heart_rates: list[int | None] | None = None,
+        altitudes: list[float | None] | None = None,
+        lat: float = 40.0,
+        lon: float = -3.0
+) -> list[RecordModel]:
+    """Build one record per second moving north at the given speeds (m/s)."""
+    speeds = speeds if speeds is not None else [3.0] * 600
+    records: list[RecordModel] = []
+    distance: float = 0.0
+    for i, speed in enumerate(speeds):
+        distance += speed
+        records.append(RecordModel(
+            timestamp=start_time + timedelta(seconds=i),
+            position_lat=round((lat + distance / 111_195) * SEMICIRCLES_PER_DEGREE),
+            position_long=round(lon * SEMICIRCLES_PER_DEGREE),
+            enhanced_distance=distance,
+            enhanced_speed=speed,
+            heart_rate=heart_rates[i] if heart_rates is not None else 150,
+            enhanced_altitude=altitudes[i] if altitudes is not None else 100.0
+        ))
+    return records
+
+
+def build_lap(
+        message_index: int, start_time: datetime, seconds: int, **kwargs
+) -> LapModel:
+    return LapModel(
+        message_index=message_index,
+        start_time=start_time,
+        timestamp=start_time + timedelta(seconds=seconds),
+        total_elapsed_time=float(seconds),
+        total_timer_time=float(seconds),
+        **kwargs
+    )
+
+
+def build_distance_activity(
+        records: list[RecordModel] | None = None,
+        laps: list[LapModel] | None = None,
+        session: SessionModel | None = None,
+        file_id: FileIdModel | None = None,
+        fit_file_path: str = "synthetic.fit"
+) -> FitDistanceActivity:
+    records = records if records is not None else build_records()
+    start_time: datetime = records[0].timestamp if records else START_TIME
+    seconds: int = len(records)
+    return FitDistanceActivity(
+        fit_file_path,
+        DistanceActivityModel(
+            session=session or build_session(start_time, seconds, total_distance=1800.0),
+            records=records,
+            laps=laps if laps is not None else [build_lap(0, start_time, seconds)],
+            file_id=file_id or build_file_id(time_created=start_time)
+        )
+    )
+
+
+def build_multisport_activity(
+        sessions: list[tuple[str, int]] | None = None,
+        start_time: datetime = START_TIME
+) -> FitMultisportActivity:
+    """Build a multisport activity from (sport, seconds) sessions one after
+    another, with one record per second and one lap per session.
+    """
+    sessions = sessions if sessions is not None else [
+        ("running", 300), ("transition", 60), ("cycling", 600), ("running", 300)
+    ]
+    session_models: list[SessionModel] = []
+    laps: list[LapModel] = []
+    session_start: datetime = start_time
+    for index, (sport, seconds) in enumerate(sessions):
+        session_models.append(build_session(session_start, seconds, sport))
+        laps.append(build_lap(index, session_start, seconds))
+        # The next session starts the second after this one ends.
+        session_start += timedelta(seconds=seconds + 1)
+    seconds: int = int((session_start - start_time).total_seconds())
+    return FitMultisportActivity(
+        "multisport.fit",
+        MultisportActivityModel(
+            sessions=session_models,
+            records=build_records(
+                start_time, [3.0] * seconds,
+                heart_rates=[100 + i % 60 for i in range(seconds)]
+            ),
+            laps=laps,
+            file_id=build_file_id(time_created=start_time)
+        )
+    )
+
+
+def build_set_activity(
+        sets: list[tuple[str, int | None, float | None, float]],
+        start_time: datetime = START_TIME,
+        file_id: FileIdModel | None = None
+) -> FitSetActivity:
+    """Build a strength training from (exercise, repetitions, weight, seconds)
+    sets, one after the other. Exercise rest builds a rest interval.
+    """
+    models: list[SetModel] = []
+    timestamp: datetime = start_time
+    for index, (exercise, repetitions, weight, seconds) in enumerate(sets):
+        rest: bool = exercise == "rest"
+        models.append(SetModel(
+            timestamp=timestamp,
+            start_time=timestamp,
+            duration=seconds,
+            repetitions=repetitions,
+            weight=weight,
+            set_type="rest" if rest else "active",
+            category=None if rest else [exercise],
+            message_index=index
+        ))
+        timestamp += timedelta(seconds=seconds)
+    return FitSetActivity(
+        "strength.fit",
+        SetActivityModel(
+            session=build_session(
+                start_time, int((timestamp - start_time).total_seconds()),
+                sport="training", sub_sport="strength_training"
+            ),
+            sets=models,
+            file_id=file_id or build_file_id(time_created=start_time)
+        )
+    )
+
+
+def build_climb_activity(
+        climbs: list[tuple[str, float, int | None, int | None]],
+        start_time: datetime = START_TIME,
+        file_id: FileIdModel | None = None
+) -> FitClimbActivity:
+    """Build a climbing session from (split type, seconds, difficulty, result)
+    splits, one after the other. Result is 3 (completed) or 2 (attempted).
+    """
+    splits: list[SplitModel] = []
+    timestamp: datetime = start_time
+    for split_type, seconds, difficulty, result in climbs:
+        splits.append(SplitModel(**{
+            "split_type": split_type,
+            "total_elapsed_time": seconds,
+            "total_timer_time": seconds,
+            "start_time": timestamp,
+            "70": difficulty,
+            "71": result
+        }))
+        timestamp += timedelta(seconds=seconds)
+    return FitClimbActivity(
+        "climb.fit",
+        ClimbActivityModel(
+            session=build_session(
+                start_time, int((timestamp - start_time).total_seconds()),
+                sport="rock_climbing", sub_sport="indoor_climbing"
+            ),
+            splits=splits,
+            file_id=file_id or build_file_id(time_created=start_time)
+        )
+    )
+
+
+def build_monitor(
+        day_start: datetime = datetime(2023, 7, 25, tzinfo=timezone.utc),
+        heart_rates: int = 60,
+        min_heart_rate: int = 60,
+        time_created: datetime | None = None,
+        time_zone: TimeZone | None = None
+) -> FitMonitor:
+    """Build a monitoring result with one HR sample per minute from day_start.
+
+    time_created (day_start by default) is the FILE_ID one.
+    """
+    monitorings: list[MonitoringModel] = [
+        MonitoringModel(timestamp=day_start, steps=1000, distance=800.0, calories=50),
+        MonitoringModel(timestamp=day_start, heart_rate=min_heart_rate)
+    ]
+    base: int = int(day_start.timestamp()) - FIT_EPOCH_OFFSET
+    monitorings.extend(
+        MonitoringModel(
+            timestamp_16=(base + 60 * i) & 0xFFFF, heart_rate=min_heart_rate + i % 30
+        )
+        for i in range(1, heart_rates)
+    )
+    return FitMonitor(
+        "monitor.fit",
+        MonitorModel(
+            monitoring_info=MonitoringInfoModel(
+                timestamp=day_start, activity_type=["walking", "running"],
+                resting_metabolic_rate=1500
+            ),
+            monitorings=monitorings,
+            stress_levels=[
+                StressLevelModel(
+                    stress_level_value=20 + i,
+                    stress_level_time=day_start + timedelta(minutes=3 * i)
+                )
+                for i in range(20)
+            ],
+            respiration_rates=[
+                RespirationRateModel(
+                    timestamp=day_start + timedelta(minutes=2 * i), respiration_rate=14.0
+                )
+                for i in range(20)
+            ],
+            file_id=FileIdModel(**{
+                "type": "monitoring_b", "serial_number": 1,
+                "time_created": time_created or day_start
+            })
+        ),
+        time_zone
+    )
+
+
+def build_sleep(
+        levels: list[tuple[str, int]],
+        start_time: datetime = datetime(2023, 7, 24, 22, 0, 0, tzinfo=timezone.utc),
+        file_id: FileIdModel | None = None
+) -> FitSleep:
+    """Build a sleep result from (sleep level, minutes) pairs, with one
+    SLEEP_LEVEL message per minute from start_time.
+    """
+    level_models: list[SleepLevelModel] = []
+    for level, minutes in levels:
+        level_models.extend(
+            SleepLevelModel(
+                timestamp=start_time + timedelta(minutes=len(level_models)),
+                sleep_level=level
+            )
+            for _ in range(minutes)
+        )
+    scores: dict[str, int] = {
+        name: 80 for name, field in SleepAssessmentModel.model_fields.items()
+        if field.annotation is int
+    }
+    return FitSleep(
+        "sleep.fit",
+        SleepModel(
+            assessment=SleepAssessmentModel(**scores, average_stress_during_sleep=20.0),
+            levels=level_models,
+            file_id=file_id or FileIdModel(**{
+                "type": 49, "serial_number": 1, "time_created": start_time
+            })
+        )
+    )
+
+
+def build_hrv(
+        last_night_average: float,
+        timestamp: datetime = datetime(2023, 7, 25, 6, 0, 0, tzinfo=timezone.utc),
+        balanced: tuple[float, float] = (40.0, 60.0),
+        file_id: FileIdModel | None = None
+) -> FitHrv:
+    """Build an HRV result of the night that ends at timestamp."""
+    return FitHrv(
+        "hrv.fit",
+        HrvModel(
+            summary=HrvStatusSummaryModel(
+                timestamp=timestamp, weekly_average=last_night_average,
+                last_night_average=last_night_average,
+                last_night_5_min_high=last_night_average + 10,
+                baseline_low_upper=balanced[0] - 5,
+                baseline_balanced_lower=balanced[0],
+                baseline_balanced_upper=balanced[1], status=4
+            ),
+            values=[
+                HrvValueModel(
+                    timestamp=timestamp - timedelta(minutes=5 * i),
+                    value=int(last_night_average)
+                )
+                for i in range(10)
+            ],
+            file_id=file_id or FileIdModel(**{
+                "type": 68, "serial_number": 1, "time_created": timestamp
+            })
+        )
+    )
+
+
+def write_activity_fit(
+        path: str,
+        messages: list[tuple[str, dict]] | None = None,
+        start_time: datetime = START_TIME,
+        seconds: int = 60
+) -> str:
+    """Write a running activity FIT file with one record per second at 3 m/s
+    and the (profile message name, fields) messages, written before the
+    session, and return its path.
+    """
+    mesg_num: dict[str, int] = Profile["mesg_num"]
+    end_time: datetime = start_time + timedelta(seconds=seconds - 1)
+    totals: dict = {
+        "timestamp": end_time, "start_time": start_time,
+        "total_elapsed_time": seconds - 1, "total_timer_time": seconds - 1,
+        "total_distance": 3.0 * (seconds - 1)
+    }
+    encoder = Encoder()
+    encoder.on_mesg(mesg_num["FILE_ID"], {
+        "type": "activity", "manufacturer": "garmin", "product": 1,
+        "serial_number": 1, "time_created": start_time
+    })
+    for i in range(seconds):
+        encoder.on_mesg(mesg_num["RECORD"], {
+            "timestamp": start_time + timedelta(seconds=i), "distance": 3.0 * i,
+            "speed": 3.0, "heart_rate": 130
+        })
+    encoder.on_mesg(mesg_num["LAP"], {"message_index": 0, **totals})
+    for name, fields in messages or []:
+        encoder.on_mesg(mesg_num[name], fields)
+    encoder.on_mesg(mesg_num["SESSION"], {
+        "message_index": 0, "sport": "running", "sub_sport": "generic", **totals
+    })
+    encoder.on_mesg(mesg_num["ACTIVITY"], {
+        "timestamp": end_time, "num_sessions": 1, "total_timer_time": seconds - 1
+    })
+    with open(path, "wb") as fit_file:
+        fit_file.write(encoder.close())
+    return path
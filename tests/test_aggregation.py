@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from fit_data_whiz.analytics.aggregation import aggregate, daily_aggregate, lttb
+from fit_data_whiz.fit.models import StressLevelModel
+from fit_data_whiz.fit.results import FitMonitor
+from fit_data_whiz.library.monitoring import MonitoringStore
+from fit_data_whiz.storage.sqlite_store import RESPIRATION_METRIC, STRESS_METRIC
+from fit_data_whiz.utils.timezones import get_time_zone
+from .builders import build_monitor
+
+DAY = datetime(2023, 7, 25, tzinfo=timezone.utc)
+
+
+def test_monitor_stress_and_respiration_series():
+    monitor = build_monitor(DAY)
+
+    stress = monitor.stress_series
+    assert stress.values.dtype == np.int64
+    assert stress.values.tolist() == list(range(20, 40))
+    assert np.all(np.diff(stress.timestamp) == 180)
+    assert monitor.respiration_series.values.tolist() == [14.0] * 20
+    assert np.all(np.diff(monitor.respiration_series.timestamp) == 120)
+
+
+def test_unmeasured_stress_is_not_in_the_series():
+    monitor = build_monitor(DAY)
+    stress_levels = list(monitor.model.stress_levels)
+    # Off-wrist and motion sentinels.
+    stress_levels[1] = StressLevelModel(
+        stress_level_value=-1, stress_level_time=stress_levels[1].stress_level_time
+    )
+    stress_levels[2] = StressLevelModel(
+        stress_level_value=-2, stress_level_time=stress_levels[2].stress_level_time
+    )
+    monitor = FitMonitor(
+        "monitor.fit", monitor.model.model_copy(update={"stress_levels": stress_levels})
+    )
+
+    stress = monitor.stress_series
+    assert len(stress.timestamp) == 18
+    assert stress.values.min() == 20
+    monitoring = MonitoringStore()
+    monitoring.add(monitor)
+    assert (monitoring.series(STRESS_METRIC).values >= 0).all()
+    hourly = aggregate(stress.timestamp, stress.values)
+    assert hourly.min.tolist() == [20.0]
+    assert hourly.count.tolist() == [18]
+
+
+def test_hourly_aggregates_of_many_days():
+    monitoring = MonitoringStore()
+    for day in range(3):
+        monitoring.add(build_monitor(DAY + timedelta(days=day)))
+    stress = monitoring.series(STRESS_METRIC)
+
+    hourly = aggregate(stress.timestamp, stress.values, thresholds=(30, 50))
+    assert hourly.periods.tolist() == [
+        (DAY + timedelta(days=day)).replace(tzinfo=None) for day in range(3)
+    ]
+    assert hourly.count.tolist() == [20, 20, 20]
+    assert hourly.mean.tolist() == [29.5] * 3
+    assert hourly.min.tolist() == [20.0] * 3
+    assert hourly.max.tolist() == [39.0] * 3
+    # From 31 to 38 three minutes each (the last one is followed by a gap).
+    assert hourly.time_above[:, 0].tolist() == [8 * 180.0] * 3
+    assert hourly.time_above[:, 1].tolist() == [0.0] * 3
+
+    respiration = monitoring.series(RESPIRATION_METRIC)
+    daily = daily_aggregate(respiration.timestamp, respiration.values)
+    assert daily.count.tolist() == [20, 20, 20]
+    assert daily.mean.tolist() == [14.0] * 3
+
+
+def test_aggregates_ignore_missing_values_and_use_local_periods():
+    timestamps = np.array([0, 60, 120, 3600], dtype=np.int64) + 1690243200
+    values = np.array([10.0, np.nan, 30.0, 40.0])
+
+    hourly = aggregate(timestamps, values)
+    assert hourly.count.tolist() == [2, 1]
+    assert hourly.mean.tolist() == [20.0, 40.0]
+
+    # Madrid is UTC+2 in summer, so every sample is on July 25 local time.
+    daily = daily_aggregate(timestamps, values, time_zone=get_time_zone("Europe/Madrid"))
+    assert daily.periods.tolist() == [datetime(2023, 7, 25)]
+    assert daily.count.tolist() == [3]
+
+    empty = aggregate(np.empty(0), np.empty(0), thresholds=(1,))
+    assert len(empty.periods) == 0
+    assert empty.time_above.shape == (0, 1)
+
+
+def test_lttb_keeps_ends_and_peaks():
+    timestamps = np.arange(1000, dtype=np.int64) * 60
+    values = np.zeros(1000)
+    values[500] = 100.0
+    values[750] = -50.0
+
+    kept_timestamps, kept_values = lttb(timestamps, values, 20)
+    assert len(kept_timestamps) == 20
+    assert kept_timestamps[0] == 0 and kept_timestamps[-1] == 999 * 60
+    assert np.all(np.diff(kept_timestamps) > 0)
+    assert 100.0 in kept_values and -50.0 in kept_values
+
+    kept_timestamps, _ = lttb(timestamps[:10], values[:10], 20)
+    assert len(kept_timestamps) == 10
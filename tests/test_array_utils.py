@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from fit_data_whiz.utils.array_utils import exponential_moving_average
+
+
+def naive_ema(values: np.ndarray, alpha: float) -> list[float]:
+    result = []
+    previous = values[0]
+    for value in values:
+        previous = alpha * value + (1 - alpha) * previous
+        result.append(previous)
+    return result
+
+
+@pytest.mark.parametrize("alpha", [0.01, 0.3, 0.999, 1.0])
+def test_exponential_moving_average(alpha):
+    values = np.random.default_rng(3).uniform(0, 100, 300)
+
+    average = exponential_moving_average(values, alpha)
+    assert not np.isnan(average).any()
+    assert average.tolist() == pytest.approx(naive_ema(values, alpha))
+
+
+def test_exponential_moving_average_initial_value():
+    average = exponential_moving_average(np.array([10.0, 10.0]), 0.5, initial=0.0)
+    assert average.tolist() == [5.0, 7.5]
+    assert len(exponential_moving_average(np.empty(0), 0.5)) == 0
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from fit_data_whiz.analytics.best_efforts import (
+    PersonalRecords,
+    activity_best_efforts,
+    fastest_efforts
+)
+from .builders import START_TIME, build_distance_activity, build_records
+
+
+def naive_fastest(timestamps: np.ndarray, distances: np.ndarray, target: float) -> float:
+    best = np.inf
+    for i in range(len(distances)):
+        for j in range(i, len(distances)):
+            if distances[j] - distances[i] >= target:
+                best = min(best, timestamps[j] - timestamps[i])
+                break
+    return best
+
+
+def test_fastest_efforts_matches_naive_scan():
+    rng = np.random.default_rng(3)
+    timestamps = np.arange(2000)
+    distances = np.cumsum(rng.uniform(2.0, 5.0, 2000))
+    efforts = fastest_efforts(timestamps, distances, {"1k": 1000.0, "2k": 2000.0})
+
+    for name, target in (("1k", 1000.0), ("2k", 2000.0)):
+        # Interpolated end times are never later than the record that reaches it.
+        naive = naive_fastest(timestamps, distances, target)
+        assert naive - 1 <= efforts[name].elapsed <= naive
+
+
+def test_fastest_efforts_constant_pace():
+    activity = build_distance_activity(records=build_records(speeds=[4.0] * 1500))
+    efforts = activity_best_efforts(activity)
+
+    assert set(efforts) == {"400m", "1k", "5k"}
+    assert efforts["1k"].elapsed == pytest.approx(250.0)
+    assert efforts["5k"].elapsed == pytest.approx(1250.0)
+    assert efforts["400m"].start >= START_TIME
+    assert efforts["400m"].end - efforts["400m"].start == timedelta(seconds=100)
+
+
+def test_fastest_efforts_finds_fast_section():
+    speeds = [3.0] * 500 + [5.0] * 300 + [3.0] * 500
+    activity = build_distance_activity(records=build_records(speeds=speeds))
+    effort = activity_best_efforts(activity, {"1k": 1000.0})["1k"]
+    assert effort.elapsed == pytest.approx(200.0)
+    assert effort.start == START_TIME + timedelta(seconds=499)
+
+
+def test_fastest_efforts_without_distance():
+    assert fastest_efforts(np.arange(10), np.full(10, np.nan)) == {}
+
+
+def test_personal_records():
+    slow = build_distance_activity(records=build_records(speeds=[3.0] * 1000))
+    fast = build_distance_activity(records=build_records(speeds=[4.0] * 400))
+    records = PersonalRecords()
+
+    assert records.add_activity("slow", slow) == ["400m", "1k"]
+    assert records.add_activity("fast", fast) == ["400m", "1k"]
+    assert records.get("running", "1k")[0] == "fast"
+    assert records.get("cycling", "1k") is None
+    assert set(records.table("running")) == {"400m", "1k"}
+
+    assert records.remove("fast")
+    assert records.get("running", "1k")[0] == "slow"
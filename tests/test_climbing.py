@@ -0,0 +1,99 @@
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from fit_data_whiz.analytics.climbing import (
+    ClimbTable,
+    climbing_sessions,
+    grade_pyramid
+)
+from fit_data_whiz.fit.definitions import ClimbResult, SplitType
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+from .builders import START_TIME, build_climb_activity, build_file_id
+
+COMPLETED = 3
+ATTEMPTED = 2
+
+CLIMBS = [
+    ("climb_active", 120.0, 4, COMPLETED),
+    ("climb_rest", 180.0, None, None),
+    ("climb_active", 200.0, 5, ATTEMPTED),
+    ("climb_rest", 240.0, None, None),
+    ("climb_active", 150.0, 5, COMPLETED),
+    ("climb_active", 10.0, 6, None),  # discarded
+    ("unknown_split", 30.0, None, None)
+]
+
+
+def test_climb_split_types_and_results():
+    activity = build_climb_activity(CLIMBS)
+    assert [c.split_type for c in activity.climbs] == [
+        SplitType.CLIMB_ACTIVE, SplitType.CLIMB_REST, SplitType.CLIMB_ACTIVE,
+        SplitType.CLIMB_REST, SplitType.CLIMB_ACTIVE, SplitType.CLIMB_ACTIVE,
+        SplitType.UNKNOWN
+    ]
+    assert activity.climbs[2].result == ClimbResult.ATTEMPTED
+    assert activity.climbs[5].result == ClimbResult.DISCARDED
+
+
+def test_grade_pyramid():
+    table = ClimbTable()
+    table.add("a", build_climb_activity(CLIMBS))
+    table.add("b", build_climb_activity(CLIMBS[:3], START_TIME + timedelta(days=8)))
+
+    pyramid = grade_pyramid(table)
+    assert pyramid.grades.tolist() == [4.0, 5.0]
+    assert pyramid.sends.tolist() == [2, 1]
+    assert pyramid.attempts.tolist() == [0, 2]
+    assert pyramid.send_ratio.tolist() == [1.0, 1 / 3]
+
+    assert grade_pyramid(table, date_to=date(2023, 7, 30)).sends.tolist() == [1, 1]
+    assert table.remove("a")
+    assert grade_pyramid(table).attempts.tolist() == [0, 1]
+
+
+def test_climbing_sessions():
+    table = ClimbTable()
+    table.add("a", build_climb_activity(CLIMBS))
+    table.add("b", build_climb_activity([("climb_rest", 60.0, None, None)]))
+    sessions = climbing_sessions(table)
+    assert sessions.activity_ids == ["a", "b"]
+    assert sessions.routes.tolist() == [3, 0]
+    assert sessions.sends.tolist() == [2, 0]
+    assert sessions.send_ratio[0] == 2 / 3
+    assert np.isnan(sessions.send_ratio[1])
+    assert sessions.active.tolist() == [480.0, 0.0]
+    assert sessions.rest.tolist() == [420.0, 60.0]
+
+
+def test_climb_table_from_store(tmp_path):
+    with FitSqliteStore(str(tmp_path / "fit.db")) as store:
+        store.ingest_many([
+            build_climb_activity(CLIMBS, file_id=build_file_id(serial_number=1)),
+            build_climb_activity(
+                CLIMBS, START_TIME + timedelta(days=1), build_file_id(serial_number=2)
+            )
+        ])
+        table = ClimbTable.from_store(store)
+    assert len(table) == 2 * len(CLIMBS)
+    assert grade_pyramid(table).sends.tolist() == [2, 2]
+    assert climbing_sessions(table).rest.tolist() == [420.0, 420.0]
+
+
+def test_all_time_grade_pyramid():
+    table = ClimbTable()
+    for day in range(5 * 150):
+        table.add(str(day), build_climb_activity(
+            [("climb_active", 120.0, day % 8, COMPLETED if day % 3 else ATTEMPTED),
+             ("climb_rest", 180.0, None, None)] * 15,
+            START_TIME + timedelta(days=day)
+        ))
+
+    started = time.perf_counter()
+    pyramid = grade_pyramid(table)
+    sessions = climbing_sessions(table)
+    assert time.perf_counter() - started < 0.5
+    assert len(pyramid.grades) == 8
+    assert pyramid.sends.sum() + pyramid.attempts.sum() == 5 * 150 * 15
+    assert sessions.rest.sum() == 5 * 150 * 15 * 180.0
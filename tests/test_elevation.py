@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from fit_data_whiz.analytics.elevation import (
+    EMA_SMOOTHING,
+    activity_elevation,
+    gain_and_loss,
+    grade,
+    smooth_altitude
+)
+from .builders import START_TIME, build_distance_activity, build_records, build_lap
+
+
+def test_gain_and_loss_ignores_noise_below_threshold():
+    noise = np.array([100.0, 101.0, 100.0, 101.5, 100.5, 101.0, 100.0])
+    assert gain_and_loss(noise, threshold=3.0) == (0.0, 0.0)
+
+    climb = np.concatenate((np.linspace(100, 150, 51), np.linspace(150, 120, 31)))
+    assert gain_and_loss(climb, threshold=3.0) == pytest.approx((50.0, 30.0))
+
+
+def test_smooth_altitude_keeps_zero_and_fills_missing():
+    altitude = np.array([0.0, 0.0, np.nan, 0.0, 50.0, 0.0, 0.0])
+    median = smooth_altitude(altitude, window=3)
+    assert not np.isnan(median).any()
+    assert median.tolist() == [0.0] * 7
+
+
+def test_ema_matches_recurrence():
+    altitude = np.random.default_rng(1).normal(100, 5, 1000)
+    ema = smooth_altitude(altitude, method=EMA_SMOOTHING, alpha=0.3)
+    expected = [altitude[0]]
+    for value in altitude[1:]:
+        expected.append(0.3 * value + 0.7 * expected[-1])
+    assert np.allclose(ema, expected)
+
+    with pytest.raises(ValueError):
+        smooth_altitude(altitude, method="unknown")
+
+
+def test_grade_over_distance():
+    distance = np.arange(0, 200, 2.0)
+    altitude = distance * 0.05
+    grades = grade(altitude, distance, over=20)
+    assert grades[0] == 0.0
+    assert np.allclose(grades[1:], 5.0)
+
+
+def test_activity_elevation_per_lap_and_cached():
+    rng = np.random.default_rng(7)
+    altitudes = np.concatenate((np.linspace(0, 60, 300), np.linspace(60, 20, 300)))
+    altitudes = (altitudes + rng.normal(0, 0.8, 600)).tolist()
+    activity = build_distance_activity(
+        records=build_records(altitudes=altitudes),
+        laps=[
+            build_lap(0, START_TIME, 299),
+            build_lap(1, START_TIME + timedelta(seconds=300), 299)
+        ]
+    )
+
+    elevation = activity_elevation(activity)
+    assert elevation.gain == pytest.approx(60, abs=4)
+    assert elevation.loss == pytest.approx(40, abs=4)
+    assert len(elevation.laps) == 2
+    assert elevation.laps[0][0] == pytest.approx(60, abs=4)
+    assert elevation.laps[1][1] == pytest.approx(40, abs=4)
+    assert len(elevation.grade) == len(altitudes)
+    assert activity_elevation(activity) is elevation
+    assert activity_elevation(activity, threshold=5.0) is not elevation
@@ -1,8 +1,12 @@
 from datetime import datetime, timedelta, date
 
+import numpy as np
+
 from fit_data_whiz.whiz import FitDataWhiz
+from fit_data_whiz.fit.arrays import FIT_EPOCH_OFFSET, expand_timestamp_16
 from fit_data_whiz.fit.results import FitMonitor
 from fit_data_whiz.fit.models import MonitorModel
+from .builders import build_monitor
 
 
 def assert_monitoring_data(path_file: str) -> None:
@@ -81,3 +85,40 @@ def test_activity_intensities():
         moderate_min=26,
         vigorous_min=2
     )
+
+
+def test_monitoring_messages_are_classified_in_one_pass():
+    monitor: FitMonitor = build_monitor(heart_rates=30)
+    utc_offset: timedelta = monitor.datetime_local - monitor.datetime_utc
+
+    assert monitor.daily_logs == [
+        m for m in monitor.model.monitorings if m.is_daily_log()
+    ]
+    assert monitor.total_steps == 1000
+    assert monitor.active_calories == 50
+    assert (monitor.ascent, monitor.descent) == (0.0, 0.0)
+    # The first heart rate has a full timestamp, the rest timestamp_16.
+    assert len(monitor.heart_rates) == 30
+    assert [
+        hr.datetime_utc - monitor.datetime_utc for hr in monitor.heart_rates
+    ] == [timedelta(minutes=i) for i in range(30)]
+    assert all(
+        hr.datetime_local - hr.datetime_utc == utc_offset for hr in monitor.heart_rates
+    )
+
+
+def test_expand_timestamp_16():
+    # Full timestamp, then samples every 5 hours rolling the counter over.
+    start: int = 1690243200
+    full = np.array([-1, start, -1, -1, -1, -1, -1, start + 100000, -1])
+    seconds = [None, None, 5 * 3600, 10 * 3600, None, 15 * 3600, 20 * 3600, None, 100060]
+    timestamps_16 = np.array([
+        (start - FIT_EPOCH_OFFSET + s) & 0xFFFF if s is not None else -1
+        for s in seconds
+    ])
+    timestamps_16[0] = 123
+
+    assert expand_timestamp_16(full, timestamps_16).tolist() == [
+        -1, start, start + 5 * 3600, start + 10 * 3600, -1, start + 15 * 3600,
+        start + 20 * 3600, start + 100000, start + 100060
+    ]
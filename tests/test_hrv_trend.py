@@ -0,0 +1,99 @@
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from fit_data_whiz.analytics.hrv import HrvTrend, rolling_stats
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+from .builders import build_file_id, build_hrv
+
+DAY = date(2023, 7, 1)
+
+
+def expected_baselines(values: np.ndarray, days: int) -> tuple[np.ndarray, np.ndarray]:
+    means, cvs = [], []
+    for i in range(len(values)):
+        window = values[max(i - days + 1, 0):i + 1]
+        window = window[~np.isnan(window)]
+        means.append(window.mean() if len(window) else np.nan)
+        cvs.append(window.std() / window.mean() if len(window) else np.nan)
+    return np.array(means), np.array(cvs)
+
+
+def test_rolling_stats():
+    values = np.array([50.0, np.nan, 60.0, 40.0, np.nan, np.nan, np.nan, 55.0])
+    mean, cv = rolling_stats(values, 0, len(values), 3)
+    expected_mean, expected_cv = expected_baselines(values, 3)
+    assert mean == pytest.approx(expected_mean, nan_ok=True)
+    assert cv == pytest.approx(expected_cv, nan_ok=True)
+
+
+def test_hrv_trend_matches_full_recomputation():
+    rng = np.random.default_rng(3)
+    values = rng.uniform(30, 80, 300).round(1)
+    values[rng.choice(300, 40, replace=False)] = np.nan
+    trend = HrvTrend()
+    # Added out of order, like nights back-filled.
+    for i in rng.permutation(300).tolist():
+        if not np.isnan(values[i]):
+            trend.add(f"n{i}", DAY + timedelta(days=i), values[i], 45.0, 65.0)
+
+    series = trend.series()
+    first = int(np.flatnonzero(~np.isnan(values))[0])
+    values = values[first:]
+    short_mean, short_cv = expected_baselines(values, 7)
+    long_mean, _ = expected_baselines(values, 60)
+    assert series.dates[0] == np.datetime64(DAY + timedelta(days=first))
+    assert series.rmssd == pytest.approx(values, nan_ok=True)
+    assert series.short_baseline == pytest.approx(short_mean, nan_ok=True)
+    assert series.long_baseline == pytest.approx(long_mean, nan_ok=True)
+    assert series.cv == pytest.approx(short_cv, nan_ok=True)
+
+    expected_deviation = np.where(
+        values < 45, values - 45, np.where(values > 65, values - 65, 0.0)
+    )
+    expected_deviation[np.isnan(values)] = np.nan
+    assert series.deviation == pytest.approx(expected_deviation, nan_ok=True)
+
+
+def test_hrv_trend_remove_and_days_after():
+    trend = HrvTrend()
+    for i in range(10):
+        trend.add(f"n{i}", DAY + timedelta(days=i), 50.0 + i)
+    before = trend.series().long_baseline.copy()
+    trend.add("x", DAY + timedelta(days=3), 100.0)
+    assert trend.at(DAY + timedelta(days=3)).rmssd == 100.0
+    assert len(trend) == 10
+    assert trend.remove("x")
+    assert len(trend) == 9
+    assert not trend.remove("x")
+    assert np.isnan(trend.at(DAY + timedelta(days=3)).rmssd)
+    assert trend.series().long_baseline[:3] == pytest.approx(before[:3])
+
+    later = trend.at(DAY + timedelta(days=12))
+    assert np.isnan(later.rmssd)
+    assert later.short_baseline == pytest.approx(np.mean([56.0, 57.0, 58.0, 59.0]))
+    assert np.isnan(trend.at(DAY + timedelta(days=100)).short_baseline)
+    assert np.isnan(trend.at(DAY - timedelta(days=1)).long_baseline)
+
+
+def test_hrv_trend_from_store(tmp_path):
+    timestamp = datetime(2023, 7, 25, 6, 0, 0, tzinfo=timezone.utc)
+    with FitSqliteStore(str(tmp_path / "fit.db")) as store:
+        store.ingest_many([
+            build_hrv(
+                30.0 + 10 * i, timestamp + timedelta(days=i),
+                file_id=build_file_id(serial_number=i + 1)
+            )
+            for i in range(3)
+        ])
+        trend = HrvTrend.from_store(store)
+    assert len(trend) == 3
+    day = trend.at(date(2023, 7, 27))
+    assert day.rmssd == 50.0
+    assert day.short_baseline == 40.0
+    assert day.deviation == 0.0
+    assert trend.at(date(2023, 7, 25)).deviation == -10.0
+
+    trend.add_hrv("other", build_hrv(70.0, timestamp + timedelta(days=3)))
+    assert trend.at(date(2023, 7, 28)).deviation == 10.0
@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta
+
+from fit_data_whiz.fit.results import FitError, FitMultisportActivity
+from fit_data_whiz.library.library import FitLibrary, ActivitySummary
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+from .builders import (
+    START_TIME,
+    build_distance_activity,
+    build_file_id,
+    build_hrv,
+    build_monitor,
+    build_multisport_activity,
+    build_records,
+    build_session,
+    build_sleep
+)
+
+
+def build_library(days: int = 30) -> FitLibrary:
+    library = FitLibrary()
+    for day in range(days):
+        start_time = START_TIME + timedelta(days=day)
+        sub_sport = "trail" if day % 2 else "generic"
+        library.add(build_distance_activity(
+            records=build_records(start_time, speeds=[3.0] * 10),
+            session=build_session(
+                start_time, 10, sub_sport=sub_sport,
+                avg_heart_rate=150.0 if day % 3 else None
+            ),
+            file_id=build_file_id(serial_number=day)
+        ))
+    return library
+
+
+def test_library_add_and_remove():
+    library = build_library(3)
+    assert len(library) == 3
+    assert library.add(FitError("bad.fit", [])) is None
+
+    summary = library.query()[0]
+    assert isinstance(summary, ActivitySummary)
+    assert summary.activity_id in library
+    assert library.remove(summary.activity_id)
+    assert not library.remove(summary.activity_id)
+    assert len(library) == 2
+    assert summary not in library.query(sport="running")
+
+
+def test_library_add_is_idempotent():
+    library = FitLibrary()
+    activity = build_distance_activity()
+    assert library.add(activity) == library.add(activity)
+    assert len(library) == 1
+    assert len(library.query()) == 1
+
+
+def test_library_query_filters():
+    library = build_library(30)
+    start = START_TIME.replace(hour=0) + timedelta(days=10)
+    end = start + timedelta(days=10)
+
+    rows = library.query(start=start, end=end)
+    assert len(rows) == 10
+    assert rows == sorted(rows, key=lambda r: r.start_time)
+
+    trail = library.query(start=start, end=end, sport="running", sub_sport="trail")
+    assert len(trail) == 5
+    assert all(r.sub_sport == "trail" for r in trail)
+
+    with_hr = library.query(
+        start=start, end=end, sport="running", sub_sport="trail", has_heart_rate=True
+    )
+    assert all(r.has_heart_rate and r.sub_sport == "trail" for r in with_hr)
+    without_hr = library.query(start=start, end=end, has_heart_rate=False)
+    assert len(with_hr) < len(trail)
+    assert all(not r.has_heart_rate for r in without_hr)
+
+    assert library.query(sport="cycling") == []
+    assert len(library.query(file_type="activity")) == 30
+    assert len(library.on_date(START_TIME.date())) == 1
+
+
+def test_library_query_pagination():
+    library = build_library(30)
+    all_rows = library.query()
+    pages = [library.query(offset=offset, limit=7) for offset in range(0, 30, 7)]
+    assert [row for page in pages for row in page] == all_rows
+
+    trail = library.query(sub_sport="trail", sport="running")
+    assert library.query(sub_sport="trail") == trail
+    assert library.query(sub_sport="road") == []
+    page = library.query(sub_sport="trail", sport="running", offset=2, limit=3)
+    assert page == trail[2:5]
+
+
+def test_library_from_store():
+    activity = build_distance_activity()
+    with FitSqliteStore(":memory:") as store:
+        store.ingest(activity)
+        library = FitLibrary.from_store(store)
+
+    rows = library.query(start=datetime(2023, 1, 1), sport="running")
+    assert len(rows) == 1
+    assert rows[0].start_time == START_TIME
+    assert rows[0].has_heart_rate is False
+
+
+def test_library_from_store_keeps_monitor_hrv_and_sleep():
+    results = [
+        build_distance_activity(), build_monitor(), build_hrv(50.0),
+        build_sleep([("light", 60), ("deep", 30)])
+    ]
+    library = FitLibrary()
+    with FitSqliteStore(":memory:") as store:
+        for result in results:
+            library.add(result)
+            store.ingest(result)
+        loaded = FitLibrary.from_store(store)
+
+    assert len(loaded) == len(library) == 4
+    assert loaded.query() == library.query()
+    for summary in library.query():
+        assert loaded.query(file_type=summary.file_type) == (
+            library.query(file_type=summary.file_type)
+        )
+        assert loaded.on_date(summary.date) == library.on_date(summary.date)
+
+
+def test_library_multisport_without_elapsed_time():
+    model = build_multisport_activity().model
+    # The transition doesn't have total elapsed time.
+    model.sessions[1] = model.sessions[1].model_copy(update={"total_elapsed_time": None})
+    library = FitLibrary()
+    library.add(FitMultisportActivity("multisport.fit", model))
+
+    summary = library.query()[0]
+    assert summary.sport == "multisport"
+    assert summary.elapsed == 300.0 + 600.0 + 300.0
+
+
+def test_library_personal_records():
+    slow = build_distance_activity(
+        records=build_records(speeds=[3.0] * 1000), file_id=build_file_id(serial_number=1)
+    )
+    fast = build_distance_activity(
+        records=build_records(START_TIME + timedelta(days=1), speeds=[4.0] * 400),
+        file_id=build_file_id(serial_number=2)
+    )
+    multisport = build_multisport_activity(start_time=START_TIME + timedelta(days=2))
+    library = FitLibrary()
+    with FitSqliteStore(":memory:") as store:
+        slow_id, fast_id, multisport_id = (
+            library.add(result) for result in (slow, fast, multisport)
+        )
+        for result in (slow, fast, multisport):
+            store.ingest(result)
+        loaded = FitLibrary.from_store(store)
+
+    records = library.personal_records
+    assert len(records) == 3
+    assert records.get("running", "1k")[0] == fast_id
+    # The cycling session of the multisport activity.
+    assert records.get("cycling", "1k")[0] == multisport_id
+    for sport in ("running", "cycling"):
+        assert loaded.personal_records.table(sport) == records.table(sport)
+
+    library.remove(fast_id)
+    assert records.get("running", "1k")[0] == slow_id
+    library.remove(multisport_id)
+    assert records.table("cycling") == {}
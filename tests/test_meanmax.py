@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from fit_data_whiz.analytics.meanmax import (
+    MeanMaxHistory,
+    activity_mean_max,
+    log_durations,
+    mean_max
+)
+from .builders import build_distance_activity, build_records
+
+
+def naive_mean_max(values: np.ndarray, duration: int) -> float:
+    return max(values[i:i + duration].mean() for i in range(len(values) - duration + 1))
+
+
+def test_log_durations():
+    durations = log_durations(3600)
+    assert durations[0] == 1
+    assert durations[-1] == 3600
+    assert np.all(np.diff(durations) > 0)
+
+
+def test_mean_max_matches_naive_computation():
+    rng = np.random.default_rng(1)
+    values = rng.uniform(100, 400, 600)
+    timestamps = np.arange(600) + 1_600_000_000
+    durations = np.array([1, 5, 30, 60, 300, 600, 1200])
+
+    curve = mean_max(timestamps, values, durations)
+    for duration, value in zip(durations[:-1], curve.values[:-1]):
+        assert value == pytest.approx(naive_mean_max(values, duration))
+    assert np.isnan(curve.values[-1])
+    assert curve.value_at(1) == pytest.approx(values.max())
+    assert curve.starts[0] == timestamps[np.argmax(values)]
+    assert curve.value_at(2) is None
+
+
+def test_mean_max_gaps():
+    timestamps = np.concatenate((np.arange(0, 100, 2), np.arange(200, 300)))
+    values = np.full(len(timestamps), 200.0)
+    values[-100:] = 100.0
+    curve = mean_max(timestamps, values, np.array([60, 99, 150]), max_gap=10)
+
+    # Samples every 2 seconds are filled, the 100 seconds gap is not.
+    assert curve.values[0] == 200.0
+    assert curve.values[1] == 200.0
+    assert np.isnan(curve.values[2])
+
+
+def test_activity_mean_max():
+    heart_rates = list(range(100, 160)) * 5
+    activity = build_distance_activity(
+        records=build_records(speeds=[3.0] * 300, heart_rates=heart_rates)
+    )
+    curve = activity_mean_max(activity, "heart_rate", np.array([1, 60]))
+    assert curve.values[0] == 159
+    assert curve.values[1] == pytest.approx(129.5)
+
+
+def test_mean_max_history():
+    durations = np.array([1, 10, 100])
+    timestamps = np.arange(50)
+    history = MeanMaxHistory(durations)
+    history.add("a", mean_max(timestamps, np.full(50, 200.0), durations))
+    sprint = np.concatenate(([500.0], np.zeros(49)))
+    history.add("b", mean_max(timestamps, sprint, durations))
+
+    assert history.values[0] == 500.0
+    assert history.values[1] == 200.0
+    assert np.isnan(history.values[2])
+    assert history.activity_ids == ["b", "a", None]
+
+    assert history.remove("b")
+    assert history.values[0] == 200.0
+    assert history.activity_ids == ["a", "a", None]
+
+    with pytest.raises(ValueError):
+        history.add("c", mean_max(timestamps, np.zeros(50), np.array([1])))
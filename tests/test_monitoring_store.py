@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from fit_data_whiz.library.monitoring import MonitoringStore
+from fit_data_whiz.storage.sqlite_store import (
+    FitSqliteStore,
+    HEART_RATE_METRIC,
+    STEPS_METRIC,
+    STRESS_METRIC
+)
+from .builders import build_monitor
+
+DAY = datetime(2023, 7, 25, tzinfo=timezone.utc)
+
+
+def test_monitoring_store_deduplicates_overlapping_files():
+    monitoring = MonitoringStore()
+    monitoring.add(build_monitor(DAY, heart_rates=60))
+    # A rewrite of the same day, with one more hour and other heart rates.
+    monitoring.add(build_monitor(
+        DAY, heart_rates=120, min_heart_rate=100, time_created=DAY + timedelta(hours=2)
+    ))
+    # An older write arriving later doesn't win.
+    monitoring.add(build_monitor(DAY, heart_rates=30, min_heart_rate=40))
+
+    heart_rate = monitoring.series(HEART_RATE_METRIC)
+    assert len(heart_rate.timestamp) == 120
+    assert np.all(np.diff(heart_rate.timestamp) == 60)
+    assert heart_rate.values.min() == 100
+    assert monitoring.series(STEPS_METRIC).values.tolist() == [1000.0]
+    assert len(monitoring.series(STRESS_METRIC).timestamp) == 20
+
+
+def test_monitoring_store_appends_and_range_queries():
+    monitoring = MonitoringStore()
+    for day in range(3):
+        monitoring.add(build_monitor(DAY + timedelta(days=day), heart_rates=1440))
+
+    heart_rate = monitoring.series(HEART_RATE_METRIC)
+    assert len(heart_rate.timestamp) == 3 * 1440
+    assert np.all(np.diff(heart_rate.timestamp) == 60)
+
+    second_day = monitoring.series(
+        HEART_RATE_METRIC, DAY + timedelta(days=1), DAY + timedelta(days=2)
+    )
+    assert len(second_day.timestamp) == 1441
+    assert monitoring.series(STEPS_METRIC, DAY + timedelta(days=1)).values.tolist() == [
+        1000.0, 1000.0
+    ]
+
+
+def test_monitoring_store_from_store(tmp_path):
+    older = build_monitor(DAY, heart_rates=60, time_created=DAY)
+    newer = build_monitor(
+        DAY, heart_rates=60, min_heart_rate=100, time_created=DAY + timedelta(hours=1)
+    )
+    with FitSqliteStore(str(tmp_path / "fit.db")) as store:
+        # Ingested out of order: the writer decides, not the ingest order.
+        store.ingest_many([newer, older])
+        monitoring = MonitoringStore.from_store(store)
+
+    heart_rate = monitoring.series(HEART_RATE_METRIC)
+    assert len(heart_rate.timestamp) == 60
+    assert heart_rate.values.min() == 100
+    assert monitoring.series(STEPS_METRIC).values.tolist() == [1000.0]
@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from fit_data_whiz.analytics.moving import (
+    MovingTime,
+    activity_moving_time,
+    laps_moving_time
+)
+from .builders import START_TIME, build_distance_activity, build_records, build_lap
+
+
+def test_activity_moving_time_with_stops():
+    speeds = [3.0] * 100 + [0.0] * 50 + [3.0] * 100 + [0.1] * 20 + [3.0] * 30
+    activity = build_distance_activity(records=build_records(speeds=speeds))
+
+    moving = activity_moving_time(activity)
+    assert isinstance(moving, MovingTime)
+    assert moving.moving + moving.stopped == len(speeds) - 1
+    assert moving.stopped == 70
+    assert len(moving.stops) == 2
+    assert moving.stops[0].start == START_TIME + timedelta(seconds=99)
+    assert moving.stops[0].duration == 50
+    assert moving.stops[1].duration == 20
+
+
+def test_moving_time_with_recording_gap():
+    records = build_records(speeds=[3.0] * 20)
+    for record in records[10:]:
+        record.timestamp = record.timestamp + timedelta(seconds=60)
+    activity = build_distance_activity(records=records)
+
+    moving = activity_moving_time(activity, max_gap=30)
+    assert moving.stopped == 61
+    assert moving.moving == 18
+    assert activity_moving_time(activity, max_gap=100).stopped == 0
+
+
+def test_moving_time_from_distance_without_speed():
+    records = build_records(speeds=[2.0] * 10 + [0.0] * 10)
+    for record in records:
+        record.enhanced_speed = None
+    moving = activity_moving_time(build_distance_activity(records=records))
+    assert moving.moving == 9
+    assert moving.stopped == 10
+
+
+def test_laps_moving_time():
+    speeds = [3.0] * 300 + [0.0] * 100 + [3.0] * 200
+    laps = [
+        build_lap(0, START_TIME, 299),
+        build_lap(1, START_TIME + timedelta(seconds=299), 300)
+    ]
+    activity = build_distance_activity(records=build_records(speeds=speeds), laps=laps)
+
+    first, second = laps_moving_time(activity)
+    assert first.stopped == 0
+    assert first.moving == 299
+    assert second.stopped == 100
+    assert second.moving == 200
@@ -0,0 +1,59 @@
+import numpy as np
+
+from fit_data_whiz.fit.arrays import SequenceView
+from fit_data_whiz.fit.results import (
+    FitDistanceActivity,
+    FitMultisportActivity,
+    FitTransitionActivity,
+    filter_by_session
+)
+from fit_data_whiz.fit.transfer import pack, unpack
+from .builders import build_multisport_activity
+
+
+def test_sessions_are_views_of_the_multisport_records():
+    activity = build_multisport_activity()
+
+    children = activity.fit_activities
+    assert isinstance(children[1], FitTransitionActivity)
+    heart_rate: np.ndarray = activity.record_arrays.heart_rate
+    for child, session in zip(children, activity.model.sessions):
+        if not isinstance(child, FitDistanceActivity):
+            continue
+        records, laps = filter_by_session(
+            session, activity.model.records, activity.model.laps
+        )
+        assert isinstance(child.model.records, SequenceView)
+        assert list(child.model.records) == records
+        assert child.model.laps == laps
+        assert np.shares_memory(child.record_arrays.heart_rate, heart_rate)
+        assert child.record_arrays.heart_rate.tolist() == [r.heart_rate for r in records]
+
+    assert [len(c.model.records) for c in children if hasattr(c, "record_arrays")] == [
+        301, 601, 301
+    ]
+
+
+def test_unpacked_multisport_keeps_its_sessions():
+    activity = build_multisport_activity()
+
+    unpacked = unpack(pack(activity))
+    assert isinstance(unpacked, FitMultisportActivity)
+    assert len(unpacked.record_arrays) == len(activity.model.records)
+    cycling = unpacked.fit_activities[2]
+    assert cycling.record_arrays.heart_rate.tolist() == (
+        activity.fit_activities[2].record_arrays.heart_rate.tolist()
+    )
+    assert cycling.model.records[0].timestamp == activity.model.records[362].timestamp
+
+
+def test_sequence_view():
+    items = list(range(10))
+    view = SequenceView(items, 2, 8)
+
+    assert len(view) == 6
+    assert list(view) == [2, 3, 4, 5, 6, 7]
+    assert view[-1] == 7
+    assert list(view[1:3]) == [3, 4]
+    assert view[::2] == [2, 4, 6]
+    assert len(SequenceView(items, 5, 2)) == 0
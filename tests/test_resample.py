@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from fit_data_whiz.analytics.resample import (
+    LINEAR_RESAMPLING,
+    MEAN_RESAMPLING,
+    PREVIOUS_RESAMPLING,
+    align,
+    align_records,
+    resample
+)
+from fit_data_whiz.fit.arrays import RecordArrays
+from .builders import build_records
+
+TIMESTAMPS = np.array([100, 110, 120, 200, 210], dtype=np.int64)
+VALUES = np.array([0.0, 10.0, np.nan, 30.0, 40.0])
+
+
+def test_resample_modes():
+    linear = resample(TIMESTAMPS, VALUES, period=5)
+    assert linear.timestamp.tolist() == list(range(100, 215, 5))
+    assert linear.values[:3].tolist() == [0.0, 5.0, 10.0]
+    # The NaN sample is ignored: 110 to 200 is interpolated.
+    assert linear.values[18] == pytest.approx(10.0 + 20 * 80 / 90)
+
+    previous = resample(TIMESTAMPS, VALUES, period=5, mode=PREVIOUS_RESAMPLING)
+    assert previous.values[:4].tolist() == [0.0, 0.0, 10.0, 10.0]
+    assert previous.values[-1] == 40.0
+
+    mean = resample(TIMESTAMPS, VALUES, period=60, mode=MEAN_RESAMPLING)
+    assert mean.timestamp.tolist() == [60, 120, 180]
+    assert mean.values[[0, 2]].tolist() == [5.0, 35.0]
+    # Its only sample has no value.
+    assert np.isnan(mean.values[1])
+
+    with pytest.raises(ValueError):
+        resample(TIMESTAMPS, VALUES, mode="cubic")
+
+
+def test_resample_max_gap_and_order():
+    order = np.array([4, 2, 0, 3, 1])
+    resampled = resample(TIMESTAMPS[order], VALUES[order], period=10, max_gap=30)
+    assert resampled.timestamp.tolist() == list(range(100, 220, 10))
+    # The gap from 110 to 200 is too long.
+    assert resampled.values[1] == 10.0
+    assert np.isnan(resampled.values[2:10]).all()
+    assert resampled.values[10:].tolist() == [30.0, 40.0]
+
+    # Outside the samples there are no values.
+    bounded = resample(TIMESTAMPS, VALUES, period=50, start=0, end=300)
+    assert bounded.timestamp.tolist() == [0, 50, 100, 150, 200, 250, 300]
+    assert np.isnan(bounded.values[[0, 1, 5, 6]]).all()
+    assert bounded.values[2] == 0.0
+
+    empty = resample(np.empty(0), np.empty(0))
+    assert len(empty.timestamp) == 0 and len(empty.values) == 0
+
+
+def test_align_series_of_other_periods():
+    aligned = align({
+        "heart_rate": (np.arange(0, 61, 1), np.arange(61, dtype=np.float64)),
+        "stress": (np.array([0, 30]), np.array([20.0, 40.0]))
+    }, period=10, mode={"stress": PREVIOUS_RESAMPLING})
+    assert aligned.timestamp.tolist() == [0, 10, 20, 30, 40, 50, 60]
+    assert aligned.columns["heart_rate"].tolist() == [0, 10, 20, 30, 40, 50, 60]
+    assert aligned.columns["stress"][:4].tolist() == [20.0, 20.0, 20.0, 40.0]
+    assert np.isnan(aligned.columns["stress"][4:]).all()
+
+
+def test_align_records():
+    heart_rates = [100 + i if i % 3 else None for i in range(60)]
+    records = RecordArrays(build_records(speeds=[3.0] * 60, heart_rates=heart_rates))
+
+    aligned = align_records(records, mode=LINEAR_RESAMPLING, max_gap=5)
+    assert len(aligned.timestamp) == 60
+    assert set(aligned.columns) == {"heart_rate", "speed", "altitude"}
+    # Missing heart rates are interpolated between the records around them.
+    assert aligned.columns["heart_rate"][3] == 103.0
+    assert np.isnan(aligned.columns["heart_rate"][0])
+    assert (aligned.columns["speed"] == 3.0).all()
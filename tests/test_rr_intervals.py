@@ -0,0 +1,84 @@
+import time
+
+import numpy as np
+import pytest
+
+from fit_data_whiz.analytics.rr_intervals import (
+    filter_artifacts,
+    hrv_metrics,
+    sliding_hrv
+)
+from fit_data_whiz.whiz import FitDataWhiz
+from .builders import build_distance_activity, write_activity_fit
+
+
+def rr_series(beats: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 0.8 + 0.05 * np.sin(np.arange(beats) / 10) + rng.normal(0, 0.02, beats)
+
+
+def test_filter_artifacts():
+    rr = rr_series(100)
+    rr[10] = 1.6   # missed beat
+    rr[20] = 0.35  # extra beat
+    rr[30] = 65.535
+    valid = filter_artifacts(rr)
+    assert np.flatnonzero(~valid).tolist() == [10, 20, 30]
+    assert filter_artifacts(np.array([0.8, 3.0])).tolist() == [True, False]
+
+
+def test_hrv_metrics():
+    rr = np.array([0.8, 0.85, 0.78, 0.9, 0.82])
+    metrics = hrv_metrics(rr, np.ones(5, dtype=bool))
+    differences = np.diff(rr) * 1000
+    assert metrics.beats == 5
+    assert metrics.mean_rr == pytest.approx(rr.mean() * 1000)
+    assert metrics.rmssd == pytest.approx(np.sqrt(np.mean(differences ** 2)))
+    assert metrics.sdnn == pytest.approx(rr.std() * 1000)
+    assert metrics.pnn50 == pytest.approx(75.0)
+
+    # Differences with an artifact aren't used.
+    valid = np.array([True, True, False, True, True])
+    metrics = hrv_metrics(rr, valid)
+    assert metrics.rmssd == pytest.approx(np.sqrt((50 ** 2 + 80 ** 2) / 2))
+    assert hrv_metrics(np.empty(0)).beats == 0
+
+
+def test_sliding_hrv_matches_windows():
+    rr = rr_series(2000, seed=1)
+    rr[[100, 500, 501]] = [1.7, 0.3, 2.5]
+    valid = filter_artifacts(rr)
+    sliding = sliding_hrv(rr, window=120.0, step=60.0)
+    times = np.cumsum(rr)
+    assert len(sliding.start) == int((times[-1] - 120.0) // 60.0) + 1
+    for i, start in enumerate(sliding.start.tolist()):
+        inside = (times >= start) & (times < start + 120.0)
+        window_valid = valid.copy()
+        window_valid[~inside] = False
+        expected = hrv_metrics(rr, window_valid)
+        assert sliding.beats[i] == expected.beats
+        assert sliding.sdnn[i] == pytest.approx(expected.sdnn)
+        assert sliding.rmssd[i] == pytest.approx(expected.rmssd)
+        assert sliding.pnn50[i] == pytest.approx(expected.pnn50)
+    assert len(sliding_hrv(np.empty(0)).start) == 0
+
+
+def test_sliding_hrv_hour_of_beats():
+    rr = rr_series(4500 * 3, seed=2)
+    started = time.perf_counter()
+    sliding = sliding_hrv(rr)
+    assert time.perf_counter() - started < 0.2
+    assert np.all(sliding.beats > 300)
+    assert np.all((sliding.rmssd > 0) & (sliding.rmssd < 100))
+
+
+def test_hrv_messages_to_array(tmp_path):
+    # 65.535 is the invalid value of the field, so it's decoded as None.
+    path = write_activity_fit(str(tmp_path / "activity.fit"), [
+        ("HRV", {"time": [0.8, 0.81, 65.535, 65.535, 65.535]}),
+        ("HRV", {"time": [0.79]})
+    ])
+    assert FitDataWhiz(path).parse().rr_intervals.tolist() == [0.8, 0.81, 0.79]
+
+    activity = build_distance_activity()
+    assert len(activity.rr_intervals) == 0
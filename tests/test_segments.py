@@ -0,0 +1,110 @@
+import time
+
+import numpy as np
+import pytest
+
+from fit_data_whiz.analytics.segments import (
+    Segment,
+    SegmentMatcher,
+    activity_segment_efforts,
+    store_track_loader
+)
+from fit_data_whiz.fit.arrays import RecordArrays
+from fit_data_whiz.library.library import FitLibrary
+from fit_data_whiz.library.spatial import SpatialIndex
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+from fit_data_whiz.utils.geo_utils import EARTH_RADIUS
+from .builders import (
+    SEMICIRCLES_PER_DEGREE,
+    START_TIME,
+    build_distance_activity,
+    build_file_id,
+    build_records
+)
+
+DEGREES_PER_METER = np.degrees(1 / EARTH_RADIUS)
+
+
+def north_segment(from_meters: float, to_meters: float) -> Segment:
+    meters = np.linspace(from_meters, to_meters, 20)
+    return Segment("north", 40.0 + meters * DEGREES_PER_METER, np.full(20, -3.0))
+
+
+def test_segment_effort_on_straight_track():
+    # 600 records 3 m apart going north from (40, -3).
+    activity = build_distance_activity(records=build_records())
+    efforts = activity_segment_efforts(north_segment(300, 900), activity, "a")
+    assert len(efforts) == 1
+    assert efforts[0].activity_id == "a"
+    assert efforts[0].elapsed == pytest.approx(200, abs=2)
+    assert efforts[0].start_index == pytest.approx(99, abs=1)
+
+    # Same place, opposite direction.
+    reverse = north_segment(900, 300)
+    assert activity_segment_efforts(reverse, activity) == []
+
+    with pytest.raises(ValueError):
+        Segment("empty", np.array([40.0]), np.array([-3.0]))
+
+
+def test_segment_efforts_on_out_and_back_repeats():
+    # North 600 m, back south and north again, at 3 m/s.
+    meters = np.concatenate((np.arange(0, 600, 3.0), np.arange(600, 0, -3.0)))
+    meters = np.concatenate((meters, meters))
+    records = build_records(speeds=[3.0] * len(meters))
+    for record, position in zip(records, meters):
+        record.position_lat = round(
+            (40.0 + position * DEGREES_PER_METER) * SEMICIRCLES_PER_DEGREE
+        )
+    activity = build_distance_activity(records=records)
+
+    efforts = activity_segment_efforts(north_segment(100, 500), activity)
+    assert len(efforts) == 2
+    assert [e.elapsed for e in efforts] == pytest.approx([133, 133], abs=2)
+    assert efforts[1].start_index - efforts[0].start_index == 400
+    assert len(activity_segment_efforts(north_segment(500, 100), activity)) == 2
+
+
+def test_segment_matcher_with_store(tmp_path):
+    on_segment = build_distance_activity(
+        records=build_records(), file_id=build_file_id(serial_number=1)
+    )
+    elsewhere = build_distance_activity(
+        records=build_records(lat=41.0), file_id=build_file_id(serial_number=2)
+    )
+    with FitSqliteStore(str(tmp_path / "fit.db")) as store:
+        store.ingest_many([on_segment, elsewhere])
+        library = FitLibrary.from_store(store)
+        matcher = SegmentMatcher(library.spatial, store_track_loader(store))
+
+        segment = north_segment(300, 900)
+        assert len(matcher.candidates(segment)) == 1
+        efforts = matcher.efforts(segment)
+        assert len(efforts) == 1
+        assert efforts[0].start.timestamp() == pytest.approx(
+            START_TIME.timestamp() + 99, abs=1
+        )
+        assert matcher.efforts(segment, activity_ids=["other"]) == []
+
+
+def test_segment_matcher_year_of_activities():
+    # One hour north at 3 m/s every day, on one of three parallel roads.
+    meters = np.arange(3600) * 3.0
+    spatial = SpatialIndex()
+    tracks: dict[str, RecordArrays] = {}
+    for day in range(365):
+        lat = 40.0 + meters * DEGREES_PER_METER
+        lon = np.full(3600, -3.0 + (day % 3) * 0.05)
+        activity_id = str(day)
+        spatial.add(activity_id, lat, lon)
+        tracks[activity_id] = RecordArrays(raw_columns={
+            "timestamp": START_TIME.timestamp() + day * 86400 + np.arange(3600),
+            "position_lat": lat * SEMICIRCLES_PER_DEGREE,
+            "position_long": lon * SEMICIRCLES_PER_DEGREE
+        })
+
+    started = time.perf_counter()
+    efforts = SegmentMatcher(spatial, tracks.get).efforts(north_segment(1000, 5000))
+    assert time.perf_counter() - started < 5
+    assert len(efforts) == 122
+    assert all(e.elapsed == pytest.approx(1333, abs=2) for e in efforts)
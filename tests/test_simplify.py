@@ -0,0 +1,59 @@
+import numpy as np
+
+from fit_data_whiz.analytics.simplify import (
+    activity_douglas_peucker,
+    activity_visvalingam,
+    douglas_peucker,
+    visvalingam
+)
+from fit_data_whiz.utils.geo_utils import EARTH_RADIUS
+from .builders import SEMICIRCLES_PER_DEGREE, build_distance_activity, build_records
+
+# Degrees of latitude per meter.
+DEGREES_PER_METER = np.degrees(1 / EARTH_RADIUS)
+
+
+def test_douglas_peucker_straight_line_keeps_ends():
+    lat = 40 + np.arange(1000) * DEGREES_PER_METER
+    lon = np.full(1000, -3.0)
+    assert douglas_peucker(lat, lon, epsilon=1.0).tolist() == [0, 999]
+
+
+def test_douglas_peucker_keeps_corners_and_skips_missing():
+    # Square 100 x 100 meters with one point per meter.
+    side = np.arange(100) * DEGREES_PER_METER
+    lat = 40 + np.concatenate((side, np.full(100, side[-1]), side[::-1]))
+    lon = -3 + np.concatenate((np.zeros(100), side, np.full(100, side[-1])))
+    lat[50] = np.nan
+
+    kept = douglas_peucker(lat, lon, epsilon=1.0)
+    assert kept.tolist() == [0, 99, 199, 299]
+    assert 50 not in douglas_peucker(lat, lon, epsilon=0.0).tolist()
+
+
+def test_visvalingam_respects_budget():
+    rng = np.random.default_rng(3)
+    lat = 40 + np.cumsum(rng.normal(0, 5, 5000)) * DEGREES_PER_METER
+    lon = -3 + np.cumsum(rng.normal(0, 5, 5000)) * DEGREES_PER_METER
+
+    kept = visvalingam(lat, lon, budget=200)
+    assert len(kept) == 200
+    assert kept[0] == 0 and kept[-1] == 4999
+    assert np.all(np.diff(kept) > 0)
+    assert len(visvalingam(lat[:10], lon[:10], budget=200)) == 10
+
+
+def test_activity_simplification_is_cached():
+    records = build_records(speeds=[3.0] * 600)
+    for i, record in enumerate(records):
+        record.position_long = round((-3 + (i % 100) * 1e-4) * SEMICIRCLES_PER_DEGREE)
+    activity = build_distance_activity(records=records)
+
+    kept = activity_douglas_peucker(activity, 5.0)
+    assert 2 < len(kept) < len(records)
+    assert activity_douglas_peucker(activity, 5.0) is kept
+    assert activity.record_arrays.heart_rate[kept].shape == kept.shape
+
+    budget = activity_visvalingam(activity, 50)
+    assert len(budget) == 50
+    assert activity_visvalingam(activity, 50) is budget
@@ -0,0 +1,96 @@
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from fit_data_whiz.analytics.sleep import SleepTable, monthly_sleep, sleep_nights
+from fit_data_whiz.fit.arrays import run_length_encode
+from fit_data_whiz.fit.definitions import SLEEP_LEVEL_CODES
+from fit_data_whiz.fit.results import FitSleep
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+from fit_data_whiz.utils.timezones import get_time_zone
+from .builders import build_file_id, build_sleep
+
+START = datetime(2023, 7, 24, 22, 0, 0, tzinfo=timezone.utc)
+START_SECONDS = int(START.timestamp())
+
+LEVELS = [
+    ("awake", 10),
+    ("light", 30),
+    ("deep", 60),
+    ("awake", 5),
+    ("rem", 20),
+    ("light", 15),
+    ("awake", 10)
+]
+
+
+def test_run_length_encode():
+    start, end, values = run_length_encode(
+        np.array([0, 60, 120, 180, 240]), np.array([1, 1, 2, 2, 1]), 60
+    )
+    assert start.tolist() == [0, 120, 240]
+    assert end.tolist() == [120, 240, 300]
+    assert values.tolist() == [1, 2, 1]
+    assert len(run_length_encode(np.empty(0), np.empty(0), 60)[0]) == 0
+
+
+def test_sleep_timeline():
+    sleep = build_sleep(LEVELS)
+    assert sleep.timeline.stage.tolist() == [SLEEP_LEVEL_CODES[n] for n, _ in LEVELS]
+    assert (sleep.timeline.end - sleep.timeline.start).tolist() == [
+        60 * minutes for _, minutes in LEVELS
+    ]
+    assert sleep.timeline.start[0] == START_SECONDS
+    assert sleep.dates == [date(2023, 7, 24), date(2023, 7, 25)]
+    assert sleep.start_time == START
+    assert sleep.end_time == START + timedelta(minutes=150)
+    assert len(sleep.levels) == 150
+
+    # 22:00 UTC is midnight in Madrid, so the whole night is on July 25.
+    madrid = FitSleep("sleep.fit", sleep.model, get_time_zone("Europe/Madrid"))
+    assert madrid.dates == [date(2023, 7, 25)]
+
+
+def test_sleep_nights():
+    table = SleepTable()
+    table.add("a", build_sleep(LEVELS))
+    table.add("b", build_sleep(LEVELS[1:3], START + timedelta(days=1)))
+    nights = sleep_nights(table)
+    assert nights.activity_ids == ["a", "b"]
+    assert nights.dates.tolist() == [date(2023, 7, 25), date(2023, 7, 25)]
+    assert nights.deep.tolist() == [3600.0, 3600.0]
+    assert nights.light.tolist() == [2700.0, 1800.0]
+    assert nights.rem.tolist() == [1200.0, 0.0]
+    assert nights.awake.tolist() == [1500.0, 0.0]
+    assert nights.onset.tolist() == [
+        START_SECONDS + 600, START_SECONDS + 86400
+    ]
+    assert nights.wake.tolist() == [
+        START_SECONDS + 140 * 60, START_SECONDS + 86400 + 90 * 60
+    ]
+    assert nights.awakenings.tolist() == [1, 0]
+    assert nights.stage_changes.tolist() == [4, 1]
+
+    assert sleep_nights(table, date_from=date(2023, 7, 26)).activity_ids == []
+
+
+def test_monthly_sleep_from_store(tmp_path):
+    sleeps = [
+        build_sleep(LEVELS),
+        build_sleep(LEVELS[1:3], START + timedelta(days=1), build_file_id(2)),
+        build_sleep(LEVELS, START + timedelta(days=10), build_file_id(3))
+    ]
+    with FitSqliteStore(str(tmp_path / "fit.db")) as store:
+        store.ingest_many(sleeps)
+        table = SleepTable.from_store(store)
+    # Only the timeline is saved: the levels aren't built.
+    assert all(sleep._levels is None for sleep in sleeps)
+    nights = sleep_nights(table)
+    assert len(nights.activity_ids) == 3
+    assert nights.awakenings.tolist() == [1, 0, 1]
+
+    monthly = monthly_sleep(nights)
+    assert monthly.months.astype(str).tolist() == ["2023-07", "2023-08"]
+    assert monthly.nights.tolist() == [2, 1]
+    assert monthly.deep.tolist() == [3600.0, 3600.0]
+    assert monthly.light.tolist() == [2250.0, 2700.0]
@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+
+from fit_data_whiz.library.library import FitLibrary
+from fit_data_whiz.library.spatial import SpatialIndex
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+from .builders import build_distance_activity, build_file_id, build_records
+
+
+def build_activity(serial_number: int, lat: float, lon: float):
+    # 600 records 3 m apart going north: 1.8 km.
+    return build_distance_activity(
+        records=build_records(lat=lat, lon=lon),
+        file_id=build_file_id(serial_number=serial_number)
+    )
+
+
+def test_spatial_index_box_and_radius_queries():
+    index = SpatialIndex()
+    lat = np.linspace(40.40, 40.42, 100)
+    assert index.add("madrid", lat, np.full(100, -3.70))
+    assert index.add("valencia", lat - 0.93, np.full(100, -0.37))
+    assert not index.add("indoor", np.full(10, np.nan), np.full(10, np.nan))
+
+    assert index.in_box(40.39, -3.71, 40.43, -3.69) == {"madrid"}
+    assert index.in_box(30.0, -10.0, 50.0, 10.0) == {"madrid", "valencia"}
+    assert index.in_box(41.0, -3.71, 41.1, -3.69) == set()
+
+    assert index.near(40.41, -3.701, radius=500) == {"madrid"}
+    assert index.near(40.41, -3.60, radius=500) == set()
+    assert index.near(40.0, -2.0, radius=300_000) == {"madrid", "valencia"}
+
+    assert index.remove("madrid")
+    assert index.in_box(40.39, -3.71, 40.43, -3.69) == set()
+    assert len(index) == 1
+
+
+def test_library_spatial_index_persisted_in_store(tmp_path):
+    activities = [build_activity(0, 40.40, -3.70), build_activity(1, 39.47, -0.37)]
+    library = FitLibrary()
+    for activity in activities:
+        library.add(activity)
+    madrid_id = library.query()[0].activity_id
+    assert library.spatial.near(40.40, -3.70, radius=100) == {madrid_id}
+
+    with FitSqliteStore(str(tmp_path / "fit.db")) as store:
+        store.ingest_many(activities)
+        loaded = FitLibrary.from_store(store)
+        assert len(loaded.spatial) == 2
+        assert loaded.spatial.near(40.40, -3.70, radius=100) == {madrid_id}
+        assert loaded.spatial.bounds(madrid_id) == library.spatial.bounds(madrid_id)
+
+        store.delete(madrid_id)
+        assert len(FitLibrary.from_store(store).spatial) == 1
+
+    library.remove(madrid_id)
+    assert library.spatial.near(40.40, -3.70, radius=100) == set()
+
+
+def test_spatial_queries_are_fast():
+    rng = np.random.default_rng(5)
+    index = SpatialIndex()
+    for i in range(3000):
+        lat0, lon0 = rng.uniform(40.0, 41.0), rng.uniform(-4.0, -3.0)
+        steps = rng.normal(0, 0.0003, (2, 3600)).cumsum(axis=1)
+        index.add(str(i), lat0 + steps[0], lon0 + steps[1])
+
+    started = time.perf_counter()
+    for _ in range(20):
+        index.near(40.5, -3.5, radius=1000)
+        index.in_box(40.4, -3.6, 40.6, -3.4)
+    assert (time.perf_counter() - started) / 20 < 0.05
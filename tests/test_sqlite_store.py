@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+
+from fit_data_whiz.fit.results import FitError
+from fit_data_whiz.storage.sqlite_store import (
+    FitSqliteStore,
+    result_fingerprint,
+    HEART_RATE_METRIC
+)
+from .builders import (
+    START_TIME,
+    build_distance_activity,
+    build_file_id,
+    build_records,
+    build_monitor
+)
+
+
+def test_ingest_distance_activity():
+    activity = build_distance_activity()
+    with FitSqliteStore(":memory:") as store:
+        activity_id = store.ingest(activity)
+
+        assert activity_id is not None
+        sessions = store.sessions()
+        assert len(sessions) == 1
+        assert sessions[0]["sport"] == "running"
+        assert sessions[0]["fingerprint"] == result_fingerprint(activity)
+        assert len(store.laps(activity_id)) == 1
+        records = store.records(activity_id)
+        assert len(records) == 600
+        assert records[0]["heart_rate"] == 150
+
+
+def test_ingest_is_idempotent():
+    activity = build_distance_activity()
+    with FitSqliteStore(":memory:") as store:
+        first_id = store.ingest(activity)
+        second_id = store.ingest(activity)
+
+        assert first_id == second_id
+        assert len(store.sessions()) == 1
+        assert len(store.records(first_id)) == 600
+
+
+def test_ingest_many_and_filters():
+    activities = [
+        build_distance_activity(
+            records=build_records(START_TIME + timedelta(days=day), speeds=[3.0] * 10),
+            file_id=build_file_id(serial_number=day)
+        )
+        for day in range(5)
+    ]
+    with FitSqliteStore(":memory:") as store:
+        ids = store.ingest_many(activities + [FitError("bad.fit", [])])
+
+        assert ids[-1] is None
+        assert len(set(ids[:-1])) == 5
+        assert len(store.sessions(sport="running")) == 5
+        assert len(store.sessions(sport="cycling")) == 0
+        day = START_TIME.date() + timedelta(days=1)
+        assert len(store.sessions(date_from=day, date_to=day + timedelta(days=1))) == 2
+        assert len(store.sessions(athlete="other")) == 0
+
+
+def test_delete():
+    activity = build_distance_activity()
+    with FitSqliteStore(":memory:") as store:
+        activity_id = store.ingest(activity)
+
+        assert store.delete(result_fingerprint(activity))
+        assert store.file_id(result_fingerprint(activity)) is None
+        assert store.sessions() == []
+        assert store.records(activity_id) == []
+
+
+def test_ingest_monitor():
+    monitor = build_monitor()
+    with FitSqliteStore(":memory:") as store:
+        store.ingest(monitor)
+
+        rows = store.monitoring(
+            HEART_RATE_METRIC, monitor.monitoring_date, monitor.monitoring_date
+        )
+        assert len(rows) == len(monitor.heart_rates)
+        old_day = date(2000, 1, 1)
+        assert store.monitoring(HEART_RATE_METRIC, old_day, old_day) == []
@@ -0,0 +1,113 @@
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from fit_data_whiz.analytics.strength import (
+    SetTable,
+    one_rep_max,
+    one_rep_max_trend,
+    rest_stats,
+    weekly_volume
+)
+from fit_data_whiz.storage.sqlite_store import FitSqliteStore
+from .builders import START_TIME, build_file_id, build_set_activity
+
+# 2023-07-25 (START_TIME) is a tuesday.
+MONDAY = np.datetime64("2023-07-24")
+
+SETS = [
+    ("bench_press", 5, 80.0, 40),
+    ("rest", None, None, 120),
+    ("bench_press", 3, 90.0, 30),
+    ("rest", None, None, 180),
+    ("pull_up", 10, None, 40)
+]
+
+
+def test_set_table_weekly_volume():
+    table = SetTable()
+    table.add("a", build_set_activity(SETS))
+    table.add("b", build_set_activity(SETS[:3], START_TIME + timedelta(days=1)))
+    table.add("c", build_set_activity(SETS[:1], START_TIME + timedelta(days=7)))
+    assert len(table) == 9
+
+    volume = weekly_volume(table)
+    assert volume.weeks.tolist() == [
+        MONDAY.astype(object), (MONDAY + 7).astype(object)
+    ]
+    assert volume.categories == ["bench_press", "pull_up"]
+    assert volume.tonnage.tolist() == [[1340.0, 0.0], [400.0, 0.0]]
+    assert volume.repetitions.tolist() == [[16.0, 10.0], [5.0, 0.0]]
+    assert volume.sets.tolist() == [[4.0, 1.0], [1.0, 0.0]]
+
+    assert weekly_volume(table, date_from=date(2023, 7, 31)).weeks.tolist() == [
+        date(2023, 7, 31)
+    ]
+    assert table.remove("c")
+    assert not table.remove("c")
+    assert len(weekly_volume(table).weeks) == 1
+
+
+def test_one_rep_max_trend():
+    assert one_rep_max(
+        np.array([100.0, 80.0, np.nan, 50.0]), np.array([1.0, 5.0, 5.0, 20.0])
+    ) == pytest.approx([100.0, 80 * (1 + 5 / 30), np.nan, np.nan], nan_ok=True)
+
+    table = SetTable()
+    for week in range(3):
+        table.add(str(week), build_set_activity(
+            [("bench_press", 5, 80.0 + 2.5 * week, 40), ("bench_press", 8, 60.0, 40)],
+            START_TIME + timedelta(days=7 * week)
+        ))
+    trend = one_rep_max_trend(table, "bench_press")
+    assert len(trend.dates) == 3
+    assert trend.one_rep_max == pytest.approx(
+        [(80.0 + 2.5 * w) * (1 + 5 / 30) for w in range(3)]
+    )
+    assert len(one_rep_max_trend(table, "squat").dates) == 0
+
+
+def test_rest_stats():
+    table = SetTable()
+    table.add("a", build_set_activity(SETS))
+    table.add("b", build_set_activity(SETS[:1]))
+    stats = rest_stats(table)
+    assert stats.activity_ids == ["a", "b"]
+    assert stats.count.tolist() == [2, 0]
+    assert stats.total.tolist() == [300.0, 0.0]
+    assert stats.mean[0] == 150.0
+    assert np.isnan(stats.mean[1])
+
+
+def test_set_table_from_store(tmp_path):
+    with FitSqliteStore(str(tmp_path / "fit.db")) as store:
+        store.ingest_many([
+            build_set_activity(SETS, file_id=build_file_id(serial_number=1)),
+            build_set_activity(
+                SETS, START_TIME + timedelta(days=1), build_file_id(serial_number=2)
+            )
+        ])
+        table = SetTable.from_store(store)
+    assert len(table.activity_ids) == 2
+    assert weekly_volume(table).tonnage.tolist() == [[670.0 * 2, 0.0]]
+    assert rest_stats(table).count.tolist() == [2, 2]
+
+
+def test_set_table_years_of_history():
+    table = SetTable()
+    for day in range(3 * 365):
+        table.add(str(day), build_set_activity(
+            [("squat", 5, 100.0, 40), ("rest", None, None, 90)] * 10,
+            START_TIME + timedelta(days=day)
+        ))
+
+    started = time.perf_counter()
+    volume = weekly_volume(table)
+    trend = one_rep_max_trend(table, "squat")
+    rest = rest_stats(table)
+    assert time.perf_counter() - started < 0.5
+    assert volume.tonnage.sum() == 3 * 365 * 10 * 500.0
+    assert len(trend.dates) == 3 * 365
+    assert rest.count.sum() == 3 * 365 * 10
@@ -0,0 +1,122 @@
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from fit_data_whiz.storage.sqlite_store import HEART_RATE_METRIC, FitSqliteStore
+from fit_data_whiz.utils.timezones import TimeZone, get_time_zone
+from .builders import (
+    build_distance_activity,
+    build_file_id,
+    build_monitor,
+    build_session,
+    build_sleep
+)
+
+MADRID = "Europe/Madrid"
+
+
+def test_time_zone_transitions():
+    time_zone = TimeZone(MADRID)
+    # Summer time started on 2023-03-26 at 01:00 UTC.
+    change = datetime(2023, 3, 26, 1, 0, 0, tzinfo=timezone.utc)
+    assert time_zone.utc_offset(change - timedelta(seconds=1)) == timedelta(hours=1)
+    assert time_zone.utc_offset(change) == timedelta(hours=2)
+    assert time_zone.to_local(change) == change + timedelta(hours=2)
+    assert time_zone.utc_offset(datetime(2023, 3, 26, 1, 0, 0)) == timedelta(hours=2)
+    assert get_time_zone(MADRID) is get_time_zone(MADRID)
+
+
+def test_local_timestamps():
+    time_zone = TimeZone("America/New_York")
+    start = int(datetime(2015, 1, 1, tzinfo=timezone.utc).timestamp())
+    timestamps = np.random.default_rng(0).integers(start, start + 10 * 365 * 86400, 2000)
+    zone = ZoneInfo("America/New_York")
+    expected = [
+        t + int(datetime.fromtimestamp(t, timezone.utc).astimezone(zone)
+                .utcoffset().total_seconds())
+        for t in timestamps.tolist()
+    ]
+    assert time_zone.local_timestamps(timestamps).tolist() == expected
+    assert len(time_zone.local_timestamps(np.empty(0, dtype=np.int64))) == 0
+
+
+def test_monitor_time_zone():
+    # Local midnight in Madrid (summer time).
+    day_start = datetime(2023, 7, 24, 22, 0, 0, tzinfo=timezone.utc)
+    monitor = build_monitor(day_start, time_zone=get_time_zone(MADRID))
+    assert monitor.monitoring_date.isoformat() == "2023-07-25"
+    assert len(monitor.daily_logs) == 2
+    assert monitor.total_steps == 1000
+    assert monitor.heart_rates[0].datetime_local == day_start + timedelta(hours=2)
+    assert (
+        monitor.heart_rate_series.local_timestamp - monitor.heart_rate_series.timestamp
+    ).tolist() == [7200] * len(monitor.heart_rate_series.timestamp)
+
+    assert build_monitor(day_start, time_zone=get_time_zone("UTC")).daily_logs == []
+
+
+def test_store_athlete_time_zone(tmp_path):
+    start_time = datetime(2023, 7, 25, 23, 30, 0, tzinfo=timezone.utc)
+    with FitSqliteStore(str(tmp_path / "fit.db")) as store:
+        store.set_time_zone(MADRID)
+        assert store.time_zone().key == MADRID
+        store.ingest(build_distance_activity(
+            session=build_session(start_time), file_id=build_file_id(serial_number=1)
+        ))
+        assert store.sessions()[0]["date"] == "2023-07-26"
+
+        store.set_time_zone("UTC", athlete="other")
+        store.ingest(
+            build_distance_activity(
+                session=build_session(start_time), file_id=build_file_id(serial_number=2)
+            ),
+            athlete="other"
+        )
+        assert store.sessions(athlete="other")[0]["date"] == "2023-07-25"
+
+
+def test_store_dates_of_monitoring_samples_and_sleep():
+    # From 23:30 in Madrid: half of the samples are on the next day.
+    day_start = datetime(2023, 7, 24, 21, 30, 0, tzinfo=timezone.utc)
+    with FitSqliteStore(":memory:") as store:
+        store.set_time_zone(MADRID)
+        store.ingest(build_monitor(day_start, time_zone=get_time_zone(MADRID)))
+        for day in (date(2023, 7, 24), date(2023, 7, 25)):
+            assert len(store.monitoring(HEART_RATE_METRIC, day, day)) == 30
+
+        # The night ends at 00:30 UTC, 20:30 in New York.
+        store.set_time_zone("America/New_York")
+        store.ingest(build_sleep([("light", 150)]))
+        row = store.connection.execute("SELECT date FROM sleep_assessments").fetchone()
+        assert row["date"] == "2023-07-24"
+
+
+def test_time_zone_transitions_from_zone_data():
+    rng = np.random.default_rng(1)
+    start = int(datetime(1970, 1, 1, tzinfo=timezone.utc).timestamp())
+    end = int(datetime(2060, 1, 1, tzinfo=timezone.utc).timestamp())
+    for key in (
+            "America/New_York", "Australia/Lord_Howe", "Asia/Kolkata",
+            "America/Sao_Paulo", "Europe/Moscow", "Pacific/Apia"
+    ):
+        zone = ZoneInfo(key)
+        time_zone = TimeZone(key)
+        # Years are loaded one range after another, before and after the
+        # cached ones.
+        for first, last in ((2020, 2025), (1990, 2000), (2040, 2060), (1970, 2060)):
+            timestamps = rng.integers(
+                int(datetime(first, 1, 1, tzinfo=timezone.utc).timestamp()),
+                int(datetime(last, 1, 1, tzinfo=timezone.utc).timestamp()), 500
+            )
+            expected = [
+                int(datetime.fromtimestamp(t, timezone.utc).astimezone(zone)
+                    .utcoffset().total_seconds())
+                for t in timestamps.tolist()
+            ]
+            assert time_zone.utc_offsets(timestamps).tolist() == expected, key
+        assert time_zone.utc_offsets(np.array([start, end])).tolist() == [
+            int(datetime.fromtimestamp(t, timezone.utc).astimezone(zone)
+                .utcoffset().total_seconds())
+            for t in (start, end)
+        ]
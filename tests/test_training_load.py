@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+from math import exp
+
+import numpy as np
+import pytest
+
+from fit_data_whiz.analytics.training_load import (
+    TRAINING_EFFECT_LOAD,
+    TrainingLoad,
+    session_load
+)
+from .builders import START_TIME, build_distance_activity, build_session
+
+DAY = date(2023, 7, 1)
+
+
+def expected_series(loads: list[float], days: int) -> np.ndarray:
+    series = []
+    value = 0.0
+    for load in loads:
+        value += (load - value) * (1 - exp(-1 / days))
+        series.append(value)
+    return np.array(series)
+
+
+def test_training_load_matches_daily_recurrence():
+    rng = np.random.default_rng(2)
+    daily = rng.uniform(0, 150, 200).round()
+    training_load = TrainingLoad()
+    # Added out of order, with two activities on some days.
+    for i in rng.permutation(200).tolist():
+        training_load.add(f"a{i}", DAY + timedelta(days=i), daily[i] / 2)
+        training_load.add(f"b{i}", DAY + timedelta(days=i), daily[i] / 2)
+
+    atl = expected_series(daily.tolist(), 7)
+    ctl = expected_series(daily.tolist(), 42)
+    series = training_load.series()
+    assert series.dates[0] == np.datetime64(DAY)
+    assert np.allclose(series.load, daily)
+    assert np.allclose(series.atl, atl)
+    assert np.allclose(series.ctl, ctl)
+    assert np.allclose(series.tsb[1:], ctl[:-1] - atl[:-1])
+
+    day = training_load.at(DAY + timedelta(days=100))
+    assert day.atl == pytest.approx(atl[100])
+    assert day.tsb == pytest.approx(ctl[99] - atl[99])
+
+
+def test_training_load_remove_and_replace():
+    training_load = TrainingLoad()
+    training_load.add("a", DAY, 100)
+    training_load.add("b", DAY + timedelta(days=10), 50)
+    before = training_load.series().ctl.copy()
+
+    training_load.add("c", DAY + timedelta(days=5), 80)
+    assert training_load.series().ctl[10] > before[10]
+    assert training_load.remove("c")
+    assert not training_load.remove("c")
+    assert np.allclose(training_load.series().ctl, before)
+
+    # Replacing moves the load to the new day.
+    training_load.add("a", DAY + timedelta(days=2), 100)
+    assert training_load.at(DAY).load == 0
+    assert training_load.at(DAY + timedelta(days=2)).load == 100
+    assert len(training_load) == 2
+
+
+def test_training_load_back_fill_and_decay():
+    training_load = TrainingLoad()
+    training_load.add("late", DAY, 100)
+    training_load.add("early", DAY - timedelta(days=30), 100)
+    assert training_load.first_day == DAY - timedelta(days=30)
+    assert training_load.at(DAY).ctl > training_load.at(DAY - timedelta(days=1)).ctl
+
+    last = training_load.at(DAY)
+    later = training_load.at(DAY + timedelta(days=3))
+    assert later.load == 0
+    assert later.atl == pytest.approx(last.atl * exp(-3 / 7))
+    assert later.ctl == pytest.approx(last.ctl * exp(-3 / 42))
+    assert training_load.at(DAY - timedelta(days=31)).ctl == 0
+
+    series = training_load.series(DAY - timedelta(days=1), DAY + timedelta(days=5))
+    assert len(series.dates) == 2
+
+
+def test_session_load_and_add_activity():
+    session = build_session(START_TIME, 3600, training_load_peak=120.0)
+    assert session_load(session) == 120.0
+    session = build_session(START_TIME, 3600, avg_heart_rate=150)
+    assert session_load(session) is None
+    trimp = session_load(session, max_heart_rate=190, resting_heart_rate=50)
+    assert trimp == pytest.approx(60 * 100 / 140 * 0.64 * exp(1.92 * 100 / 140))
+    effect_session = build_session(START_TIME, 3600, total_training_effect=3.0)
+    assert session_load(effect_session) == 3.0 * TRAINING_EFFECT_LOAD
+
+    training_load = TrainingLoad()
+    activity = build_distance_activity(session=session)
+    assert training_load.add_activity("a", activity) is None
+    assert training_load.add_activity("a", activity, 190, 50) == pytest.approx(trimp)
+    assert len(training_load) == 1
@@ -0,0 +1,61 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from fit_data_whiz.fit.results import FitDistanceActivity, FitError
+from fit_data_whiz.fit.transfer import PackedResult, ColumnarRecords, pack, unpack
+from .builders import build_distance_activity, build_records
+
+
+def build_and_pack(shared_memory: bool) -> PackedResult:
+    return pack(build_distance_activity(), shared_memory)
+
+
+def assert_same_activity(
+        activity: FitDistanceActivity, original: FitDistanceActivity
+) -> None:
+    assert isinstance(activity, FitDistanceActivity)
+    assert isinstance(activity.model.records, ColumnarRecords)
+    assert len(activity.model.records) == len(original.model.records)
+    assert activity.model.records[10] == original.model.records[10]
+    assert activity.model.records[-1] == original.model.records[-1]
+    assert activity.model.session == original.model.session
+    assert activity.altitude == original.altitude
+    assert np.array_equal(
+        activity.record_arrays.timestamp, original.record_arrays.timestamp
+    )
+    assert np.allclose(activity.record_arrays.position_lat,
+                       original.record_arrays.position_lat)
+
+
+def test_pack_and_unpack():
+    activity = build_distance_activity()
+    packed = pickle.loads(pickle.dumps(pack(activity)))
+    assert_same_activity(unpack(packed), activity)
+
+
+def test_pack_and_unpack_through_shared_memory():
+    activity = build_distance_activity()
+    packed = pack(activity, shared_memory=True)
+    assert packed.columns is None
+    assert packed.shared_memory_name is not None
+    assert_same_activity(unpack(pickle.loads(pickle.dumps(packed))), activity)
+
+
+def test_packed_is_smaller_than_result():
+    activity = build_distance_activity(records=build_records(speeds=[3.0] * 5000))
+    assert len(pickle.dumps(pack(activity))) < len(pickle.dumps(activity.model)) / 2
+
+
+def test_pack_result_without_records():
+    error = FitError("bad.fit", [])
+    assert unpack(pack(error)) is error
+
+
+def test_unpack_results_from_worker_processes():
+    original = build_distance_activity()
+    with ProcessPoolExecutor(2) as executor:
+        packed_results = list(executor.map(build_and_pack, [False, True]))
+    for packed in packed_results:
+        assert_same_activity(unpack(packed), original)
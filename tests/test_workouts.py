@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+import pytest
+
+from fit_data_whiz.analytics.workouts import (
+    laps_by_step,
+    workout_repeats,
+    workout_step_stats
+)
+from fit_data_whiz.fit.models import WorkoutModel, WorkoutStepModel
+from fit_data_whiz.fit.results import FitActivity
+from .builders import START_TIME, build_distance_activity, build_lap
+
+WORKOUT_STEPS = [
+    WorkoutStepModel(
+        message_index=0, wkt_step_name="warm up", intensity="warmup",
+        duration_type="time", duration_time=600.0, target_type="open"
+    ),
+    WorkoutStepModel(
+        message_index=1, intensity="active", duration_type="distance",
+        duration_distance=400.0, target_type="speed",
+        custom_target_speed_low=4.0, custom_target_speed_high=4.5
+    ),
+    WorkoutStepModel(
+        message_index=2, intensity="recovery", duration_type="time",
+        duration_time=90.0, target_type="heart_rate",
+        custom_target_heart_rate_low=70, custom_target_heart_rate_high=80
+    ),
+    WorkoutStepModel(
+        message_index=3, duration_type="repeat_until_steps_cmplt",
+        duration_step=1, repeat_steps=3
+    ),
+    WorkoutStepModel(
+        message_index=4, intensity="cooldown", duration_type="open",
+        target_type="heart_rate", custom_target_heart_rate_low=220,
+        custom_target_heart_rate_high=250
+    )
+]
+
+
+def build_interval_activity() -> FitActivity:
+    # Warm up, three 400 m repetitions with recovery, and cool down.
+    laps_data = [(0, 600, 1500.0, 130)]
+    for speed in (4.2, 4.4, 3.8):
+        laps_data += [(1, round(400 / speed), 400.0, 170), (2, 90, 150.0, 140)]
+    laps_data.append((4, 300, 750.0, 125))
+
+    laps = []
+    start_time = START_TIME
+    for position, (step, seconds, distance, hr) in enumerate(laps_data):
+        laps.append(build_lap(
+            position, start_time, seconds, total_distance=distance,
+            avg_heart_rate=hr, wkt_step_index=step
+        ))
+        start_time += timedelta(seconds=seconds)
+
+    activity = build_distance_activity(laps=laps)
+    activity.model.workout = WorkoutModel(
+        message_index=0, sport="running", wkt_name="3x400"
+    )
+    activity.model.workout_steps = WORKOUT_STEPS
+    return FitActivity(activity.fit_file_path, activity.model)
+
+
+def test_workout_steps():
+    workout = build_interval_activity().workout
+    assert workout.name == "3x400"
+    assert [s.is_repeat for s in workout.steps] == [False, False, False, True, False]
+    assert (workout.step(1).target_low, workout.step(1).target_high) == (4.0, 4.5)
+    # Heart rate targets below 100 are a percentage of the max heart rate.
+    assert workout.step(2).target_low is None
+    assert (workout.step(4).target_low, workout.step(4).target_high) == (120.0, 150.0)
+    assert (workout.step(3).repeat_from, workout.step(3).repetitions) == (1, 3)
+    assert workout.step(9) is None
+
+
+def test_workout_step_stats():
+    activity = build_interval_activity()
+    assert laps_by_step(activity.model.laps) == {
+        0: [0], 1: [1, 3, 5], 2: [2, 4, 6], 4: [7]
+    }
+
+    stats = workout_step_stats(activity)
+    assert [s.step_index for s in stats] == [0, 1, 2, 4]
+    intervals = stats[1]
+    assert intervals.intensity == "active"
+    assert intervals.distance == 1200.0
+    assert intervals.timer == 95 + 91 + 105
+    assert intervals.avg_speed == pytest.approx(1200 / 291)
+    assert intervals.avg_heart_rate == 170
+    assert intervals.in_target is True
+    assert stats[2].in_target is None
+    assert stats[3].in_target is True
+
+
+def test_workout_repeats():
+    repeats = workout_repeats(build_interval_activity())
+    assert len(repeats) == 1
+    repeat = repeats[0]
+    assert (repeat.step_index, repeat.first_step, repeat.planned) == (3, 1, 3)
+    assert len(repeat.repetitions) == 3
+    assert [[s.step_index for s in r] for r in repeat.repetitions] == [[1, 2]] * 3
+    assert [r[0].in_target for r in repeat.repetitions] == [True, True, False]
+    assert repeat.repetitions[2][0].avg_speed == pytest.approx(400 / 105)
+
+
+def test_workout_stats_without_workout():
+    activity = build_distance_activity(laps=[
+        build_lap(0, START_TIME, 60, wkt_step_index=1),
+        build_lap(1, START_TIME + timedelta(seconds=60), 60, wkt_step_index=0)
+    ])
+    assert [s.step_index for s in workout_step_stats(activity)] == [0, 1]
+    assert workout_repeats(activity) == []
@@ -0,0 +1,135 @@
+from datetime import timedelta
+
+import numpy as np
+
+from fit_data_whiz.analytics.zones import (
+    activity_time_in_zones,
+    laps_time_in_zones,
+    monitor_time_in_zones,
+    time_in_zones
+)
+from fit_data_whiz.fit.models import TimeInZoneModel
+from fit_data_whiz.fit.results import FitDistanceActivity
+from fit_data_whiz.whiz import FitDataWhiz
+from .builders import (
+    START_TIME,
+    build_distance_activity,
+    build_lap,
+    build_monitor,
+    build_records,
+    write_activity_fit
+)
+
+BOUNDARIES = [120, 140, 160]
+
+
+def build_activity(time_in_zones_messages=None):
+    heart_rates = [100] * 100 + [150] * 200 + [170] * 100
+    activity = build_distance_activity(
+        records=build_records(speeds=[3.0] * 400, heart_rates=heart_rates),
+        laps=[
+            build_lap(0, START_TIME, 199),
+            build_lap(1, START_TIME + timedelta(seconds=200), 199)
+        ]
+    )
+    if time_in_zones_messages:
+        activity.model.time_in_zones = time_in_zones_messages
+    return activity
+
+
+def test_time_in_zones_skips_gaps_and_missing_values():
+    timestamps = np.array([0, 1, 2, 3, 100, 101])
+    values = np.array([100.0, 130.0, np.nan, 150.0, 200.0, 200.0])
+    zones = time_in_zones(timestamps, values, BOUNDARIES, max_gap=30)
+    assert zones.boundaries == BOUNDARIES
+    assert zones.seconds.tolist() == [1.0, 1.0, 0.0, 1.0]
+
+
+def test_activity_and_laps_time_in_zones_from_records():
+    activity = build_activity()
+    assert activity_time_in_zones(activity) is None
+
+    zones = activity_time_in_zones(activity, BOUNDARIES)
+    assert zones.seconds.tolist() == [100.0, 0.0, 200.0, 99.0]
+
+    laps = laps_time_in_zones(activity, BOUNDARIES)
+    assert [lap.seconds.tolist() for lap in laps] == [
+        [100.0, 0.0, 99.0, 0.0], [0.0, 0.0, 100.0, 99.0]
+    ]
+    assert activity_time_in_zones(activity, [300], column="power").seconds.tolist() == [
+        0.0, 0.0
+    ]
+
+
+def test_time_in_zone_messages_are_a_fast_path():
+    messages = [
+        TimeInZoneModel(
+            timestamp=START_TIME, reference_mesg="session", reference_index=0,
+            time_in_hr_zone=[1.0, 2.0, 3.0, 4.0], hr_zone_high_boundary=BOUNDARIES
+        ),
+        TimeInZoneModel(
+            timestamp=START_TIME, reference_mesg="lap", reference_index=1,
+            time_in_hr_zone=[5.0, 6.0, 7.0, 8.0], hr_zone_high_boundary=BOUNDARIES
+        )
+    ]
+    activity = build_activity(messages)
+
+    assert activity_time_in_zones(activity).seconds.tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert activity_time_in_zones(activity, BOUNDARIES).seconds.tolist() == [
+        1.0, 2.0, 3.0, 4.0
+    ]
+    # Other boundaries need the records.
+    assert activity_time_in_zones(activity, [130]).seconds.tolist() == [100.0, 299.0]
+
+    laps = laps_time_in_zones(activity, BOUNDARIES)
+    assert laps[0].seconds.tolist() == [100.0, 0.0, 99.0, 0.0]
+    assert laps[1].seconds.tolist() == [5.0, 6.0, 7.0, 8.0]
+    assert laps_time_in_zones(activity)[0] is None
+
+
+def test_time_in_zone_messages_match_the_records():
+    from_records = activity_time_in_zones(build_activity(), BOUNDARIES)
+    # The high boundary of the last zone (max heart rate) is written too.
+    activity = build_activity([
+        TimeInZoneModel(
+            reference_mesg="session", reference_index=0,
+            time_in_hr_zone=from_records.seconds.tolist(),
+            hr_zone_high_boundary=BOUNDARIES + [190]
+        )
+    ])
+    from_message = activity_time_in_zones(activity, BOUNDARIES)
+    assert from_message.boundaries == from_records.boundaries
+    assert from_message.seconds.tolist() == from_records.seconds.tolist()
+    assert activity_time_in_zones(activity).boundaries == BOUNDARIES
+
+    # Lengths that don't match fall back to the records.
+    activity = build_activity([
+        TimeInZoneModel(
+            reference_mesg="session", reference_index=0,
+            time_in_hr_zone=[1.0, 2.0], hr_zone_high_boundary=BOUNDARIES
+        )
+    ])
+    assert activity_time_in_zones(activity) is None
+    assert activity_time_in_zones(activity, BOUNDARIES).seconds.tolist() == (
+        from_records.seconds.tolist()
+    )
+
+
+def test_time_in_zone_message_without_timestamp(tmp_path):
+    path = write_activity_fit(str(tmp_path / "activity.fit"), [("TIME_IN_ZONE", {
+        "reference_mesg": "session", "reference_index": 0,
+        "time_in_hr_zone": [1.0, 2.0, 3.0, 4.0], "hr_zone_high_boundary": BOUNDARIES
+    })])
+    activity = FitDataWhiz(path).parse()
+
+    assert isinstance(activity, FitDistanceActivity)
+    assert activity.model.time_in_zones[0].timestamp is None
+    assert activity_time_in_zones(activity).seconds.tolist() == [1.0, 2.0, 3.0, 4.0]
+
+
+def test_monitor_time_in_zones():
+    monitor = build_monitor(heart_rates=60)
+    zones = monitor_time_in_zones(monitor, [70, 80])
+    assert len(zones.seconds) == 3
+    assert zones.seconds.sum() > 0
+    assert all(zones.seconds > 0)